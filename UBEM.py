@@ -1,19 +1,22 @@
 import geopandas as gpd
 import pandas as pd
-from shapely.geometry.polygon import Polygon, LineString
 from eppy.modeleditor import IDF
 import numpy as np
 import matplotlib.pyplot as plt
-import os,  glob
+import os, sys
 from time import time
-from multiprocessing import Pool
 import multiprocessing
 from shapely import wkt
 
-from simulation import Simulation
-from archetype import Archetype
 from occupancy import Initials
-from hvac import HVAC
+from parallel import Parallel
+from surrogate import Surrogate
+from preprocessing import Preprocessing
+from store import Store
+from weather import Weather
+from schedule import Schedule
+from adjacency import Adjacency
+from shading import Shading
 
 
 
@@ -35,7 +38,8 @@ epw = "inputs/SWE_Stockholm.Arlanda.024600_IWEC.epw"
 
 
 # Reads the input data for buildings.
-df = pd.read_csv('inputs/exampleData.csv')
+inputPath = 'inputs/exampleData.csv'
+df = pd.read_csv(inputPath)
 # Converts the data frame to a geodataframe
 df['geometry'] = df['geometry'].apply(wkt.loads)
 df = gpd.GeoDataFrame(df, crs='epsg:3006')
@@ -60,135 +64,218 @@ occupancyInputs = pd.read_csv('inputs/occupancyInputs.csv', sep=';',low_memory=F
 hotWaterTemp = parameters.hotWaterTemp[0]
 coldWaterTemp = parameters.coldWaterTemp[0]
 
-# Infiltration
-infiltration = pd.read_csv('archetypesCalibrated.txt').infiltration
-
 
 """ Initializing the occupancy profiles """
 
-def leap_year(year):
-    """
-    Checks if the given year is leap year
-    """
-    if ((year % 400 == 0) or (year % 100 == 0) and (year % 4 ==0)):
-        return 1
-    else:
-        return 0
-
-
-# Finds the first day of the year, i.e., Mon, Tue, ...
-firstDayOfYear = pd.read_csv(epw,sep=',',skiprows = 7,
-                             low_memory=False).columns[4]
-
-# Finds if the simulation year is a leap year
-year = int(pd.read_csv(epw,sep=',',skiprows = 8, low_memory=False).columns[0])
-leapYear = leap_year(year)
-
-# Makes the occupancy profile for the two main types of buildings.
-buildings = ['Apartment', 'House']
-for i in range(2):
-    occupancy = occupancyInputs.iloc[:,2*i:2*i+2]
-    personHeat = occupancyInputs.iloc[:,2*i+4:2*i+6]
-    appliances = occupancyInputs.iloc[:,2*i+8:2*i+10]
-    hotWater = occupancyInputs.iloc[:,2*i+12:2*i+14] 
-    lighting = occupancyInputs.iloc[:,(24*i+20):(23*i+45)]
-
-    _,_,_,_,_,maxFlowHotWater = Initials.profile_generator (occupancy,
-                                                            personHeat, 
-                                                            appliances,
-                                                            hotWater,
-                                                            lighting, 
-                                                            firstDayOfYear,
-                                                            leapYear, 
-                                                            buildings[i])
+# Parses the weather file once, kept by the digest of the file for the next runs.
+weatherDir = 'cache/weather'
+weather = Weather.read(epw, weatherDir)
 
-"MULTIPROCESSING SIMULATION RUN FOR THE DATASET"
+# First day of the year, i.e., Mon, Tue, ...
+firstDayOfYear = weather.firstDayOfYear
 
+# 1 if the weather data has 29 February.
+leapYear = weather.leapYear
 
-# Removes the output
-def remove ():
-    """
-    Removes the output files from EnergyPlus after each simulation run.
-    """
-    for filename in glob.glob('eplus*'):
-        os.remove(filename)
-    return None
+"MULTIPROCESSING SIMULATION RUN FOR THE DATASET"
+
+# Root of the per-building run directories of EnergyPlus.
+runRoot = 'runs'
+
+# Root of the occupancy profile directories, one per content of the profiles.
+# The idfs reference the profile files by absolute path.
+profileRoot = 'cache/profiles'
+
+# Number of seeded stochastic variants of the profiles of each type of buildings,
+# shared by the buildings as columns of the profile files. 1 gives every 
+# building the average profile of its type.
+profileVariants = 1
+profileSeed = 0
+
+# Profiles that repeat a weekday and a weekend day for each month are written
+# as Schedule:Compact instead of Schedule:File, with the run period starting on
+# the first day of the weather file (python schedule.py for the startup time saved).
+compileSchedules = True
+
+# Journal of finished buildings. A restarted run skips the buildings already done.
+journalPath = 'results/journal.jsonl'
+
+# Adjacency graph of the stock, stored next to the input data and computed
+# again when the input data is newer.
+adjacencyPath = 'inputs/exampleData.adjacency.csv'
+
+# Shading buildings are reduced to the facets facing the building, with collinear
+# facets merged, and dropped under this elevation angle (degrees) seen from the
+# building. None writes the whole shading buildings.
+shadingElevation = 5
+
+# Store of the hourly results of all buildings, written as buildings finish
+# (python store.py results/store for the annual sums).
+storeDir = 'results/store'
+
+# Cache of EnergyPlus results keyed by the idf and the weather file, and its size limit.
+cacheDir = 'cache/results'
+cacheSize = 2 * 1024**3 # bytes
+
+# Parsed constructions of the archetypes, reused until the archetype idfs change.
+constructionDir = 'cache/construction'
+
+# Simulates identical buildings (same footprint up to a translation, archetype, 
+# height, basement and ventilation) without adjacency or shading only once.
+deduplicate = True
+
+# Writer of the idfs: 'template' renders the objects as text without eppy objects,
+# 'eppy' builds the idf with eppy. Both give the same idf (python template.py).
+writer = 'template'
+
+# Output backend of EnergyPlus read after each simulation: 'eso' (eplusout.eso),
+# 'sqlite' (Output:SQLite) or 'csv' (ReadVarsESO). The size and parse time of
+# each backend are compared with python output.py runs/building0 ...
+outputBackend = 'eso'
+
+# Fidelity preset of the simulations (fidelity.py): 'screening', 'standard' or 
+# 'detailed' time step, solar distribution, shadow calculation and convergence
+# limits. Archetypes or main types of buildings can have their own preset, 
+# e.g., {'House': 'screening'}. The accuracy and the run time of the presets
+# are compared with python fidelity.py
+fidelity = 'standard'
+fidelityClasses = {}
+
+# Wall-clock time limit (s) of each EnergyPlus run, None for no limit, and number
+# of retries of a run that timed out or crashed. A run with severe errors is not
+# retried. The outcome of each run is written in the journal (runner.py).
+runTimeout = 1800
+runRetries = 1
+
+# 'simulation' runs EnergyPlus for every building, 'surrogate' predicts the annual
+# demands with the model trained by surrogate.py (python surrogate.py train),
+# 'scenarios' runs every building with each weather file of scenarioEpws.
+# It can be given on the command line, e.g., python UBEM.py surrogate
+mode = sys.argv[1] if len(sys.argv) > 1 else 'simulation'
+surrogateModel = 'results/surrogate.npz'
+
+# Weather files of the climate scenarios, e.g., the current weather file and
+# future climate files with the same calendar. The model of each building is
+# built once for all of them, and the results of each scenario are stored in 
+# scenarioRoot/<name of the weather file>.
+scenarioEpws = [epw]
+scenarioRoot = 'results/scenarios'
+
+
+"ESTIMATES the DEMAND with the SURROGATE MODEL"
+if __name__ == '__main__' and mode == 'surrogate':
+    t1 = time()
+    model = Surrogate.load(surrogateModel)
+    features = Surrogate.features(df, gis)
+    annual = Surrogate.predict(model, features)
+    
+    df['archetype'] = features.archetype.values
+    df['annualSH'] = annual[:,0]
+    df['annualDHW'] = annual[:,1]
+    df['annualELHousehold'] = annual[:,2]
+    
+    df.to_csv('results/simulationResults.csv')
+    
+    # Hourly profile of each archetype of the stock, the hourly demand of a
+    # building is its annual demand times the profile of its archetype.
+    shapes = Surrogate.shapes(model, sorted(set(features.archetype.values)))
+    shapes.to_csv('results/surrogateShapes.csv', index = False)
+    print("----- Surrogate estimate of", len(df), "buildings:", np.round(time()-t1,2), ' seconds')
 
 
 "RUNS the SIMULATION"
-if __name__ == '__main__':
+if __name__ == '__main__' and mode in ('simulation', 'scenarios'):
+    
+    # Derives the model inputs of all buildings in one pass, before any simulation.
+    t0 = time()
+    modelInputs = Preprocessing.model_inputs(df)
+    print("----- Preprocessing of", len(df), "buildings:", np.round(time()-t0,2), ' seconds')
+    print("----- Buildings outside all archetypes:", np.sum(~modelInputs.validArchetype))
+    
+    # Density of every property, and the properties whose buildings are shaded.
+    densityTable = Shading.density_table(df)
+    shaded = densityTable[densityTable.shading == 1]
+    print("----- Properties with shading:", len(shaded), "/", len(densityTable),
+          list(shaded.index))
+    
+    # Finds the adjacent buildings of the whole stock once.
+    t0 = time()
+    if (os.path.isfile(adjacencyPath) and 
+        os.path.getmtime(adjacencyPath) >= os.path.getmtime(inputPath)):
+        adjacencyGraph = Adjacency.load_graph(adjacencyPath)
+    else:
+        adjacencyGraph = Adjacency.graph(df, gis)
+        Adjacency.save_graph(adjacencyGraph, adjacencyPath)
+    print("----- Adjacency graph:", len(adjacencyGraph), "adjacent pairs,", np.round(time()-t0,2), ' seconds')
+    
+    # Classifies the walls of the whole stock as exterior or adiabatic.
+    t0 = time()
+    walls = Preprocessing.shared_walls(df, adjacencyGraph)
+    print("----- Adiabatic walls:", walls.adiabatic.sum(), "/", len(walls), "walls of",
+          walls[walls.adiabatic].buildingId.nunique(), "buildings,", np.round(time()-t0,2), ' seconds')
+    
+    # Makes the occupancy profile for the two main types of buildings.
+    # Done once in the main process, before the workers start, and written
+    # to a directory named by the content of the profiles.
+    buildings = ['Apartment', 'House']
+    profiles = {}
+    for i in range(2):
+        occupancy = occupancyInputs.iloc[:,2*i:2*i+2]
+        personHeat = occupancyInputs.iloc[:,2*i+4:2*i+6]
+        appliances = occupancyInputs.iloc[:,2*i+8:2*i+10]
+        hotWater = occupancyInputs.iloc[:,2*i+12:2*i+14] 
+        lighting = occupancyInputs.iloc[:,(24*i+20):(23*i+45)]
+    
+        profiles[buildings[i]], maxFlowHotWater = Initials.profiles (occupancy,
+                                                                     personHeat, 
+                                                                     appliances,
+                                                                     hotWater,
+                                                                     lighting, 
+                                                                     firstDayOfYear,
+                                                                     leapYear)
+        if profileVariants > 1:
+            profiles[buildings[i]] = Initials.stochastic_profiles(profiles[buildings[i]],
+                                                                  profileVariants,
+                                                                  seed = profileSeed + i)
+    profileDir = Initials.profile_directory(profiles, profileRoot)
+    
+    # Compiles the profiles, verified hour by hour with the calendar of the run period.
+    # The holidays of the weather file would take the weekend day of the schedules.
+    schedules = None
+    if compileSchedules and weather.holidays == 0:
+        schedules = Schedule.compile_profiles(profiles, firstDayOfYear, leapYear)
+        print("----- Compiled schedules:", {b: sorted(s) for b, s in schedules.items()})
+    
     nThreads = multiprocessing.cpu_count()
-
-    with Pool(nThreads) as p:
-        t1 = time()
-        print('_________________________')
-        print('SIMULATION IS RUNNING ...')
-        print('                         ')
-        
-        SIMULATIONOUTPUT = []
-        ARCHETYPE = []
-        for i in range (len(df)):           
-            print ('Building',i,'/',len(df))
-            try:
-                buildDat = df.iloc[i:i+1].reset_index(drop=True)
-                idx = i
-
-                buildingType = buildDat.buildingType[0] # Detailed type of building
-                mainType = Archetype.building_type(buildingType) # Main type of building
-                buildingYear = buildDat.constructionYear[0] # Construction year of building
-                arch = Archetype.archetype(mainType, buildingYear)
-                ARCHETYPE.append(arch)
-
-
-                floorHeight = 2.5
-                buildingId = buildDat.buildingId[0]
-                buildingPolygon= Polygon (buildDat.geometry[0])            
-                basementInfo = buildDat.heatedBasement[0]    
-                buildingFloor = buildDat.heatedFloors[0] #On ground floors              
-
-                if buildingFloor != 0:
-                    buildingHeight = (buildingFloor*floorHeight) + (1 if basementInfo!=0 else 0)
-                    
-                else:
-                    buildingHeight = buildDat.buildingHeight[0]
-                    buildingFloor = np.round(buildingHeight/2.8)  
-                
-
-                buildingArea = buildDat.area[0]
-                propertyCode = buildDat.propertyCode[0]
-
-                windowAreaBBR = np.round(buildingArea * buildingFloor * 0.1)
-                perimeter = 0
-                x,y = buildingPolygon.exterior.xy
-                for j in range(len(x)-1):
-                    line = LineString([(x[j],y[j]),(x[j+1],y[j+1])]).length
-                    if line>2:
-                        perimeter += line
-                        
-                wwr = windowAreaBBR/(perimeter * buildingFloor * floorHeight)
     
-                
-                material_idf = IDF("archetypesCalibrated/Archetype%d.idf" %arch)
-                                   
-                heatRecovery = 1 if buildDat.ventilationType[0] =='FTX' else 0
-                heatRecoveryEffect = 0.5 if heatRecovery == 1 else 0
-                infFlow = infiltration[arch-1]
-                idf = Simulation.building_idf (buildingPolygon, buildingArea, 
-                                               buildingHeight, buildingId, 
-                                               basementInfo, epw, 
-                                               wwr, material_idf,
-                                               df, hotWaterTemp, coldWaterTemp, 
-                                               maxFlowHotWater, mainType,
-                                               heatRecovery, heatRecoveryEffect,
-                                               infFlow, gis, idx, propertyCode)
-                
-                SIMULATIONOUTPUT.append(Simulation.simulation (idf ,basementInfo))
+    # Inputs shared by all the buildings, sent once to each worker.
+    inputs = dict(df = df, gis = gis, epw = os.path.abspath(epw),
+                  hotWaterTemp = hotWaterTemp, coldWaterTemp = coldWaterTemp,
+                  maxFlowHotWater = maxFlowHotWater, modelInputs = modelInputs,
+                  profileDir = profileDir, runRoot = os.path.abspath(runRoot),
+                  cacheDir = os.path.abspath(cacheDir), cacheSize = cacheSize,
+                  constructionDir = os.path.abspath(constructionDir),
+                  writer = writer, outputBackend = outputBackend,
+                  adjacencyGraph = adjacencyGraph, densityTable = densityTable,
+                  shadingElevation = shadingElevation, profileVariants = profileVariants,
+                  schedules = schedules, firstDayWeek = firstDayOfYear, weather = weather,
+                  fidelity = fidelity, fidelityClasses = fidelityClasses,
+                  runTimeout = runTimeout, runRetries = runRetries)
+
+    t1 = time()
+    print('_________________________')
+    print('SIMULATION IS RUNNING ...')
+    print('                         ')
     
-                remove()
-                
-            except:
-                SIMULATIONOUTPUT.append([0,0,0,0,0])
-            
+    if mode == 'scenarios':
+        ARCHETYPE = Parallel.run_scenarios(iddfile, inputs, nThreads, scenarioEpws,
+                                           scenarioRoot, deduplicate = deduplicate,
+                                           weatherDir = weatherDir)
+    else:
+        SIMULATIONOUTPUT, ARCHETYPE = Parallel.run_stock(iddfile, inputs, nThreads,
+                                                         journalPath, 
+                                                         deduplicate = deduplicate,
+                                                         storeDir = storeDir)
              
     t2 = time()
     print('SIMULATION IS DONE!')
@@ -197,30 +284,25 @@ if __name__ == '__main__':
     print("----- Running time per building:", np.round((t2-t1)/len(df),2), ' seconds')
 
 
-# Analysis of the results
-
-SIMULATIONOUTPUT = pd.DataFrame(SIMULATIONOUTPUT)
+if __name__ == '__main__' and mode == 'scenarios':
+    # Annual sums of every scenario side by side, and their totals.
+    annual = Parallel.scenario_annual(scenarioRoot, scenarioEpws)
+    annual.insert(1, 'archetype', ARCHETYPE)
+    annual.to_csv('results/scenarioResults.csv', index = False)
+    print(annual.drop(['buildingId', 'archetype'], axis = 1).sum().round(0).to_string())
 
-SH = []
-DHW = []
-El = []
-annualSH = []
-annualDHW = []
-annualELHousehold = []
-
-for i in range(len(SIMULATIONOUTPUT)):
-    El.append(SIMULATIONOUTPUT[2][i])
-    SH.append(SIMULATIONOUTPUT[3][i])
-    DHW.append(SIMULATIONOUTPUT[4][i])
-    annualDHW.append(np.sum(SIMULATIONOUTPUT[4][i]))
-    annualSH.append(np.sum(SIMULATIONOUTPUT[3][i]))
-    annualELHousehold.append(np.sum(SIMULATIONOUTPUT[2][i]))
 
+if __name__ == '__main__' and mode == 'simulation':
+    # Analysis of the results: annual sums of the hourly results in the store.
+    annual = Store.annual(storeDir)
+        
+    df['archetype'] = ARCHETYPE  
+    df['annualSH'] = annual.spaceHeat.values
+    df['annualDHW'] = annual.hotWater.values
+    df['annualELHousehold'] = annual.electricity.values
     
+    # The failed buildings are not in the store, their annual sums are not zero demands.
+    df['simulated'] = Store.done(storeDir)
+    print("----- Failed buildings:", (~df.simulated).sum())
     
-df['archetype'] = ARCHETYPE  
-df['annualSH'] = annualSH
-df['annualDHW'] = annualDHW
-df['annualELHousehold'] = annualELHousehold
-
-df.to_csv('results/simulationResults.csv')
+    df.to_csv('results/simulationResults.csv')
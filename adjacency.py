@@ -6,7 +6,11 @@ Created on Thu Nov 25 15:46:58 2021
 """
 
 
+import numpy as np
+import pandas as pd
 import geopandas as gpd
+import shapely
+from shapely import wkt
 
 
 class Adjacency:
@@ -58,3 +62,120 @@ class Adjacency:
         
         return intersection
 
+
+    def has_adjacent(buildingId, df, gis):
+        """
+        Checks if a building has any adjacent building, with the same 0.2 m 
+        buffer as Adjacency.adjacent_polygons but without overlaying the stock.
+        
+        parameters
+        ----------
+        buildingId: str
+            Building ID
+        
+        df: gpd.GeoDataFrame
+            GIS data of the city
+                  
+        output
+        ------
+        bool
+        """
+        buildingPolygonUncalibrated = gis[gis['buildingId'] == buildingId].reset_index(drop=True)
+        bufferedPolygon = buildingPolygonUncalibrated.buffer(0.2, join_style = 2,
+                                                             mitre_limit=2,cap_style=2 )
+        
+        # Candidate buildings from the spatial index of the GIS data.
+        hits = df.sindex.query(bufferedPolygon.geometry[0], predicate = 'intersects')
+        
+        return bool((df.buildingId.iloc[hits] != buildingId).any())
+
+
+    def graph(df, gis):
+        """
+        Finds the adjacent buildings of the whole stock in one pass.
+        
+        The footprints of df are indexed once in an STRtree, then queried
+        with the 0.2 m buffers of all buildings at once. Each edge holds the
+        same intersection as Adjacency.adjacent_polygons.
+        
+        parameters
+        ----------
+        df: gpd.GeoDataFrame
+            GIS data of the city
+        
+        gis: gpd.GeoDataFrame
+            GIS dataset (uncalibrated polygons)
+                  
+        output
+        ------
+        graph: gpd.GeoDataFrame
+            One row per adjacent pair (buildingId, neighborId), with the
+            intersection of the buffered building and its neighbor, sorted
+            by buildingId.
+        """
+        ids = df.buildingId.values
+        
+        # Buffers of the uncalibrated polygons of the buildings of df.
+        rows = np.flatnonzero(gis.buildingId.isin(ids).values)
+        bufferedPolygons = shapely.buffer(gis.geometry.values[rows], 0.2, join_style = 2,
+                                          mitre_limit=2,cap_style=2 )
+        
+        building, neighbor = shapely.STRtree(df.geometry.values).query(bufferedPolygons,
+                                                                       predicate = 'intersects')
+        buildingIds = gis.buildingId.values[rows][building]
+        other = buildingIds != ids[neighbor]
+        building, neighbor, buildingIds = building[other], neighbor[other], buildingIds[other]
+        
+        # Polygons touching the buffer only on a line are dropped, as by gpd.overlay.
+        intersection = shapely.intersection(bufferedPolygons[building],
+                                            df.geometry.values[neighbor])
+        keep = shapely.area(intersection) > 0
+        
+        graph = gpd.GeoDataFrame({'buildingId': buildingIds[keep],
+                                  'neighborId': ids[neighbor][keep]},
+                                 geometry = intersection[keep], crs = df.crs)
+        
+        return graph.sort_values('buildingId', kind = 'stable').reset_index(drop=True)
+
+
+    def neighbors(graph, buildingId):
+        """
+        Looks up the adjacent polygons of a building in the adjacency graph.
+        
+        parameters
+        ----------
+        graph: gpd.GeoDataFrame
+            Adjacency graph of the stock (Adjacency.graph).
+        
+        buildingId: str
+            Building ID
+                  
+        output
+        ------
+        gpd.GeoDataFrame
+            Intersecting or adjacent polygons, as Adjacency.adjacent_polygons.
+        """
+        start = graph.buildingId.searchsorted(buildingId, side = 'left')
+        end = graph.buildingId.searchsorted(buildingId, side = 'right')
+        
+        return graph.iloc[start:end].reset_index(drop=True)
+
+
+    def save_graph(graph, path):
+        """
+        Saves the adjacency graph as a csv file with WKT geometries, as the input data.
+        """
+        table = pd.DataFrame(graph.drop(columns = 'geometry'))
+        table['geometry'] = shapely.to_wkt(graph.geometry.values, rounding_precision = -1)
+        table.to_csv(path, index = False)
+
+
+    def load_graph(path, crs = 'epsg:3006'):
+        """
+        Loads an adjacency graph saved by Adjacency.save_graph.
+        """
+        table = pd.read_csv(path)
+        table['geometry'] = table['geometry'].apply(wkt.loads)
+        graph = gpd.GeoDataFrame(table, geometry = 'geometry', crs = crs)
+        
+        return graph.sort_values('buildingId', kind = 'stable').reset_index(drop=True)
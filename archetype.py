@@ -4,8 +4,14 @@ Created on Thu Nov 25 17:19:30 2021
 
 @author: fatjo876
 """
+import numpy as np
 import pandas as pd
 
+
+# Archetype tables already loaded by this process, by file name.
+tables = {}
+
+
 class Archetype():
     def __init__(self, buildingType, buildingYear):
         self.buildingType = buildingType
@@ -29,19 +35,110 @@ class Archetype():
             Given category of the building based on its archetype. 
         """ 
         
-        # Read the list of predefined archetypes. 
-        listOfArchetypes = pd.read_csv('archetypesCalibrated.txt',sep = ",", 
-                                       encoding = 'ANSI', header='infer')
+        mainType, arch, _, valid = Archetype.assign_archetypes([buildingType],
+                                                               [buildingYear],
+                                                               mainTypes = True)
+        if not valid[0]:
+            raise ValueError('No archetype for a %s built in %s' % (buildingType, buildingYear))
+       
+        return arch[0]
+    
+    def table(fileName = 'archetypesCalibrated.txt'):
+        """
+        Reads the list of pre-defined archetypes once and indexes it by 
+        building type and construction year.
+            
+        parameters
+        ----------
+        fileName: str
+            List of pre-defined archetypes.
+                
+        output
+        ------
+        listOfArchetypes: pd.DataFrame
+            The list of archetypes.
         
-        # Filter the list of archetypes based on type and construction year of the building.
-        archetype = listOfArchetypes[(listOfArchetypes['buildingType'] == buildingType) &
-                                     (listOfArchetypes['buildingYearFrom']< buildingYear) &
-                                      (buildingYear <= listOfArchetypes['buildingYearTo'])]
+        intervals: dict
+            For each building type, a pd.IntervalIndex of non-overlapping year
+            ranges (closed on the right) and the archetype of each range.
+        """ 
+        if fileName not in tables:
+            listOfArchetypes = pd.read_csv(fileName, sep = ",", 
+                                           encoding = 'ANSI', header='infer')
+            
+            intervals = {}
+            for buildingType, rows in listOfArchetypes.groupby('buildingType', sort=False):
+                yearFrom = rows['buildingYearFrom'].values
+                yearTo = rows['buildingYearTo'].values
+                
+                # Split the (possibly overlapping) ranges into elementary ranges.
+                bounds = np.unique(np.concatenate([yearFrom, yearTo]))
+                index = pd.IntervalIndex.from_breaks(bounds, closed = 'right')
+                
+                # The first archetype of the list covering each elementary range
+                # wins, as in a filter of the list. 0 if no archetype covers it.
+                covers = ((yearFrom[None,:] <= index.left.values[:,None]) &
+                          (index.right.values[:,None] <= yearTo[None,:]))
+                arch = np.where(covers.any(axis=1),
+                                rows['archetype'].values[covers.argmax(axis=1)], 0)
+                
+                intervals[buildingType] = (index, arch)
+            
+            tables[fileName] = (listOfArchetypes, intervals)
         
-        # Get the category of the building based on the filtered list 
-        arch = archetype['archetype'].values[0]
-       
-        return arch
+        return tables[fileName]
+    
+    def assign_archetypes(types, years, fileName = 'archetypesCalibrated.txt',
+                          mainTypes = False):
+        """
+        Labels all buildings with their archetype at once.
+            
+        parameters
+        ----------
+        types: array
+            Type of buildings given in the GIS file.
+        
+        years: array
+            Construction year of buildings.
+        
+        mainTypes: bool
+            True if types are already main types, i.e., Apartment or House.
+                
+        output
+        ------
+        mainType: np.array
+            Main type of buildings: 'Apartment', 'House'.
+        
+        arch: np.array
+            Archetype of buildings, 0 for buildings outside all archetypes.
+        
+        infiltration: np.array
+            Infiltration flow rate (ACH) of the archetype, nan outside all archetypes.
+        
+        valid: np.array
+            False for buildings outside all archetypes.
+        """ 
+        listOfArchetypes, intervals = Archetype.table(fileName)
+        
+        types = pd.Series(np.asarray(types, dtype = object))
+        if mainTypes:
+            mainType = types.to_numpy(dtype = object)
+        else:
+            mainType = types.map({t: Archetype.building_type(t) 
+                                  for t in types.unique()}).to_numpy(dtype = object)
+        years = np.asarray(years)
+        
+        arch = np.zeros(len(years), dtype = int)
+        for buildingType, (index, archOfRange) in intervals.items():
+            selected = np.flatnonzero(mainType == buildingType)
+            position = index.get_indexer(years[selected])
+            arch[selected] = np.where(position >= 0, archOfRange[position], 0)
+        
+        valid = arch > 0
+        infiltration = listOfArchetypes.set_index('archetype')['infiltration']
+        infiltration = np.where(valid, infiltration.reindex(arch).values, np.nan)
+        
+        return mainType, arch, infiltration, valid
     
     def building_type (buildingType):
         """
@@ -6,9 +6,10 @@ Created on Fri May  7 16:25:09 2021
 """
 
 from eppy.modeleditor import IDF
-import pandas as pd
 from io import StringIO
 
+from weather import Weather
+
 
 class baseIDF:
     
@@ -46,7 +47,10 @@ class baseIDF:
   
         
     def simulation_parameters(idf, zoneSizing = 'No', systemSizing = 'No', 
-                              plantSizing = 'No', epwRunPeriod = 'Yes'):
+                              plantSizing = 'No', epwRunPeriod = 'Yes',
+                              solarDistribution = 'FullExterior', loadsConvergence = 0.04,
+                              temperatureConvergence = 0.4, shadowFrequency = 20,
+                              maxHVACIterations = 20):
         """
         Sets up the simulation parameters for sizing systems 
         and modeling building.
@@ -57,6 +61,19 @@ class baseIDF:
         zoneSizing: str
         systemSizing: str
         plantSizing: str
+        solarDistribution: str
+            Solar distribution of the building, e.g., FullExterior.
+        loadsConvergence: float
+            Loads convergence tolerance of the warmup days (W).
+        temperatureConvergence: float
+            Temperature convergence tolerance of the warmup days (deltaC).
+        shadowFrequency: int
+            Number of days between two shadow calculations.
+        maxHVACIterations: int
+            Maximum number of HVAC iterations per time step.
+        
+        The shadow calculation and the convergence limits are only written
+        if they differ from the defaults of EnergyPlus (20 days and 20 iterations).
             
         output
         ------
@@ -75,7 +92,18 @@ class baseIDF:
                          Name = 'Building',
                          North_Axis = 0,
                          Terrain = 'City',
-                         Solar_Distribution = 'FullExterior')
+                         Loads_Convergence_Tolerance_Value = loadsConvergence,
+                         Temperature_Convergence_Tolerance_Value = temperatureConvergence,
+                         Solar_Distribution = solarDistribution)
+        
+        if shadowFrequency != 20:
+            idf.newidfobject('SHADOWCALCULATION',
+                             Calculation_Method = 'AverageOverDaysInFrequency',
+                             Calculation_Frequency = shadowFrequency)
+        
+        if maxHVACIterations != 20:
+            idf.newidfobject('CONVERGENCELIMITS',
+                             Maximum_HVAC_Iterations = maxHVACIterations)
         
         return idf
     
@@ -127,7 +155,7 @@ class baseIDF:
         return idf
         
     
-    def site_location(idf, epw):
+    def site_location(idf, location):
         """ 
         Sets up information of the location using the weather data file.
         
@@ -135,21 +163,23 @@ class baseIDF:
         ----------
         idf
         
-        epw:
-            EnergyPlus weather data file.
+        location: Location
+            Site of the weather data file (Weather.read(epw).location), or
+            the EnergyPlus weather data file.
             
         output
         ------
         idf
         """
         
-        location = pd.read_csv(epw , nrows=0) # Reads the weather data file.
+        if isinstance(location, str):
+            location = Weather.read(location).location # Reads the weather data file.
         
-        city = location.columns[1] # City or location of the site.
-        latitude = location.columns[6] # Latitude of the site.
-        longitude = location.columns[7] # Longitude of the site.
-        timeZone = location.columns[8] # Time zone.
-        elevation = location.columns[9] # Elevation of the site.
+        city = location.city # City or location of the site.
+        latitude = location.latitude # Latitude of the site.
+        longitude = location.longitude # Longitude of the site.
+        timeZone = location.timeZone # Time zone.
+        elevation = location.elevation # Elevation of the site.
         
         
         idf.newidfobject('SITE:LOCATION',
@@ -164,7 +194,7 @@ class baseIDF:
     
 
     
-    def simulation_output(idf):
+    def simulation_output(idf, backend = 'eso'):
         """ 
         Chooses the simulation output parameters.
         
@@ -172,6 +202,10 @@ class baseIDF:
         ----------
         idf   
         
+        backend: str
+            Output backend read after the run ('eso', 'sqlite' or 'csv').
+            The hourly series are also written to eplusout.sql for 'sqlite'.
+        
         output
         ------
         html, csv:       
@@ -207,5 +241,9 @@ class baseIDF:
                          Variable_Name= 'Site Outdoor Air Drybulb Temperature',
                          Reporting_Frequency = 'Hourly')        
         
+        if backend == 'sqlite':
+            idf.newidfobject('OUTPUT:SQLITE',
+                             Option_Type = 'Simple')
+        
         return idf
       
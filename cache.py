@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Wed Oct  7 10:21:17 2026
+
+Content-addressed on-disk cache of EnergyPlus results.
+"""
+
+import os
+import re
+import hashlib
+
+import numpy as np
+
+
+# Digests of the files already hashed by this process, by (path, mtime, size).
+fileDigests = {}
+
+
+class Cache:
+    def __init__(self, cacheDir, maxBytes):
+        self.cacheDir = cacheDir
+        self.maxBytes = maxBytes
+
+    def file_digest(path):
+        """
+        Returns the sha256 digest of the content of a file.
+        The digest is computed once per process as long as the file does not change.
+        """
+        stat = os.stat(path)
+        fileId = (os.path.abspath(path), stat.st_mtime, stat.st_size)
+        if fileId not in fileDigests:
+            sha = hashlib.sha256()
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    sha.update(block)
+            fileDigests[fileId] = sha.hexdigest()
+        return fileDigests[fileId]
+
+    def canonical_idf(idf):
+        """
+        Returns the canonical text of an idf, i.e., without comments and
+        white spaces, so that equivalent models give the same text.
+        """
+        text = re.sub(r'!.*', '', idf.idfstr())
+        return ''.join(text.split())
+
+    def key(idf, epw):
+        """
+        Computes the cache key of a building model.
+
+        parameters
+        ----------
+        idf: idf or Template
+            Completed idf file.
+
+        epw: str
+            EnergyPlus weather file.
+
+        output
+        ------
+        str
+            sha256 of the canonical idf text, the weather file and the
+            profile files referenced by the Schedule:File objects.
+        """
+        sha = hashlib.sha256(Cache.canonical_idf(idf).encode())
+        sha.update(Cache.file_digest(epw).encode())
+        for fileName in Cache.schedule_files(idf):
+            sha.update(Cache.file_digest(fileName).encode())
+        return sha.hexdigest()
+
+    def schedule_files(idf):
+        """
+        Returns the files of the Schedule:File objects of an idf, or of a model 
+        of the text templates, which records them as they are added.
+        """
+        if hasattr(idf, 'scheduleFiles'):
+            return idf.scheduleFiles
+        return [schedule.File_Name for schedule in idf.idfobjects['SCHEDULE:FILE']]
+
+    def path(cacheDir, key):
+        """
+        Returns the path of a cache entry.
+        """
+        return os.path.join(cacheDir, key[:2], key + '.npz')
+
+    def get(cacheDir, key):
+        """
+        Reads the parsed hourly results of a model from the cache.
+
+        parameters
+        ----------
+        cacheDir: str
+            Directory of the cache.
+
+        key: str
+            Cache key of the model.
+
+        output
+        ------
+        list
+            Hourly results, None if the model is not in the cache.
+        """
+        path = Cache.path(cacheDir, key)
+        try:
+            with np.load(path) as npz:
+                output = [npz['arr_%d' % i] for i in range(len(npz.files))]
+        except (OSError, ValueError):
+            return None
+
+        # Marks the entry as recently used for the eviction.
+        os.utime(path)
+        return output
+
+    def put(cacheDir, key, output):
+        """
+        Writes the parsed hourly results of a model to the cache.
+        The entry is written to a temporary file and moved in place, so
+        parallel workers never read a partial entry.
+        """
+        path = Cache.path(cacheDir, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = '%s.%d.tmp.npz' % (path[:-4], os.getpid())
+        np.savez(tmp, *[np.asarray(o) for o in output])
+        os.replace(tmp, path)
+        return path
+
+    def evict(cacheDir, maxBytes):
+        """
+        Removes the least recently used entries until the cache fits in maxBytes.
+
+        parameters
+        ----------
+        cacheDir: str
+            Directory of the cache.
+
+        maxBytes: int
+            Maximum size of the cache on disk.
+
+        output
+        ------
+        int
+            Size of the cache after the eviction.
+        """
+        entries = []
+        for root, _, files in os.walk(cacheDir):
+            for name in files:
+                path = os.path.join(root, name)
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        size = sum(e[1] for e in entries)
+        for _, entrySize, path in sorted(entries):
+            if size <= maxBytes:
+                break
+            os.remove(path)
+            size -= entrySize
+
+        return size
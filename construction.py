@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 12 13:40:11 2026
+
+Library of the constructions and materials of the pre-defined archetypes.
+"""
+
+import os
+import pickle
+
+from eppy.modeleditor import IDF, obj2bunch
+
+from cache import Cache
+
+
+# Objects of the construction block of an archetype, in the order they are copied.
+constructionObjects = ['MATERIAL', 'MATERIAL:AIRGAP', 'WINDOWMATERIAL:SIMPLEGLAZINGSYSTEM',
+                       'CONSTRUCTION', 'WINDOWMATERIAL:GLAZING', 'WINDOWMATERIAL:GAS']
+
+# Construction blocks already loaded by this process, by archetype idf file.
+library = {}
+
+
+class Construction:
+    def __init__(self, arch, directory, cacheDir):
+        self.arch = arch
+        self.directory = directory
+        self.cacheDir = cacheDir
+
+    def parse(fileName):
+        """
+        Parses the construction block of an archetype idf with eppy.
+
+        parameters
+        ----------
+        fileName: str
+            Archetype idf file.
+
+        output
+        ------
+        dict
+            Raw field values of the objects of the block, by object type.
+        """
+        material_idf = IDF(fileName)
+        return {key: [list(obj.obj) for obj in material_idf.idfobjects[key]]
+                for key in constructionObjects}
+
+    def load(arch, directory = 'archetypesCalibrated', cacheDir = None):
+        """
+        Returns the construction block of an archetype.
+
+        The archetype idf is parsed once per process. With a cache directory,
+        the parsed block is also pickled on disk and reused by other processes
+        and runs until the content of the archetype idf changes.
+
+        parameters
+        ----------
+        arch: int
+            Archetype of the building.
+
+        directory: str
+            Directory of the archetype idfs.
+
+        cacheDir: str
+            Directory of the pickled blocks, None to parse without a disk cache.
+
+        output
+        ------
+        dict
+            Raw field values of the objects of the block, by object type.
+        """
+        fileName = os.path.join(directory, 'Archetype%d.idf' % arch)
+        if fileName in library:
+            return library[fileName]
+
+        if cacheDir is None:
+            library[fileName] = Construction.parse(fileName)
+            return library[fileName]
+
+        # The pickle is valid for the sha256 of the archetype idf; the digest
+        # itself is only recomputed when the mtime or size of the file changes.
+        digest = Cache.file_digest(fileName)
+        pickled = os.path.join(cacheDir, 'Archetype%d.pkl' % arch)
+        try:
+            with open(pickled, 'rb') as f:
+                cached = pickle.load(f)
+            if cached['digest'] != digest:
+                raise ValueError('Archetype%d.idf has changed' % arch)
+            block = cached['block']
+
+        except (OSError, ValueError, KeyError, pickle.UnpicklingError, EOFError):
+            block = Construction.parse(fileName)
+            os.makedirs(cacheDir, exist_ok=True)
+            tmp = '%s.%d.tmp' % (pickled, os.getpid())
+            with open(tmp, 'wb') as f:
+                pickle.dump(dict(digest = digest, block = block), f)
+            os.replace(tmp, pickled)
+
+        library[fileName] = block
+        return block
+
+    def inject(idf, block):
+        """
+        Adds the whole construction block of an archetype to a building idf.
+
+        parameters
+        ----------
+        idf: idf
+            Building idf.
+
+        block: dict
+            Construction block from Construction.load.
+
+        output
+        ------
+        idf
+        """
+        for key in constructionObjects:
+            idf.idfobjects[key].extend(obj2bunch(idf.model, idf.idd_info, list(obj))
+                                       for obj in block[key])
+        return idf
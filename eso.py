@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 14:12:06 2026
+
+Reader of the hourly results of EnergyPlus in the ESO file (eplusout.eso).
+
+The report IDs are found by name in the data dictionary at the top of the
+file, so the reader does not depend on the zones or on the output set.
+
+Usage (benchmark against the former pandas parser):
+    python eso.py runs/building0/eplusout.eso --basement 0 --repeat 5
+"""
+
+import argparse
+from time import time
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+
+# Hourly results of a building simulation.
+SimulationOutput = namedtuple('SimulationOutput', ['ambientTemperature', 'roomAirTemperature',
+                                                   'electricity', 'spaceHeat', 'hotWater'])
+
+# Report of each result: key (None for meters), variable or meter name and
+# the divisor to the unit of the result (J to kWh/h for the energy).
+outputVariables = {'ambientTemperature': ('Environment', 'Site Outdoor Air Drybulb Temperature', 1),
+                   'roomAirTemperature': ('ZONE', 'Zone Mean Air Temperature', 1),
+                   'electricity': (None, 'Electricity:Building', 3600000),
+                   'spaceHeat': (None, 'Heating:DistrictHeating', 3600000),
+                   'hotWater': (None, 'WaterSystems:DistrictHeating', 3600000)}
+
+
+class ESO:
+    def __init__(self, fileName):
+        self.fileName = fileName
+
+    def dictionary(lines):
+        """
+        Parses the data dictionary of an ESO file.
+
+        parameters
+        ----------
+        lines: iterator
+            Lines of the ESO file, read up to the end of the data dictionary.
+
+        output
+        ------
+        dict
+            Report ID of each (key, name, frequency), with key None for meters.
+            Keys and names are in upper case.
+        """
+        reports = {}
+        for line in lines:
+            if line.startswith('End of Data Dictionary'):
+                break
+            definition, _, frequency = line.partition('!')
+            fields = definition.split(',')
+            if len(fields) < 3 or not fields[0].isdigit():
+                continue
+
+            # Variables have a key (e.g. the zone), meters only a name.
+            name = fields[-1].rsplit('[', 1)[0].strip().upper()
+            key = fields[2].strip().upper() if len(fields) > 3 else None
+            frequency = frequency.split()[0].upper() if frequency.strip() else ''
+            reports[(key, name, frequency)] = fields[0]
+
+        return reports
+
+    def read(fileName, variables, frequency = 'Hourly'):
+        """
+        Reads series of an ESO file in a single pass.
+
+        parameters
+        ----------
+        fileName: str
+            ESO file.
+
+        variables: dict
+            (key, name) of each series, with key None for meters.
+
+        frequency: str
+            Reporting frequency of the series.
+
+        output
+        ------
+        dict
+            Values of each series, in the order of the file. Only the last
+            environment of the file is kept, i.e., the run period.
+        """
+        with open(fileName, 'r', errors = 'replace') as f:
+            reports = ESO.dictionary(f)
+
+            columns = {}
+            missing = []
+            for series, (key, name) in variables.items():
+                report = reports.get((key.upper() if key else None, name.upper(),
+                                      frequency.upper()))
+                if report is None:
+                    missing.append(name if key is None else '%s, %s' % (key, name))
+                else:
+                    columns[report] = series
+            if missing:
+                raise ValueError('%s not reported %s in %s' % ('; '.join(missing),
+                                                               frequency, fileName))
+
+            # First value of each line of the requested reports, in one pass over
+            # the data. A new environment (e.g. after the sizing periods) starts
+            # the series again, so only the run period is kept.
+            values = {report: [] for report in columns}
+            for line in f:
+                report, _, value = line.partition(',')
+                found = values.get(report)
+                if found is not None:
+                    found.append(value.partition(',')[0])
+                elif report == '1':
+                    values = {report: [] for report in columns}
+                elif report.startswith('End of Data'):
+                    break
+
+        return {series: np.array(values[report], dtype = float)
+                for report, series in columns.items()}
+
+    def simulation_output(fileName):
+        """
+        Reads the hourly results of a building simulation.
+
+        parameters
+        ----------
+        fileName: str
+            ESO file of the building (eplusout.eso).
+
+        output
+        ------
+        SimulationOutput
+            Hourly ambient and room air temperatures (C), electricity use,
+            space heating and hot water demands (kWh/h).
+        """
+        series = ESO.read(fileName, {result: (key, name)
+                                     for result, (key, name, _) in outputVariables.items()})
+
+        return ESO.results(series)
+
+    def results(series):
+        """
+        Converts the series of the output variables to the units of the results.
+
+        parameters
+        ----------
+        series: dict
+            Series of each result of outputVariables, as reported by EnergyPlus.
+
+        output
+        ------
+        SimulationOutput
+        """
+        return SimulationOutput(*[series[result] / divisor
+                                  for result, (_, _, divisor) in outputVariables.items()])
+
+    def read_legacy(fileName, basementInfo):
+        """
+        Former reader of the results, with the report IDs of the output set
+        of baseIDF.simulation_output. Kept for the benchmark.
+        """
+        b = 1 if basementInfo > 0 else 0
+        hourly = pd.read_csv(fileName , sep = "[,\n]", skiprows=15+b,
+                             skipfooter = 2, usecols=[0,1], header=None,
+                             engine='python')
+
+        ambientTemperature = np.array(hourly[hourly[0]==7][1])
+        roomAirTemperature = np.array(hourly[hourly[0]==81][1])
+        electricity = np.array(hourly[hourly[0]==22][1]) / 3600000
+        spaceHeat = np.array(hourly[(hourly[0]==295)|(hourly[0]==231)][1]) / 3600000
+        hotWater = np.array(hourly[(hourly[0]==457)|(hourly[0]==391)][1]) / 3600000
+
+        return ambientTemperature, roomAirTemperature, electricity, spaceHeat, hotWater
+
+
+def main():
+    parser = argparse.ArgumentParser(description = 'Read time of the ESO readers.')
+    parser.add_argument('eso', nargs = '+', help = 'ESO files of full year simulations')
+    parser.add_argument('--basement', type = int, default = 0,
+                        help = 'basement info of the buildings, for the former reader')
+    parser.add_argument('--repeat', type = int, default = 5)
+    args = parser.parse_args()
+
+    for fileName in args.eso:
+        times = {}
+        for name, reader in [('pandas', lambda: ESO.read_legacy(fileName, args.basement)),
+                             ('dictionary', lambda: ESO.simulation_output(fileName))]:
+            t0 = time()
+            for _ in range(args.repeat):
+                output = reader()
+            times[name] = ((time() - t0) / args.repeat, output)
+
+        same = all(len(a) == len(b) and np.allclose(a, b)
+                   for a, b in zip(times['pandas'][1], times['dictionary'][1]))
+        print('%s: pandas %.1f ms, dictionary %.1f ms, speedup %.0fx, same results: %s'
+              % (fileName, 1000 * times['pandas'][0], 1000 * times['dictionary'][0],
+                 times['pandas'][0] / times['dictionary'][0], same))
+
+
+if __name__ == '__main__':
+    main()
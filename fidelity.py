@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 09:37:15 2026
+
+Fidelity presets of the simulations: time step, solar distribution, shadow
+calculation frequency and convergence limits, set together by name.
+
+    screening   fast runs for screening the stock, where the run time
+                matters more than the precision
+    standard    the settings of the model so far
+    detailed    reference runs, with reflections and daily shadow calculations
+
+The accuracy and the run time of each preset are found with a benchmark over
+the buildings of the example dataset. The table gives, by preset, the mean run
+time (s), the speedup over the standard preset, and the mean and maximum
+absolute errors (%) of the annual space heating, electricity use and hot water
+against the detailed preset.
+
+The table has not been produced yet: the presets were written without an
+EnergyPlus installation to run the benchmark. To produce it, run the benchmark
+below with EnergyPlus installed, which writes results/fidelity.csv, then commit
+results/fidelity.csv and copy the printed table into this docstring.
+
+Usage (accuracy versus run time table):
+    python fidelity.py --idd C:/EnergyPlusV9-2-0/Energy+.idd --buildings 20
+"""
+
+import os
+import shutil
+import argparse
+from time import time
+
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+from shapely import wkt
+from shapely.geometry.polygon import Polygon
+from eppy.modeleditor import IDF
+
+
+# Settings of each preset: time steps per hour (baseIDF.simulation_period) and
+# parameters of baseIDF.simulation_parameters.
+fidelityPresets = {'screening': dict(timeStep = 2,
+                                     solarDistribution = 'MinimalShadowing',
+                                     shadowFrequency = 60,
+                                     loadsConvergence = 0.1,
+                                     temperatureConvergence = 0.5,
+                                     maxHVACIterations = 10),
+                   'standard': dict(timeStep = 6,
+                                    solarDistribution = 'FullExterior',
+                                    shadowFrequency = 20,
+                                    loadsConvergence = 0.04,
+                                    temperatureConvergence = 0.4,
+                                    maxHVACIterations = 20),
+                   'detailed': dict(timeStep = 12,
+                                    solarDistribution = 'FullExteriorWithReflections',
+                                    shadowFrequency = 1,
+                                    loadsConvergence = 0.02,
+                                    temperatureConvergence = 0.2,
+                                    maxHVACIterations = 30)}
+
+
+class Fidelity:
+    def __init__(self, fidelity, fidelityClasses):
+        self.fidelity = fidelity
+        self.fidelityClasses = fidelityClasses
+
+    def settings(fidelity):
+        """
+        Returns the settings of a preset.
+
+        parameters
+        ----------
+        fidelity: str
+            Name of the preset, i.e., screening, standard or detailed.
+
+        output
+        ------
+        timeStep: int
+            Time steps per hour.
+        parameters: dict
+            Parameters of baseIDF.simulation_parameters.
+        """
+        if fidelity not in fidelityPresets:
+            raise ValueError('Unknown fidelity preset %s' % fidelity)
+        parameters = dict(fidelityPresets[fidelity])
+        timeStep = parameters.pop('timeStep')
+        return timeStep, parameters
+
+    def building_fidelity(archetype, mainType, fidelity = 'standard', fidelityClasses = None):
+        """
+        Returns the preset of a building: the preset of its archetype, or else
+        of its main type, in fidelityClasses, or else the preset of the run.
+
+        parameters
+        ----------
+        archetype: int
+            Archetype of the building.
+        mainType: str
+            Main type of the building, i.e., Apartment or House.
+        fidelity: str
+            Preset of the run.
+        fidelityClasses: dict
+            Presets of some archetypes or main types, e.g., {3: 'detailed',
+            'House': 'screening'}.
+
+        output
+        ------
+        str
+        """
+        if not fidelityClasses:
+            return fidelity
+        return fidelityClasses.get(archetype, fidelityClasses.get(mainType, fidelity))
+
+    def benchmark(df, modelInputs, epw, hotWaterTemp, coldWaterTemp, maxFlowHotWater,
+                  buildings, profileDir, runRoot, weather, schedules = None):
+        """
+        Simulates buildings with each preset, with the run period and the
+        schedules of the run of the stock (UBEM.py).
+
+        parameters
+        ----------
+        weather: EPW
+            Parsed weather file (Weather.read), the first day of its year is
+            the first day of the run period and of the profiles.
+
+        schedules: dict
+            Compiled schedules of the profiles (Schedule.compile_profiles),
+            None to read all the profile files.
+
+        output
+        ------
+        pd.DataFrame
+            Run time (s) and annual space heating, electricity use and hot
+            water (kWh) of each building with each preset.
+        """
+        from construction import Construction
+        from simulation import Simulation
+        from template import Template
+
+        rows = []
+        for idx in buildings:
+            b = modelInputs.iloc[idx]
+            material_idf = Construction.load(b.archetype)
+            for fidelity in fidelityPresets:
+                idf = Template.building_idf(Polygon(df.geometry.iloc[idx]), b.area, b.height,
+                                            b.buildingId, b.basementInfo, epw, b.wwr,
+                                            material_idf, df, hotWaterTemp, coldWaterTemp,
+                                            maxFlowHotWater, b.mainType, b.heatRecovery,
+                                            b.heatRecoveryEffect, b.infFlow, df, idx,
+                                            b.propertyCode, profileDir, schedules = schedules,
+                                            firstDayWeek = weather.firstDayOfYear,
+                                            weather = weather, fidelity = fidelity)
+                runDir = os.path.abspath(os.path.join(runRoot, fidelity, 'building%d' % idx))
+                os.makedirs(runDir, exist_ok = True)
+                t0 = time()
+                output = Simulation.simulation(idf, b.basementInfo, runDir)
+                rows.append(dict(building = idx, preset = fidelity, runTime = time() - t0,
+                                 spaceHeat = np.sum(output.spaceHeat),
+                                 electricity = np.sum(output.electricity),
+                                 hotWater = np.sum(output.hotWater)))
+                shutil.rmtree(runDir, ignore_errors = True)
+
+        return pd.DataFrame(rows)
+
+    def table(runs):
+        """
+        Accuracy versus run time of the presets, from the runs of Fidelity.benchmark.
+
+        output
+        ------
+        pd.DataFrame
+            Mean run time (s) and speedup over the standard preset, mean and
+            maximum absolute error (%) of the annual demands against the
+            detailed preset, by preset.
+        """
+        reference = runs[runs.preset == 'detailed'].set_index('building')
+        table = []
+        for fidelity, group in runs.groupby('preset', sort = False):
+            group = group.set_index('building')
+            row = dict(preset = fidelity, runTime = group.runTime.mean())
+            for result in ['spaceHeat', 'electricity', 'hotWater']:
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    error = np.abs(100 * (group[result] / reference[result] - 1))
+                error = error[np.isfinite(error)]
+                row['%sError' % result] = error.mean()
+                row['%sMaxError' % result] = error.max()
+            table.append(row)
+
+        table = pd.DataFrame(table).set_index('preset')
+        table.insert(1, 'speedup', table.runTime['standard'] / table.runTime)
+        return table
+
+
+def main():
+    parser = argparse.ArgumentParser(description = 'Accuracy and run time of the fidelity presets.')
+    parser.add_argument('--idd', default = 'C:/EnergyPlusV9-2-0/Energy+.idd')
+    parser.add_argument('--epw', default = 'inputs/SWE_Stockholm.Arlanda.024600_IWEC.epw')
+    parser.add_argument('--data', default = 'inputs/exampleData.csv')
+    parser.add_argument('--buildings', type = int, default = 20)
+    parser.add_argument('--runRoot', default = 'runs/fidelity')
+    parser.add_argument('--csv', default = 'results/fidelity.csv')
+    args = parser.parse_args()
+
+    from preprocessing import Preprocessing
+    from occupancy import Initials
+    from weather import Weather
+    from schedule import Schedule
+
+    IDF.setiddname(args.idd)
+    df = pd.read_csv(args.data)
+    df['geometry'] = df['geometry'].apply(wkt.loads)
+    df = gpd.GeoDataFrame(df, crs='epsg:3006')
+    df = df.drop([c for c in df.columns if c.startswith('Unnamed')], axis = 1)
+    parameters = pd.read_csv('inputs/parameters.txt', sep = ',', header = 'infer',
+                             encoding= 'ANSI')
+    epw = os.path.abspath(args.epw)
+    weather = Weather.read(epw)
+
+    # Profiles of the two main types of buildings, as in UBEM.py.
+    occupancyInputs = pd.read_csv('inputs/occupancyInputs.csv', sep = ';', low_memory = False)
+    buildings = ['Apartment', 'House']
+    profiles = {}
+    for i in range(2):
+        profiles[buildings[i]], maxFlowHotWater = Initials.profiles(
+            occupancyInputs.iloc[:,2*i:2*i+2], occupancyInputs.iloc[:,2*i+4:2*i+6],
+            occupancyInputs.iloc[:,2*i+8:2*i+10], occupancyInputs.iloc[:,2*i+12:2*i+14],
+            occupancyInputs.iloc[:,(24*i+20):(23*i+45)],
+            weather.firstDayOfYear, weather.leapYear)
+    profileDir = Initials.profile_directory(profiles, os.path.join(args.runRoot, 'profiles'))
+
+    # Compiled schedules, as in UBEM.py.
+    schedules = None
+    if weather.holidays == 0:
+        schedules = Schedule.compile_profiles(profiles, weather.firstDayOfYear, weather.leapYear)
+
+    modelInputs = Preprocessing.model_inputs(df)
+    runs = Fidelity.benchmark(df, modelInputs, epw, parameters.hotWaterTemp[0],
+                              parameters.coldWaterTemp[0], maxFlowHotWater,
+                              np.flatnonzero(modelInputs.validArchetype.values)[:args.buildings],
+                              profileDir, args.runRoot, weather, schedules)
+
+    table = Fidelity.table(runs)
+    print(table.round(2).to_string())
+    table.to_csv(args.csv)
+
+
+if __name__ == '__main__':
+    main()
@@ -7,6 +7,7 @@ Created on Tue Nov 23 09:57:15 2021
 
 from shapely.geometry.polygon import Point, Polygon
 import itertools
+import numpy as np
 
 class Geometry:
     def __init__(self, polygon, idf):
@@ -78,3 +79,29 @@ class Geometry:
         polygon = polygon.simplify(0.5, preserve_topology= True)
       
         return polygon
+
+    def signature(polygon, decimals = 2):
+        
+        """
+        Makes a translation-invariant signature of a building footprint.
+        
+        parameters
+        ----------
+        polygon: shapely polygon
+            Footprint reconstructed by Geometry.global_geometry.
+        
+        decimals: int
+            Number of decimals of the rounded coordinates (m).
+        
+        output
+        ------
+        tuple
+            Coordinates of the footprint relative to its first vertex.
+            The orientation is kept, so only translated copies of the same
+            footprint share a signature.
+        """
+        
+        coordinates = np.array(polygon.exterior.coords)
+        coordinates = np.round(coordinates - coordinates[0], decimals) + 0.0
+        
+        return tuple(map(tuple, coordinates.tolist()))
@@ -152,17 +152,21 @@ class HVAC():
                   )
  
         # Ideal system equipment.
-        idf.copyidfobject( IDF( io.StringIO ('ZONEHVAC:EQUIPMENTLIST'+',\n'+
-                                             'Equipment'+zone+',\n'+
-                                              'SequentialLoad'+',\n'+
-                                              'ZoneHVAC:IdealLoadsAirSystem'+',\n'+
-                                              'PurchasedAir'+zone+',\n'+
-                                              '1'+',\n'+
-                                              '1'+';\n')
+        idf.copyidfobject( IDF( io.StringIO (HVAC.equipment_list(zone))
                                ).idfobjects['ZONEHVAC:EQUIPMENTLIST'][0]) 
     
         return idf
     
+    def equipment_list(zone):
+        # Idf text of the equipment list of the ideal system.
+        return ('ZONEHVAC:EQUIPMENTLIST'+',\n'+
+                'Equipment'+zone+',\n'+
+                'SequentialLoad'+',\n'+
+                'ZoneHVAC:IdealLoadsAirSystem'+',\n'+
+                'PurchasedAir'+zone+',\n'+
+                '1'+',\n'+
+                '1'+';\n')
+    
     
     
     def ideal_schedule(idf, roomTemp):
@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct  6 14:03:51 2026
+
+Append-only journal of finished buildings, used to resume long stock simulations.
+"""
+
+import os
+import json
+import hashlib
+from time import time
+
+import numpy as np
+
+
+class Journal:
+    def __init__(self, journalPath):
+        self.journalPath = journalPath
+
+    def fingerprint(df, *parameters):
+        """
+        Computes an input fingerprint for every building of the dataset.
+
+        parameters
+        ----------
+        df: gpd.GeoDataFrame
+            GIS data of the buildings.
+
+        parameters:
+            Inputs shared by all buildings that change the results,
+            e.g., the weather file and the hot water temperatures.
+
+        output
+        ------
+        list
+            sha1 hex digest of each building row and the shared inputs.
+        """
+        shared = '|'.join(str(p) for p in parameters)
+        rows = df.astype(str).agg('|'.join, axis=1)
+
+        return [hashlib.sha1((row + '|' + shared).encode()).hexdigest() for row in rows]
+
+    def key(buildingId, fingerprint):
+        """
+        Returns the key of a building in the journal.
+        """
+        return '%s:%s' % (buildingId, fingerprint)
+
+    def output_path(journalPath, key):
+        """
+        Returns the path of the file holding the hourly output of a building.
+        """
+        outputDir = os.path.splitext(journalPath)[0]
+        return os.path.join(outputDir, key.replace(':', '_') + '.npz')
+
+    def read(journalPath):
+        """
+        Reads the journal. The last record of a building wins.
+
+        parameters
+        ----------
+        journalPath: str
+            Path to the journal file (one json record per line).
+
+        output
+        ------
+        dict
+            Records of the journal by key.
+        """
+        records = {}
+        if not os.path.isfile(journalPath):
+            return records
+
+        with open(journalPath, 'r') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A record cut by a crash is ignored, the building is run again.
+                    continue
+                records[record['key']] = record
+
+        return records
+
+    def append(journalPath, buildingId, fingerprint, arch, output, error = None,
+               stats = None, idx = None):
+        """
+        Appends the record of a finished building to the journal and flushes it to disk.
+
+        parameters
+        ----------
+        journalPath: str
+            Path to the journal file.
+
+        buildingId: str
+            Building ID.
+
+        fingerprint: str
+            Input fingerprint of the building.
+
+        arch: int
+            Archetype of the building.
+
+        output: tuple
+            Hourly simulation output of the building, None if it is kept
+            in a result store (Store.write) instead of the journal.
+
+        error: str
+            Reason of the failure, None if the simulation succeeded.
+
+        stats: dict
+            Outcome of the EnergyPlus run (Runner.stats), size and parse time
+            of the simulation output (Output.read), None if the building was
+            not simulated by EnergyPlus.
+
+        idx: int
+            Index of the building in the dataset. The building IDs of a
+            dataset are not always unique.
+
+        output
+        ------
+        dict
+            The written record.
+        """
+        key = Journal.key(buildingId, fingerprint)
+        record = dict(key = key,
+                      buildingId = str(buildingId),
+                      idx = None if idx is None else int(idx),
+                      fingerprint = fingerprint,
+                      status = 'done' if error is None else 'failed',
+                      archetype = int(arch),
+                      error = error,
+                      outputStats = stats or None,
+                      time = time())
+
+        # The hourly output is written before the record, so a record always
+        # points to a complete output file.
+        if error is None and output is not None:
+            outputPath = Journal.output_path(journalPath, key)
+            os.makedirs(os.path.dirname(outputPath), exist_ok=True)
+            np.savez(outputPath, *[np.asarray(o) for o in output])
+
+        with open(journalPath, 'a') as f:
+            f.write(json.dumps(record) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+        return record
+
+    def load_output(journalPath, key):
+        """
+        Loads the hourly output of a finished building.
+        """
+        with np.load(Journal.output_path(journalPath, key)) as npz:
+            return [npz['arr_%d' % i] for i in range(len(npz.files))]
+
+    def progress(journalPath, keys, since = 0):
+        """
+        Reports the progress and throughput of a run from the journal.
+
+        Only the records of the current inputs count, i.e., those with the
+        key of a building of the run, as when the run is resumed.
+
+        parameters
+        ----------
+        journalPath: str
+            Path to the journal file.
+
+        keys: list
+            Key of each building in the run (Journal.key).
+
+        since: float
+            Start time of the current session, the throughput is measured
+            from the records written since then.
+
+        output
+        ------
+        dict
+            Number of done, failed and remaining buildings, throughput
+            (buildings per hour) and estimated remaining time (hours).
+        """
+        records = Journal.read(journalPath)
+        records = [records[k] for k in set(keys) if k in records]
+        done = sum(r['status'] == 'done' for r in records)
+        failed = sum(r['status'] == 'failed' for r in records)
+        remaining = max(len(keys) - done, 0)
+
+        times = sorted(r['time'] for r in records if r['time'] >= since)
+        start = since if since > 0 else (times[0] if times else 0)
+        if len(times) > 0 and times[-1] > start:
+            throughput = len(times) / (times[-1] - start) * 3600
+            eta = remaining / throughput
+        else:
+            throughput, eta = np.nan, np.nan
+
+        return dict(done = done, failed = failed, remaining = remaining,
+                    throughput = throughput, eta = eta)
+
+    def report(journalPath, keys, since = 0):
+        """
+        Prints the progress and throughput of a run from the journal.
+        """
+        progress = Journal.progress(journalPath, keys, since)
+        print ('----- Progress: %d / %d done, %d failed,' % (progress['done'], len(keys),
+                                                          progress['failed']),
+               '%.1f buildings/h, %.1f h left' % (progress['throughput'], progress['eta']))
+        return progress
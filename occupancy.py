@@ -5,8 +5,16 @@ Created on Thu Nov 20 10:06:33 2021
 @author: fatjo876
 """
 
+import os
+import shutil
+import hashlib
+import zlib
 import numpy as np  
-import pandas as pd  
+
+
+# Day types and months of the calendar years already generated, by first day and leap year.
+calendars = {}
+
 
 class Initials:
     def __init__(self, idf, area, height, firstDayOfYear, leapYear, occupancy,
@@ -87,8 +95,81 @@ class Initials:
 
 
       
+    def calendar(firstDayOfYear, leapYear):
+        """
+        Day types and months of the days of a calendar year.
+        
+        parameters
+        ----------
+        firstDayOfYear: str
+            First day of the calendar year, i.e., Monday, Tuesday, or etc.
+        leapYear: int
+            1 if calender year is a leap year, 0 if it is not.
+        
+        output
+        ------
+        weekend: np.array
+            True for the Saturdays and Sundays of the year.
+        month: np.array
+            Month of each day of the year, from 0 (January) to 11.
+        """
+        key = (firstDayOfYear, leapYear)
+        if key not in calendars:
+            weekend = np.isin(Initials.days(firstDayOfYear, leapYear), ['Saturday', 'Sunday'])
+            monthDays = [31, 28 + leapYear, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
+            calendars[key] = weekend, np.repeat(np.arange(12), monthDays)
+        
+        return calendars[key]
+
+    def profiles (occupancy, personHeat, appliances, hotWater, lighting, 
+                  firstDayOfYear, leapYear):
+        """
+        Generates the hourly user profiles of a calendar year with array gathers 
+        of the daily profiles by day type and month.
+        
+        parameters
+        ----------
+        occupancy, personHeat, appliances, hotWater: dataframe
+            Annual average daily profiles, weekday and weekend.
+        lighting: dataframe
+            Monthly average daily profiles, 12 weekdays then 12 weekends.
+        firstDayOfYear: str
+            First day of the calendar year, i.e., Monday, Tuesday, or etc.
+        leapYear: int
+            1 if calendar year is a leap year, 0 if it is not.
+            
+        output
+        ------
+        profiles: dict
+            Hourly profile of each profile file, by file name, e.g., 
+            occupancyProfile. The hot water profile is a fraction of its peak.
+        maxFlowHotWater: float
+            Peak flow rate of hot water (m3/s.person).
+        """
+        weekend, month = Initials.calendar(firstDayOfYear, leapYear)
+        dayType = weekend.astype(int)
+        
+        # Daily profiles (hours x day types) gathered for each day of the year.
+        def annual(daily, columns):
+            return np.asarray(daily, dtype = float)[:, columns].T.ravel()
+        
+        hotWaterProfile = annual(hotWater, dayType)/3600000 #liter/h.person to m3/s.person
+        
+        # Get hot water peak flow rate from the profile.
+        maxFlowHotWater = np.max(hotWaterProfile)
+        
+        profiles = {'occupancyProfile': annual(occupancy, dayType),
+                    'personHeatProfile': annual(personHeat, dayType), # Watts/person
+                    'appliancesProfile': annual(appliances, dayType), # Watts/person
+                    # The flow rate should be a fraction of peak flow rate.
+                    'hotWaterProfile': hotWaterProfile/maxFlowHotWater,
+                    # 25% reduction in lighting power from 2009 to 2016. 
+                    'lightingProfile': annual(lighting, month + 12 * dayType) * 0.75} # Watts/person
+        
+        return profiles, maxFlowHotWater
+
     def profile_generator (occupancy, personHeat, appliances,hotWater, 
-                           lighting, firstDayOfYear, leapYear, building):
+                           lighting, firstDayOfYear, leapYear, building, profileDir = '.'):
         """
         Generates hourly user profile for occupancy, metabolic heat, 
         domestic hot water, use of electrical appliances and lighting. 
@@ -112,6 +193,8 @@ class Initials:
             1 if calendar year is a leap year, 0 if it is not.
         building: str
             Main type of buildings, i.e., Apartment or House.
+        profileDir: str
+            Directory of the profile files.
             
         output
         ------
@@ -123,65 +206,129 @@ class Initials:
         
             Stand-alone text files including hourly user profiles for both apartments and houses.
         """
+        profiles, maxFlowHotWater = Initials.profiles(occupancy, personHeat, appliances,
+                                                      hotWater, lighting, 
+                                                      firstDayOfYear, leapYear)
+        for profile, values in profiles.items():
+            Initials.write_profile(os.path.join(profileDir, '%s%s.txt' %(profile, building)),
+                                   values)
+            
+        return (None, None, None, None, None, maxFlowHotWater)
 
-        # Get the list of days of the year.
-        daysOfYear = Initials.days (firstDayOfYear, leapYear)
-        
-        # Define an array of the months based on the day numbers.
-        months = np.array([31, 59+leapYear, 90+leapYear, 120+leapYear,
-                           151+leapYear, 181+leapYear, 212+leapYear,
-                           243+leapYear, 273+leapYear, 304+leapYear,
-                           334+leapYear, 365+leapYear+1])
- 
-        # Write an hourly array for annual user profiles based on days (weekday or weekend), 
-        # as well as leap year.
-        
-        occupancyProfile = []
-        personHeatProfile = []
-        appliancesProfile = []
-        hotWaterProfile = []
-        lightingProfile = []
-        d, m = 0, 0
-        for day in daysOfYear:
-            d += 1
-            # For profiles with no seasonal dependencies.
-            occupancyProfile.append(occupancy.iloc[:,1].values if day == 'Saturday' or day == 'Sunday' else occupancy.iloc[:,0].values)
-            personHeatProfile.append(personHeat.iloc[:,1].values if day == 'Saturday' or day == 'Sunday' else personHeat.iloc[:,0].values)
-            appliancesProfile.append(appliances.iloc[:,1].values if day == 'Saturday' or day == 'Sunday' else appliances.iloc[:,0].values)            
-            hotWaterProfile.append(hotWater.iloc[:,1].values if day == 'Saturday' or day == 'Sunday' else hotWater.iloc[:,0].values)
+    def stochastic_profiles(profiles, nVariants, seed = 0, maxShift = 1, sigma = 0.2):
+        """
+        Generates variants of the hourly user profiles of a type of buildings,
+        for all the variants at once.
+        
+        Each day of a variant is shifted by up to maxShift hours, the same for
+        all the profiles of the variant, and the daily use of appliances, hot 
+        water and lighting is scaled by a lognormal factor. The annual use of
+        each variant is the same as the profile. The first variant is the 
+        profile itself.
+        
+        parameters
+        ----------
+        profiles: dict
+            Hourly profiles of the type of buildings (Initials.profiles).
+        nVariants: int
+            Number of variants.
+        seed: int
+            Seed of the random generator.
+        maxShift: int
+            Largest time shift of a day (hours).
+        sigma: float
+            Standard deviation of the log of the daily scaling factors.
             
-            # For lighting profile with seasonal dependency.
-            if d < months[m]:
-                lightingProfile.append(lighting.iloc[:,m+12].values if day == 'Saturday' or day == 'Sunday' else lighting.iloc[:,m].values)
-            else:  
-                m +=1
-                lightingProfile.append(lighting.iloc[:,m+12].values if day == 'Saturday' or day == 'Sunday' else lighting.iloc[:,m].values)                
-                continue
+        output
+        ------
+        dict
+            Variants of each profile (variants x hours), by file name.
+        """
+        rng = np.random.default_rng(seed)
+        hours = len(next(iter(profiles.values())))
+        days = hours // 24
+        
+        # Hour of the profile taken by each hour of each variant.
+        shift = rng.integers(-maxShift, maxShift + 1, size = (nVariants, days))
+        scale = rng.lognormal(-sigma**2/2, sigma, size = (nVariants, days))
+        shift[0], scale[0] = 0, 1
+        source = np.clip(np.arange(hours)[None, :] - np.repeat(shift, 24, axis = 1), 0, hours - 1)
+        
+        variants = {}
+        for profile, values in profiles.items():
+            values = np.asarray(values, dtype = float)[source]
+            if profile in ('appliancesProfile', 'hotWaterProfile', 'lightingProfile'):
+                values = values * np.repeat(scale, 24, axis = 1)
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    values *= np.nan_to_num(np.sum(profiles[profile]) / values.sum(axis = 1, 
+                                                                                   keepdims = True))
+            variants[profile] = values
             
-        # Convert lists to numy arrays and reshape them. 
-        occupancyProfile = np.array(occupancyProfile).flatten()
-        personHeatProfile = np.array(personHeatProfile).flatten() # Watts/person
-        appliancesProfile = np.array(appliancesProfile).flatten() # Watts/person
-        hotWaterProfile = np.array(hotWaterProfile).flatten()/3600000 #liter/h.person to m3/s.person
-        # 25% reduction in lighting power from 2009 to 2016. 
-        lightingProfile = np.array(lightingProfile).flatten()* 0.75 # Watts/person
+        return variants
 
-        # Get hot water peak flow rate from the profile.
-        maxFlowHotWater =  np.max(hotWaterProfile)
+    def variant(buildingId, nVariants):
+        """
+        Variant of the profiles of a building, the same for a building in every run.
+        """
+        return zlib.crc32(str(buildingId).encode()) % nVariants if nVariants > 1 else 0
+
+    def write_profile(fileName, values):
+        """
+        Writes a profile file with one value per line, as read by Schedule:File.
+        The variants of a profile (variants x hours) are written as columns.
+        """
+        values = np.asarray(values, dtype = float)
+        with open(fileName, 'w') as f:
+            if values.ndim == 1:
+                f.write('\n'.join(map(repr, values.tolist())) + '\n')
+            else:
+                f.write('\n'.join(','.join(map(repr, row)) for row in values.T.tolist()) + '\n')
+
+    def profile_directory(profiles, profileRoot):
+        """
+        Writes the profile files of all types of buildings once, in a directory 
+        named by the digest of their content.
+        
+        The files are written to a temporary directory renamed at once, so
+        parallel runs never read a profile file being written, and the idfs
+        of other profiles never point to the same files.
         
+        parameters
+        ----------
+        profiles: dict
+            Profiles of each main type of buildings (Initials.profiles), or
+            their variants (Initials.stochastic_profiles).
+        profileRoot: str
+            Root directory of the profile directories.
+            
+        output
+        ------
+        str
+            Absolute path of the profile directory, for Occupancy.profile_path.
+        """
+        files = {'%s%s.txt' %(profile, building): np.asarray(values, dtype = float)
+                 for building, buildingProfiles in sorted(profiles.items())
+                 for profile, values in sorted(buildingProfiles.items())}
+        
+        sha = hashlib.sha1()
+        for fileName, values in files.items():
+            sha.update(fileName.encode())
+            sha.update(values.tobytes())
+        profileDir = os.path.abspath(os.path.join(profileRoot, sha.hexdigest()[:16]))
+        if os.path.isdir(profileDir):
+            return profileDir
+        
+        tmp = '%s.%d.tmp' % (profileDir, os.getpid())
+        os.makedirs(tmp, exist_ok=True)
+        for fileName, values in files.items():
+            Initials.write_profile(os.path.join(tmp, fileName), values)
+        try:
+            os.rename(tmp, profileDir)
+        except OSError:
+            # Written by another run in the meantime, with the same content.
+            shutil.rmtree(tmp, ignore_errors=True)
             
-        return (pd.DataFrame(occupancyProfile).to_csv('occupancyProfile%s.txt'%building,
-                                                      index=False, header=False),
-                pd.DataFrame(personHeatProfile).to_csv('personHeatProfile%s.txt'%building, 
-                                                       index=False, header=False), 
-                pd.DataFrame(appliancesProfile).to_csv('appliancesProfile%s.txt'%building,
-                                                       index=False, header=False),
-                # The flow rate should be a fraction of peak flow rate.
-                pd.DataFrame(hotWaterProfile/maxFlowHotWater).to_csv('hotWaterProfile%s.txt'%building,
-                                                                     index=False, header=False),
-                pd.DataFrame(lightingProfile).to_csv('lightingProfile%s.txt'%building, 
-                                                           index=False, header=False),
-                maxFlowHotWater)
+        return profileDir
 
 
            
@@ -198,7 +345,74 @@ class Occupancy(Initials):
         self.building  = building            
     
     
-    def people (idf, area, height, building):
+    def profile_path(profileDir, profile, building):
+        """
+        Returns the absolute path of a profile file written by Initials.profile_generator.
+        
+        parameters
+        ----------
+        profileDir: str
+            Directory of the profile files.
+        profile: str
+            Name of the profile, e.g., occupancyProfile.
+        building: str
+            Main type of buildings, i.e., Apartment or House.
+            
+        output
+        ------
+        str
+        """
+        return os.path.abspath(os.path.join(profileDir, '%s%s.txt' %(profile, building)))
+    
+    
+    def profile_schedule (idf, name, profile, building, profileDir = '', variant = 0,
+                          schedules = None):
+        """
+        Adds the schedule of a profile, compiled (Schedule.compile) if it is
+        in schedules, read from the profile file otherwise.
+        
+        parameters
+        ----------
+        idf: idf
+        
+        name: str
+            Name of the schedule.
+        profile: str
+            Name of the profile, e.g., occupancyProfile.
+        building: str
+            Main type of buildings, i.e., Apartment or House.
+        profileDir: str
+            Directory of the profile files.
+        variant: int
+            Variant of the profiles (column of the profile files).
+        schedules: dict
+            Fields of the compiled schedules of the type of buildings, by profile.
+            
+        output
+        ------
+        idf
+        """
+        if schedules and profile in schedules:
+            fields = {'Field_%d' % (i + 1): field for i, field in enumerate(schedules[profile])}
+            idf.newidfobject ('SCHEDULE:COMPACT',
+                              Name = name,
+                              Schedule_Type_Limits_Name = 'Any Number',
+                              **fields
+                              )
+        else:
+            idf.newidfobject ('SCHEDULE:FILE',
+                              Name = name,
+                              Schedule_Type_Limits_Name = 'Any Number',
+                              File_Name = Occupancy.profile_path(profileDir, profile, building),
+                              Column_Number = str(variant + 1),
+                              Rows_to_Skip_at_Top = '0'
+                              )
+        
+        return idf
+    
+    
+    def people (idf, area, height, building, profileDir = '', variant = 0,
+                schedules = None):
         """
         Sets occupants' related heat gain.
             
@@ -211,6 +425,14 @@ class Occupancy(Initials):
         
         height: int
             Height of building
+        
+        profileDir: str
+            Directory of the profile files.
+        variant: int
+            Variant of the profiles (column of the profile files).
+        schedules: dict
+            Fields of the compiled schedules of the type of buildings, by profile
+            (Schedule.compile_profiles), None to read all the profile files.
       
         output
         ------
@@ -230,28 +452,19 @@ class Occupancy(Initials):
                          )
         
         # Activity_Level_Schedule.
-        idf.newidfobject ('SCHEDULE:FILE',
-                          Name = 'PersonHeatProfile',
-                          Schedule_Type_Limits_Name = 'Any Number',
-                          File_Name = 'personHeatProfile%s.txt' %building, 
-                          Column_Number = '1',
-                          Rows_to_Skip_at_Top = '0'
-                          )        
+        Occupancy.profile_schedule(idf, 'PersonHeatProfile', 'personHeatProfile', building,
+                                   profileDir, variant, schedules)
         
         # Number_of_People_Schedule.
-        idf.newidfobject ('SCHEDULE:FILE',
-                          Name = 'OccupancyProfile',
-                          Schedule_Type_Limits_Name = 'Any Number',
-                          File_Name = 'occupancyProfile%s.txt' %building, 
-                          Column_Number = '1',
-                          Rows_to_Skip_at_Top = '0'
-                          )
+        Occupancy.profile_schedule(idf, 'OccupancyProfile', 'occupancyProfile', building,
+                                   profileDir, variant, schedules)
         
         return idf
  
     
         
-    def lights (idf, area, height, building):
+    def lights (idf, area, height, building, profileDir = '', variant = 0,
+                schedules = None):
         """
         Sets the heat gain from using equipment and lighting.
             
@@ -265,6 +478,13 @@ class Occupancy(Initials):
             Height of building
         building: str
             Main type of buildings, i.e., Apartment or House.
+        profileDir: str
+            Directory of the profile files.
+        variant: int
+            Variant of the profiles (column of the profile files).
+        schedules: dict
+            Fields of the compiled schedules of the type of buildings, by profile
+            (Schedule.compile_profiles), None to read all the profile files.
             
         output
         ------
@@ -283,17 +503,13 @@ class Occupancy(Initials):
                           )
         
         # Use profile schedule
-        idf.newidfobject ('SCHEDULE:FILE',
-                          Name = 'LihtingProfile',
-                          Schedule_Type_Limits_Name = 'Any Number',
-                          File_Name = 'lightingProfile%s.txt' %building,
-                          Column_Number = '1',
-                          Rows_to_Skip_at_Top = '0'
-                          )        
+        Occupancy.profile_schedule(idf, 'LihtingProfile', 'lightingProfile', building,
+                                   profileDir, variant, schedules)
             
         return idf
     
-    def equipment (idf, area, height, building):
+    def equipment (idf, area, height, building, profileDir = '', variant = 0,
+                   schedules = None):
         """
         Sets the heat gain from using equipment and lighting.
             
@@ -307,6 +523,13 @@ class Occupancy(Initials):
             Height of building.
         building: str
             Main type of buildings, i.e., Apartment or House.
+        profileDir: str
+            Directory of the profile files.
+        variant: int
+            Variant of the profiles (column of the profile files).
+        schedules: dict
+            Fields of the compiled schedules of the type of buildings, by profile
+            (Schedule.compile_profiles), None to read all the profile files.
             
         output
         ------
@@ -325,18 +548,14 @@ class Occupancy(Initials):
                           )
         
         # Use profile schedule
-        idf.newidfobject ('SCHEDULE:FILE',
-                          Name = 'AppliancesProfile',
-                          Schedule_Type_Limits_Name = 'Any Number',
-                          File_Name = 'appliancesProfile%s.txt' %building,
-                          Column_Number = '1',
-                          Rows_to_Skip_at_Top = '0'
-                          )        
+        Occupancy.profile_schedule(idf, 'AppliancesProfile', 'appliancesProfile', building,
+                                   profileDir, variant, schedules)
             
         return idf
     
 
-    def dhw (idf, area, height, hotWaterTemp, coldWaterTemp, maxFlowHotWater, building):
+    def dhw (idf, area, height, hotWaterTemp, coldWaterTemp, maxFlowHotWater, building,
+             profileDir = '', variant = 0, schedules = None):
         """
         Calculates the hot water use in the zone.
             
@@ -356,6 +575,13 @@ class Occupancy(Initials):
             Peak flow rate for hot water use.
         building: str
             Main type of buildings, i.e., Apartment or House.
+        profileDir: str
+            Directory of the profile files.
+        variant: int
+            Variant of the profiles (column of the profile files).
+        schedules: dict
+            Fields of the compiled schedules of the type of buildings, by profile
+            (Schedule.compile_profiles), None to read all the profile files.
             
         output
         ------
@@ -395,12 +621,7 @@ class Occupancy(Initials):
                           )
         
         # Schedule for hot water use
-        idf.newidfobject ('SCHEDULE:FILE',
-                          Name = 'HotWaterUse',
-                          Schedule_Type_Limits_Name = 'Any Number',
-                          File_Name = 'hotWaterProfile%s.txt' %building,
-                          Column_Number = '1',
-                          Rows_to_Skip_at_Top = '0'
-                          )
+        Occupancy.profile_schedule(idf, 'HotWaterUse', 'hotWaterProfile', building,
+                                   profileDir, variant, schedules)
 
         return idf
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 16:40:27 2026
+
+Output backends of the simulations: the results are read from the ESO file,
+from the SQLite database (Output:SQLite) or from the CSV file of ReadVarsESO.
+
+Usage (compares the backends found in run directories):
+    python output.py runs/building0 runs/building1
+"""
+
+import os
+import sqlite3
+import argparse
+from time import time
+from contextlib import closing
+
+import numpy as np
+import pandas as pd
+
+from eso import ESO, outputVariables
+
+
+# Result file of each backend in the run directory.
+backendFiles = {'eso': 'eplusout.eso',
+                'sqlite': 'eplusout.sql',
+                'csv': 'eplusout.csv'}
+
+
+class Output:
+    def __init__(self, runDir, backend):
+        self.runDir = runDir
+        self.backend = backend
+
+    def run_options(backend):
+        """
+        Returns the options of the EnergyPlus run for a backend.
+        The CSV file is written by ReadVarsESO after the simulation.
+        """
+        if backend not in backendFiles:
+            raise ValueError('Unknown output backend %s' % backend)
+        return dict(readvars = True) if backend == 'csv' else {}
+
+    def read_sqlite(fileName, variables, frequency = 'Hourly'):
+        """
+        Reads series of the SQLite output of EnergyPlus in one query.
+
+        parameters
+        ----------
+        fileName: str
+            SQLite file (eplusout.sql).
+
+        variables: dict
+            (key, name) of each series, with key None for meters.
+
+        frequency: str
+            Reporting frequency of the series.
+
+        output
+        ------
+        dict
+            Values of each series, for the last environment of the simulation.
+        """
+        names = sorted(set(name for _, name in variables.values()))
+
+        # The dictionary, time and data tables are joined on their primary keys.
+        query = ('SELECT d.KeyValue, d.Name, r.Value FROM ReportData r '
+                 'JOIN ReportDataDictionary d '
+                 'ON d.ReportDataDictionaryIndex = r.ReportDataDictionaryIndex '
+                 'JOIN Time t ON t.TimeIndex = r.TimeIndex '
+                 'WHERE d.ReportingFrequency = ? AND d.Name IN (%s) '
+                 'AND t.EnvironmentPeriodIndex = (SELECT MAX(EnvironmentPeriodIndex) FROM Time) '
+                 'AND (t.WarmupFlag IS NULL OR t.WarmupFlag = 0) '
+                 'ORDER BY r.ReportDataDictionaryIndex, r.TimeIndex' % ','.join('?' * len(names)))
+
+        with closing(sqlite3.connect('file:%s?mode=ro' % os.path.abspath(fileName),
+                                     uri = True)) as connection:
+            rows = connection.execute(query, [frequency] + names).fetchall()
+
+        found = {}
+        for key, name, value in rows:
+            found.setdefault(((key or '').upper(), name.upper()), []).append(value)
+
+        series = {}
+        for result, (key, name) in variables.items():
+            values = found.get(((key or '').upper(), name.upper()))
+            if values is None:
+                raise ValueError('%s not reported %s in %s' % (name if key is None else
+                                                               '%s, %s' % (key, name),
+                                                               frequency, fileName))
+            series[result] = np.array(values, dtype = float)
+
+        return series
+
+    def read_csv(fileName, variables, frequency = 'Hourly'):
+        """
+        Reads series of the CSV output of ReadVarsESO.
+
+        parameters
+        ----------
+        fileName: str
+            CSV file (eplusout.csv).
+
+        variables: dict
+            (key, name) of each series, with key None for meters.
+
+        frequency: str
+            Reporting frequency of the series.
+
+        output
+        ------
+        dict
+            Values of each series. The file has no environments, so the
+            simulation should not run the sizing periods.
+        """
+        # Columns are named 'key:name [unit](frequency)', or 'name [unit](frequency)' for meters.
+        columns = {}
+        for column in pd.read_csv(fileName, nrows = 0).columns:
+            name, _, unit = column.partition(' [')
+            if unit.endswith('(%s)' % frequency):
+                columns[name.strip().upper()] = column
+
+        selected = {}
+        for result, (key, name) in variables.items():
+            column = columns.get(('%s:%s' % (key, name) if key else name).upper())
+            if column is None:
+                raise ValueError('%s not reported %s in %s' % (name if key is None else
+                                                               '%s, %s' % (key, name),
+                                                               frequency, fileName))
+            selected[result] = column
+
+        data = pd.read_csv(fileName, usecols = list(set(selected.values())))
+        return {result: data[column].dropna().to_numpy(dtype = float)
+                for result, column in selected.items()}
+
+    def read(runDir, backend = 'eso'):
+        """
+        Reads the hourly results of a building simulation with a backend.
+
+        parameters
+        ----------
+        runDir: str
+            Run directory of the building.
+
+        backend: str
+            'eso', 'sqlite' or 'csv'.
+
+        output
+        ------
+        output: SimulationOutput
+            Hourly results of the building.
+
+        stats: dict
+            Backend, size of its result file (bytes), size of all the output
+            files of the run (bytes) and parse time (s).
+        """
+        fileName = os.path.join(runDir, backendFiles[backend])
+        variables = {result: (key, name) for result, (key, name, _) in outputVariables.items()}
+        readers = {'eso': ESO.read, 'sqlite': Output.read_sqlite, 'csv': Output.read_csv}
+
+        t0 = time()
+        output = ESO.results(readers[backend](fileName, variables))
+        parseTime = time() - t0
+
+        stats = dict(backend = backend,
+                     bytes = os.path.getsize(fileName),
+                     runBytes = sum(entry.stat().st_size for entry in os.scandir(runDir)
+                                    if entry.is_file()),
+                     parseTime = parseTime)
+
+        return output, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description = 'Size and read time of the output backends.')
+    parser.add_argument('runDir', nargs = '+', help = 'run directories of simulated buildings')
+    args = parser.parse_args()
+
+    rows = []
+    for runDir in args.runDir:
+        outputs = {}
+        for backend, fileName in backendFiles.items():
+            if not os.path.isfile(os.path.join(runDir, fileName)):
+                continue
+            outputs[backend], stats = Output.read(runDir, backend)
+            rows.append(dict(runDir = runDir, backend = backend,
+                             kB = stats['bytes'] / 1024,
+                             parseTime = 1000 * stats['parseTime']))
+
+        # All backends should give the same results.
+        first = next(iter(outputs.values()), None)
+        for backend, output in outputs.items():
+            same = all(len(a) == len(b) and np.allclose(a, b) for a, b in zip(first, output))
+            if not same:
+                print('Different results from %s in %s' % (backend, runDir))
+
+    rows = pd.DataFrame(rows)
+    print(rows.round(1).to_string(index = False))
+    print('Mean per building (kB, ms):')
+    print(rows.groupby('backend')[['kB', 'parseTime']].mean().round(1).to_string())
+
+
+if __name__ == '__main__':
+    main()
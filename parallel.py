@@ -0,0 +1,728 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct  5 09:12:40 2026
+
+Runs the building simulations of a stock over a pool of worker processes.
+"""
+
+import os
+import json
+import shutil
+import hashlib
+from time import time
+from multiprocessing import Pool
+
+import pandas as pd
+from shapely.geometry.polygon import Polygon
+from eppy.modeleditor import IDF
+
+from simulation import Simulation
+from geometry import Geometry
+from adjacency import Adjacency
+from journal import Journal
+from cache import Cache
+from construction import Construction
+from template import Template
+from base_idf import baseIDF
+from weather import Weather
+from fidelity import Fidelity
+from store import Store
+from occupancy import Initials
+
+
+# Inputs shared by all the jobs of a worker process (set once by the initializer).
+shared = {}
+
+
+class Parallel:
+    def __init__(self, iddfile, inputs, nThreads, runRoot):
+        self.iddfile = iddfile
+        self.inputs = inputs
+        self.nThreads = nThreads
+        self.runRoot = runRoot
+
+    def initializer(iddfile, inputs):
+        """
+        Initializes a worker process with the IDD and the inputs of the stock.
+
+        parameters
+        ----------
+        iddfile: str
+            Path to the EnergyPlus idd file.
+
+        inputs: dict
+            Inputs shared by all buildings, i.e., df, gis, epw, hotWaterTemp,
+            coldWaterTemp, maxFlowHotWater, modelInputs, profileDir, runRoot,
+            and optionally cacheDir and cacheSize for the result cache,
+            constructionDir for the parsed archetype constructions,
+            writer ('eppy' or 'template') for the idf writer,
+            outputBackend ('eso', 'sqlite' or 'csv') for the output reader,
+            adjacencyGraph (Adjacency.graph) for the adjacent buildings,
+            densityTable (Shading.density_table) for the shaded properties,
+            shadingElevation for the reduction of the shading facets,
+            profileVariants for the number of variants of the profile files,
+            schedules (Schedule.compile_profiles) for the compiled schedules
+            of the profiles, firstDayWeek for the first day of the run period
+            weather (Weather.read) for the parsed weather file, fidelity for
+            the fidelity preset of the run and fidelityClasses for the presets
+            of some archetypes or main types (Fidelity.building_fidelity),
+            runTimeout and runRetries for the time limit and the retries of
+            the EnergyPlus runs (Runner.run).
+            Parallel.run_scenarios adds the scenarios and the modelDir of
+            the models of the buildings.
+
+        output
+        ------
+        None
+        """
+        if IDF.iddname is None:
+            IDF.setiddname(iddfile)
+        shared.update(inputs)
+        return None
+
+    def run_directory(runRoot, idx):
+        """
+        Creates an isolated scratch directory for the simulation of a building.
+
+        parameters
+        ----------
+        runRoot: str
+            Root directory of all the run directories.
+
+        idx: int
+            Index of the building in the dataset.
+
+        output
+        ------
+        str
+            Absolute path of the run directory.
+        """
+        runDir = os.path.abspath(os.path.join(runRoot, 'building%d' % idx))
+        os.makedirs(runDir, exist_ok=True)
+        return runDir
+
+    def signatures(df, gis, modelInputs, adjacencyGraph = None, profileVariants = 1,
+                   fidelity = 'standard', fidelityClasses = None):
+        """
+        Makes a signature of every building that can share its simulation 
+        with identical buildings.
+        
+        Buildings with adjacent walls or shading obstacles depend on their
+        surroundings and get no signature.
+
+        parameters
+        ----------
+        df: gpd.GeoDataFrame
+            GIS data of the buildings.
+
+        gis: gpd.GeoDataFrame
+            GIS dataset.
+
+        modelInputs: pd.DataFrame
+            Model inputs of the buildings (Preprocessing.model_inputs).
+
+        adjacencyGraph: gpd.GeoDataFrame
+            Adjacency graph of the stock (Adjacency.graph), None to query
+            the adjacent buildings one by one.
+
+        profileVariants: int
+            Number of variants of the profile files (Initials.variant).
+
+        fidelity: str
+            Fidelity preset of the run.
+
+        fidelityClasses: dict
+            Fidelity presets of some archetypes or main types.
+
+        output
+        ------
+        list
+            Signature of each building, None if the building is simulated alone.
+        """
+        adjacent = None if adjacencyGraph is None else set(adjacencyGraph.buildingId)
+        signatures = []
+        for idx, b in enumerate(modelInputs.itertuples(index=False)):
+            try:
+                if (not b.validArchetype or
+                    (b.buildingId in adjacent if adjacent is not None
+                     else Adjacency.has_adjacent(b.buildingId, df, gis)) or
+                    b.shading == 1):
+                    signatures.append(None)
+                    continue
+
+                footprint = Geometry.signature(Geometry.global_geometry(
+                    Polygon(df.geometry.iloc[idx])))
+                signatures.append((footprint, b.archetype, b.mainType,
+                                   round(b.height, 2), round(b.area, 2),
+                                   int(b.basementInfo > 0), b.heatRecovery,
+                                   round(b.wwr, 6),
+                                   Initials.variant(b.buildingId, profileVariants),
+                                   Fidelity.building_fidelity(b.archetype, b.mainType,
+                                                              fidelity, fidelityClasses)))
+            except Exception:
+                signatures.append(None)
+
+        return signatures
+
+    def settings(inputs, archetypeDir = 'archetypesCalibrated',
+                 archetypeTable = 'archetypesCalibrated.txt'):
+        """
+        Inputs shared by all buildings that change the results, for the
+        fingerprints of the journal (Journal.fingerprint).
+
+        The files are given by the digest of their content: the weather
+        file, the archetype table and idfs, and the profile directory,
+        named by the digest of the profiles, i.e., of their variants and seed.
+
+        parameters
+        ----------
+        inputs: dict
+            Inputs shared by all buildings (see Parallel.initializer).
+
+        archetypeDir: str
+            Directory of the archetype idfs (Construction.load).
+
+        archetypeTable: str
+            List of pre-defined archetypes (Archetype.table).
+
+        output
+        ------
+        list
+            Values of the settings.
+        """
+        archetypes = sorted(f for f in os.listdir(archetypeDir) if f.endswith('.idf'))
+        schedules = inputs.get('schedules')
+        return [Cache.file_digest(inputs['epw']), inputs['hotWaterTemp'],
+                inputs['coldWaterTemp'], inputs['maxFlowHotWater'],
+                inputs.get('fidelity', 'standard'), inputs.get('fidelityClasses'),
+                inputs.get('shadingElevation'), inputs.get('profileVariants', 1),
+                os.path.basename(inputs.get('profileDir', '')),
+                None if schedules is None else
+                hashlib.sha1(json.dumps(schedules, sort_keys = True).encode()).hexdigest(),
+                inputs.get('writer', 'eppy'), inputs.get('outputBackend', 'eso'),
+                Cache.file_digest(archetypeTable),
+                [Cache.file_digest(os.path.join(archetypeDir, f)) for f in archetypes]]
+
+    def groups(buildings, signatures):
+        """
+        Groups buildings sharing a signature behind the first of them.
+
+        parameters
+        ----------
+        buildings: list
+            Indices of the buildings in the dataset.
+
+        signatures: list
+            Signature of every building of the dataset (Parallel.signatures).
+
+        output
+        ------
+        dict
+            Buildings of each group by the building simulated for the group.
+        """
+        members = {idx: [idx] for idx in buildings}
+        first = {}
+        for idx in buildings:
+            if signatures[idx] is None:
+                continue
+            if signatures[idx] in first:
+                members[first[signatures[idx]]].append(idx)
+                del members[idx]
+            else:
+                first[signatures[idx]] = idx
+
+        return members
+
+    def building_model(idx, writer = None, stats = None):
+        """
+        Builds the model of a single building of the dataset.
+
+        parameters
+        ----------
+        idx: int
+            Index of the building in the dataset.
+
+        writer: function
+            Template.building_idf or Simulation.building_idf, None for the
+            writer of the inputs.
+
+        stats: dict
+            Filled with the facet counts of the shading buildings of the
+            model (shadingFacets), None to leave them out.
+
+        output
+        ------
+        idf or Template
+            Model of the building.
+        """
+        df = shared['df']
+        b = shared['modelInputs'].iloc[idx]
+        if not b.validArchetype:
+            raise ValueError('No archetype for building %s' % b.buildingId)
+
+        material_idf = Construction.load(b.archetype, cacheDir = shared.get('constructionDir'))
+
+        # Both writers give the same idf text, the templates without eppy objects.
+        if writer is None:
+            writer = (Template.building_idf if shared.get('writer') == 'template'
+                      else Simulation.building_idf)
+        return writer (Polygon(df.geometry.iloc[idx]), b.area,
+                       b.height, b.buildingId,
+                       b.basementInfo, shared['epw'],
+                       b.wwr, material_idf,
+                       df, shared['hotWaterTemp'],
+                       shared['coldWaterTemp'],
+                       shared['maxFlowHotWater'], b.mainType,
+                       b.heatRecovery, b.heatRecoveryEffect,
+                       b.infFlow, shared['gis'], idx,
+                       b.propertyCode, shared['profileDir'],
+                       shared.get('outputBackend', 'eso'),
+                       shared.get('adjacencyGraph'), shared.get('densityTable'),
+                       shared.get('shadingElevation'),
+                       Initials.variant(b.buildingId, shared.get('profileVariants', 1)),
+                       shared.get('schedules'), shared.get('firstDayWeek', 'Monday'),
+                       shared.get('weather'),
+                       Fidelity.building_fidelity(b.archetype, b.mainType,
+                                                  shared.get('fidelity', 'standard'),
+                                                  shared.get('fidelityClasses')),
+                       stats)
+
+    def building(idx):
+        """
+        Builds and simulates a single building of the dataset in its own run directory.
+
+        parameters
+        ----------
+        idx: int
+            Index of the building in the dataset.
+
+        output
+        ------
+        tuple
+            (idx, archetype, simulation output, error, stats) of the building.
+            error is None if the simulation succeeded, stats holds the outcome
+            of the EnergyPlus run (Runner.stats) and the size and parse time of
+            the output (Output.read), empty on a cache hit, and the facet
+            counts of the shading buildings of shaded buildings.
+        """
+        b = shared['modelInputs'].iloc[idx]
+        arch = b.archetype
+        error = None
+        stats = {}
+        try:
+            idf = Parallel.building_model(idx, stats = stats)
+
+            runDir = Parallel.run_directory(shared['runRoot'], idx)
+            output = Simulation.simulation (idf, b.basementInfo, runDir,
+                                            shared.get('cacheDir'),
+                                            shared.get('outputBackend', 'eso'), stats,
+                                            shared.get('runTimeout'),
+                                            shared.get('runRetries', 0))
+
+            # Removes the output files from EnergyPlus of this building only.
+            shutil.rmtree(runDir, ignore_errors=True)
+
+        except Exception as e:
+            output = [0,0,0,0,0]
+            error = repr(e)
+
+        return idx, arch, output, error, stats
+
+    def scenario_model(idx):
+        """
+        Builds the model of a building once for all the weather scenarios,
+        without its site location, and writes it to the model directory.
+
+        output
+        ------
+        tuple
+            (idx, archetype, error) of the building.
+        """
+        arch = shared['modelInputs'].archetype.iloc[idx]
+        try:
+            idf = Parallel.building_model(idx, Template.building_idf)
+            idf.objects.pop('SITE:LOCATION', None)
+            idf.dump(os.path.join(shared['modelDir'], 'building%d.json' % idx))
+            error = None
+        except Exception as e:
+            error = repr(e)
+
+        return idx, arch, error
+
+    def scenario_run(job):
+        """
+        Simulates the model of a building (Parallel.scenario_model) with the 
+        weather file of a scenario.
+
+        parameters
+        ----------
+        job: tuple
+            (idx, scenario) index of the building in the dataset and of the
+            scenario in shared['scenarios'].
+
+        output
+        ------
+        tuple
+            (idx, scenario, simulation output, error, stats), as Parallel.building.
+        """
+        idx, scenario = job
+        name, epw, weather = shared['scenarios'][scenario]
+        error = None
+        stats = {}
+        try:
+            idf = Template.load(os.path.join(shared['modelDir'], 'building%d.json' % idx), epw)
+            idf.invariant(baseIDF.site_location, weather.location)
+
+            runDir = Parallel.run_directory(os.path.join(shared['runRoot'], name), idx)
+            output = Simulation.simulation (idf, shared['modelInputs'].basementInfo.iloc[idx],
+                                            runDir, shared.get('cacheDir'),
+                                            shared.get('outputBackend', 'eso'), stats,
+                                            shared.get('runTimeout'),
+                                            shared.get('runRetries', 0))
+            shutil.rmtree(runDir, ignore_errors=True)
+
+        except Exception as e:
+            output = [0,0,0,0,0]
+            error = repr(e)
+
+        return idx, scenario, output, error, stats
+
+    def run_stock(iddfile, inputs, nThreads, journalPath = None, reportEvery = 100,
+                  deduplicate = False, storeDir = None):
+        """
+        Simulates all the buildings of the dataset over a pool of processes.
+
+        Buildings are dispatched one by one and collected in the order they
+        complete, then stored at the index of the building in the dataset.
+        With a journal, every finished building is recorded as it completes,
+        and buildings already done with the same inputs are not run again.
+        With deduplication, buildings sharing a signature are simulated once
+        and the result is given to all of them.
+        With a store, the hourly results are written to disk as buildings
+        finish instead of being kept in memory or in the journal, and a run
+        is resumed from the buildings both done in the journal and written
+        to the store.
+
+        parameters
+        ----------
+        iddfile: str
+            Path to the EnergyPlus idd file.
+
+        inputs: dict
+            Inputs shared by all buildings (see Parallel.initializer).
+
+        nThreads: int
+            Number of worker processes.
+
+        journalPath: str
+            Path to the run journal, None to run without a journal.
+
+        reportEvery: int
+            Number of finished buildings between two progress reports.
+
+        deduplicate: bool
+            Simulates identical buildings without adjacency or shading only once.
+
+        storeDir: str
+            Directory of the result store (Store.create), None to keep the
+            results in memory.
+
+        output
+        ------
+        SIMULATIONOUTPUT: list
+            Simulation output of each building, in the order of the dataset.
+            None for every building with a store, read them with Store.
+
+        ARCHETYPE: list
+            Archetype of each building, in the order of the dataset.
+        """
+        df = inputs['df']
+        n = len(df)
+        SIMULATIONOUTPUT = [None] * n
+        ARCHETYPE = [None] * n
+        pending = list(range(n))
+
+        if storeDir is not None:
+            meta = Store.create(storeDir, df.buildingId)
+            written = Store.done(storeDir)
+
+        if journalPath is not None:
+            fingerprints = Journal.fingerprint(df, *Parallel.settings(inputs))
+            keys = [Journal.key(b, f) for b, f in zip(df.buildingId, fingerprints)]
+            records = Journal.read(journalPath)
+
+            # Buildings already done are loaded from the journal, or found in
+            # the store, missing or failed buildings are run again.
+            pending = []
+            for idx in range(n):
+                record = records.get(keys[idx])
+                if (record is not None and record['status'] == 'done' and
+                    (storeDir is None or written[idx])):
+                    if storeDir is None:
+                        SIMULATIONOUTPUT[idx] = Journal.load_output(journalPath, keys[idx])
+                    ARCHETYPE[idx] = record['archetype']
+                else:
+                    pending.append(idx)
+
+            print ('Resuming:', n - len(pending), '/', n, 'buildings already done')
+
+        # Pending buildings keep no result of an earlier run in the store.
+        if storeDir is not None:
+            Store.clear(storeDir, pending)
+
+        # The cache is only evicted by the main process, outside of the run.
+        cacheDir = inputs.get('cacheDir')
+        if cacheDir is not None:
+            Cache.evict(cacheDir, inputs['cacheSize'])
+
+        # Pending buildings sharing a signature are grouped behind the first of them.
+        members = {idx: [idx] for idx in pending}
+        if deduplicate:
+            signatures = Parallel.signatures(df, inputs['gis'], inputs['modelInputs'],
+                                             inputs.get('adjacencyGraph'),
+                                             inputs.get('profileVariants', 1),
+                                             inputs.get('fidelity', 'standard'),
+                                             inputs.get('fidelityClasses'))
+            members = Parallel.groups(pending, signatures)
+
+            print ('Deduplication:', len(members), 'simulations for', len(pending),
+                   'buildings')
+
+        start = time()
+        runStats = []
+        shadingFacets = [0, 0]
+        with Pool(nThreads, initializer=Parallel.initializer,
+                  initargs=(iddfile, inputs)) as p:
+            done = 0
+            for idx, arch, output, error, stats in p.imap_unordered(Parallel.building,
+                                                                    list(members)):
+                if stats:
+                    runStats.append(stats)
+                # Facets of the shading buildings of the stock, before and after the reduction.
+                if 'shadingFacets' in stats:
+                    shadingFacets = [a + b for a, b in zip(shadingFacets,
+                                                           stats['shadingFacets'])]
+                for member in members[idx]:
+                    done += 1
+                    if storeDir is None:
+                        SIMULATIONOUTPUT[member] = output
+                    elif error is None:
+                        Store.write(storeDir, meta, member, output)
+                    ARCHETYPE[member] = arch
+                    print ('Building', member, 'failed' if error else 'done',
+                           '(%d / %d)' % (done, len(pending)))
+
+                    if journalPath is None:
+                        continue
+
+                    # With a store, the journal only records the outcome.
+                    Journal.append(journalPath, df.buildingId.iloc[member],
+                                   fingerprints[member], arch,
+                                   output if storeDir is None else None, error,
+                                   stats if member == idx else None, member)
+
+                    # Reports the progress of the whole run from the journal.
+                    if done % reportEvery == 0 or done == len(pending):
+                        Journal.report(journalPath, keys, start)
+
+        Parallel.run_report(runStats, shadingFacets)
+
+        if cacheDir is not None:
+            Cache.evict(cacheDir, inputs['cacheSize'])
+
+        return SIMULATIONOUTPUT, ARCHETYPE
+
+    def run_report(runStats, shadingFacets = None):
+        """
+        Prints the outcome of the EnergyPlus runs and the cost of the output
+        backend, from the stats of the simulated buildings, and the facets
+        of the shading buildings of the stock (before, after the reduction).
+        """
+        if shadingFacets is not None and shadingFacets[0] > 0:
+            print ('Shading facets: %d before and %d after the reduction (%.0f%% left)'
+                   % (shadingFacets[0], shadingFacets[1],
+                      100 * shadingFacets[1] / shadingFacets[0]))
+        outcomes = {}
+        for s in runStats:
+            if 'status' in s:
+                outcomes.setdefault(s['status'], []).append(s)
+        for status, runs in sorted(outcomes.items()):
+            print ('EnergyPlus %s: %d runs, %.1f s and %.2f attempts per run'
+                   % (status, len(runs), sum(s['runTime'] for s in runs) / len(runs),
+                      sum(s['attempts'] for s in runs) / len(runs)))
+        reasons = {}
+        for s in runStats:
+            if s.get('reason') is not None:
+                reasons[s['reason']] = reasons.get(s['reason'], 0) + 1
+        for reason, count in sorted(reasons.items(), key = lambda r: -r[1])[:5]:
+            print ('   %d x %s' % (count, reason))
+
+        runStats = [s for s in runStats if 'runBytes' in s]
+        if runStats:
+            print ('Output backend %s: %.0f kB written and %.1f ms of parsing per building'
+                   % (runStats[0]['backend'],
+                      sum(s['runBytes'] for s in runStats) / len(runStats) / 1024,
+                      1000 * sum(s['parseTime'] for s in runStats) / len(runStats)))
+
+    def run_scenarios(iddfile, inputs, nThreads, epws, storeRoot, deduplicate = False,
+                      weatherDir = None):
+        """
+        Simulates all the buildings of the dataset with several weather files.
+
+        The model of each building is built once, without its site location,
+        then every (building, weather file) pair is simulated over the pool 
+        of processes. The models are built with the text templates, which 
+        give the same idf text as eppy.
+        The results of each weather file are written to their own store, and
+        pairs already in the stores are not run again.
+
+        parameters
+        ----------
+        iddfile: str
+            Path to the EnergyPlus idd file.
+
+        inputs: dict
+            Inputs shared by all buildings (see Parallel.initializer).
+
+        nThreads: int
+            Number of worker processes.
+
+        epws: list
+            EnergyPlus weather files of the scenarios. The scenarios are named
+            by the weather files, and all weather files should have the first
+            day of the year, the leap year and the holidays of inputs['epw'].
+
+        storeRoot: str
+            Root directory of the stores of the scenarios, one store per
+            scenario in storeRoot/<scenario name>.
+
+        deduplicate: bool
+            Simulates identical buildings without adjacency or shading only once.
+
+        weatherDir: str
+            Directory of the parsed weather files (Weather.read).
+
+        output
+        ------
+        ARCHETYPE: list
+            Archetype of each building, in the order of the dataset.
+        """
+        df = inputs['df']
+        n = len(df)
+        ARCHETYPE = list(inputs['modelInputs'].archetype)
+
+        # The profiles, run period and compiled schedules of the models follow
+        # the calendar of the weather file of the inputs.
+        reference = Weather.read(inputs['epw'], weatherDir)
+        scenarios = []
+        for epw in epws:
+            weather = Weather.read(epw, weatherDir)
+            if ((weather.firstDayOfYear, weather.leapYear, weather.holidays) != 
+                (reference.firstDayOfYear, reference.leapYear, reference.holidays)):
+                raise ValueError('Calendar of %s different from %s' % (epw, inputs['epw']))
+            scenarios.append((Parallel.scenario_name(epw), os.path.abspath(epw), weather))
+
+        names = [name for name, _, _ in scenarios]
+        if len(set(names)) < len(names):
+            raise ValueError('Weather files of the scenarios with the same name: %s' % names)
+        stores = [os.path.join(storeRoot, name) for name in names]
+        metas = [Store.create(storeDir, df.buildingId) for storeDir in stores]
+        written = [Store.done(storeDir) for storeDir in stores]
+
+        # Buildings sharing a signature are grouped behind the first of them.
+        members = {idx: [idx] for idx in range(n)}
+        if deduplicate:
+            signatures = Parallel.signatures(df, inputs['gis'], inputs['modelInputs'],
+                                             inputs.get('adjacencyGraph'),
+                                             inputs.get('profileVariants', 1),
+                                             inputs.get('fidelity', 'standard'),
+                                             inputs.get('fidelityClasses'))
+            members = Parallel.groups(range(n), signatures)
+
+        # Pairs with a member missing from the store of the scenario, whose
+        # members keep no result of an earlier run.
+        jobs = [(idx, s) for idx in members for s in range(len(scenarios))
+                if not all(written[s][member] for member in members[idx])]
+        for s, storeDir in enumerate(stores):
+            Store.clear(storeDir, [member for idx, j in jobs if j == s
+                                   for member in members[idx]])
+        print ('Scenarios:', len(jobs), 'simulations of', len(members), 'models with',
+               len(scenarios), 'weather files')
+
+        cacheDir = inputs.get('cacheDir')
+        if cacheDir is not None:
+            Cache.evict(cacheDir, inputs['cacheSize'])
+
+        modelDir = os.path.join(inputs['runRoot'], 'models')
+        os.makedirs(modelDir, exist_ok=True)
+        inputs = dict(inputs, scenarios = scenarios, modelDir = modelDir)
+
+        start = time()
+        with Pool(nThreads, initializer=Parallel.initializer,
+                  initargs=(iddfile, inputs)) as p:
+            # The models of the buildings, once for all the scenarios.
+            failed = set()
+            for idx, arch, error in p.imap_unordered(Parallel.scenario_model,
+                                                     sorted(set(idx for idx, _ in jobs))):
+                if error is not None:
+                    failed.add(idx)
+                    print ('Building', idx, 'failed:', error)
+            jobs = [job for job in jobs if job[0] not in failed]
+            print ('Models of', len(set(idx for idx, _ in jobs)), 'buildings:',
+                   round(time() - start, 2), 'seconds')
+
+            done = 0
+            runStats = []
+            for idx, s, output, error, stats in p.imap_unordered(Parallel.scenario_run, jobs):
+                done += 1
+                if stats:
+                    runStats.append(stats)
+                if error is None:
+                    for member in members[idx]:
+                        Store.write(stores[s], metas[s], member, output)
+                print ('Building', idx, scenarios[s][0], 'failed' if error else 'done',
+                       '(%d / %d)' % (done, len(jobs)))
+
+        Parallel.run_report(runStats)
+
+        shutil.rmtree(modelDir, ignore_errors=True)
+        if cacheDir is not None:
+            Cache.evict(cacheDir, inputs['cacheSize'])
+
+        return ARCHETYPE
+
+    def scenario_name(epw):
+        """
+        Returns the name of the scenario of a weather file, i.e., the name of the file.
+        """
+        return os.path.splitext(os.path.basename(epw))[0]
+
+    def scenario_annual(storeRoot, epws):
+        """
+        Annual sums of the buildings in each scenario, side by side.
+
+        parameters
+        ----------
+        storeRoot: str
+            Root directory of the stores of the scenarios (Parallel.run_scenarios).
+
+        epws: list
+            EnergyPlus weather files of the scenarios.
+
+        output
+        ------
+        pd.DataFrame
+            buildingId, then the annual sums (Store.annual) of each scenario,
+            named variable:scenario.
+        """
+        annual = []
+        for epw in epws:
+            sums = Store.annual(os.path.join(storeRoot, Parallel.scenario_name(epw)))
+            buildingId = sums.pop('buildingId')
+            sums.columns = ['%s:%s' % (variable, Parallel.scenario_name(epw))
+                            for variable in sums.columns]
+            annual.append(sums)
+
+        annual = pd.concat(annual, axis=1)
+        annual.insert(0, 'buildingId', buildingId)
+        return annual
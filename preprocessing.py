@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Fri Oct  9 11:05:36 2026
+
+Whole-stock preprocessing of the model inputs of the buildings.
+"""
+
+import numpy as np
+import pandas as pd
+import shapely
+
+from archetype import Archetype
+from geometry import Geometry
+from zoning import oneZone
+from shading import Shading
+
+
+class Preprocessing:
+    def __init__(self, df):
+        self.df = df
+
+    def perimeter(geometry, minLength = 2):
+        """
+        Computes the perimeter of the walls longer than minLength for all footprints.
+
+        parameters
+        ----------
+        geometry: np.array of shapely polygons
+            Building footprints.
+
+        minLength: float
+            Minimum length of a wall (m) with windows.
+
+        output
+        ------
+        np.array
+            Perimeter (m) of each footprint.
+        """
+        coords, index = shapely.get_coordinates(shapely.get_exterior_ring(geometry),
+                                                return_index = True)
+        edges = np.hypot(*np.diff(coords, axis=0).T)
+
+        # Consecutive points of the same ring are the edges of the footprint.
+        same = index[1:] == index[:-1]
+        edges, owner = edges[same], index[1:][same]
+
+        return np.bincount(owner, weights = edges * (edges > minLength),
+                           minlength = len(geometry))
+
+    def model_inputs(df, floorHeight = 2.5):
+        """
+        Derives the model inputs of all buildings of the dataset in one pass.
+
+        parameters
+        ----------
+        df: gpd.GeoDataFrame
+            GIS data of the buildings.
+
+        floorHeight: float
+            Floor to floor height (m) of buildings with known number of floors.
+
+        output
+        ------
+        pd.DataFrame
+            One row of typed model inputs per building, in the order of df.
+            Buildings outside all archetypes are flagged by validArchetype,
+            with archetype 0. The density of the property of each building
+            (Shading.density_table) is attached as bcr, far and shading.
+        """
+        geometry = df.geometry.values
+
+        # Main type, archetype and infiltration from the archetype table.
+        mainType, arch, infFlow, valid = Archetype.assign_archetypes(df.buildingType.values,
+                                                                     df.constructionYear.values)
+
+        # Height of the building and number of on ground floors.
+        basementInfo = df.heatedBasement.values
+        floors = df.heatedFloors.values.astype(float)
+        height = np.where(floors != 0,
+                          floors * floorHeight + (basementInfo != 0),
+                          df.buildingHeight.values)
+        floors = np.where(floors != 0, floors, np.round(height/2.8))
+
+        area = shapely.area(geometry)
+        perimeter = Preprocessing.perimeter(geometry)
+
+        windowAreaBBR = np.round(area * floors * 0.1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            wwr = windowAreaBBR/(perimeter * floors * floorHeight)
+
+        heatRecovery = (df.ventilationType.values == 'FTX').astype(int)
+
+        density = Shading.density_table(df).reindex(df.propertyCode.values)
+
+        return pd.DataFrame({'buildingId': df.buildingId.values,
+                             'propertyCode': df.propertyCode.values,
+                             'mainType': pd.Categorical(mainType,
+                                                        categories = ['Apartment', 'House']),
+                             'archetype': arch,
+                             'validArchetype': valid,
+                             'basementInfo': basementInfo.astype(int),
+                             'area': area.astype(float),
+                             'height': height.astype(float),
+                             'floors': floors.astype(float),
+                             'perimeter': perimeter,
+                             'wwr': wwr.astype(float),
+                             'heatRecovery': heatRecovery,
+                             'heatRecoveryEffect': np.where(heatRecovery == 1, 0.5, 0.0),
+                             'infFlow': infFlow,
+                             'bcr': density.bcr.values,
+                             'far': density.far.values,
+                             'shading': density.shading.fillna(0).values.astype(int)})
+
+    def shared_walls(df, adjacencyGraph, tolerance = 0.2, minShare = 0.5):
+        """
+        Classifies the walls of all buildings of the dataset against their neighbors.
+
+        parameters
+        ----------
+        df: gpd.GeoDataFrame
+            GIS data of the buildings.
+
+        adjacencyGraph: gpd.GeoDataFrame
+            Adjacency graph of the stock (Adjacency.graph).
+
+        tolerance, minShare: float
+            As in oneZone.shared_walls.
+
+        output
+        ------
+        pd.DataFrame
+            One row per wall of the footprints reconstructed by
+            Geometry.global_geometry, as written in the idfs: buildingId,
+            wall number, length (m), shared length (m) and adiabatic flag.
+        """
+        footprints = [Geometry.global_geometry(shapely.Polygon(g)) for g in df.geometry.values]
+
+        # Buildings of each edge of the graph, found by buildingId as in Adjacency.neighbors.
+        edges = pd.DataFrame({'buildingId': df.buildingId.values,
+                              'owner': np.arange(len(df))}).merge(
+                pd.DataFrame({'buildingId': adjacencyGraph.buildingId.values,
+                              'edge': np.arange(len(adjacencyGraph))}), on = 'buildingId')
+
+        shared, adiabatic = oneZone.shared_walls(footprints,
+                                                 adjacencyGraph.geometry.values[edges.edge.values],
+                                                 edges.owner.values, tolerance, minShare)
+
+        coords, ring = shapely.get_coordinates(shapely.get_exterior_ring(footprints),
+                                               return_index = True)
+        start = np.flatnonzero(ring[1:] == ring[:-1])
+        first = np.searchsorted(ring, ring[start])
+
+        return pd.DataFrame({'buildingId': df.buildingId.values[ring[start]],
+                             'wall': start - first,
+                             'length': np.hypot(*(coords[start + 1] - coords[start]).T),
+                             'sharedLength': shared,
+                             'adiabatic': adiabatic})
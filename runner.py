@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 11:20:48 2026
+
+Runner of the EnergyPlus binary in the run directory of a building, with a
+wall-clock timeout and a bounded number of retries.
+
+Each run gives a RunResult with its outcome, run time and failure reason,
+including the severe and fatal errors of the eplusout.err file.
+
+Usage (runs a saved idf):
+    python runner.py runs/building0/in.idf --epw inputs/SWE_Stockholm.Arlanda.024600_IWEC.epw
+        --idd C:/EnergyPlusV9-2-0/Energy+.idd --timeout 600
+"""
+
+import os
+import sys
+import shutil
+import argparse
+import subprocess
+from time import time
+from collections import namedtuple
+
+
+# Outcome of an EnergyPlus run: status ('done', 'failed' or 'timeout'), wall-clock
+# run time of all attempts (s), number of attempts, return code of the last
+# attempt, failure reason (the first severe error, None if done), severe and
+# fatal errors of the err file, and the end of the standard output and error
+# of the last attempt.
+RunResult = namedtuple('RunResult', ['status', 'runTime', 'attempts', 'returnCode', 'reason',
+                                     'errors', 'stdout', 'stderr'])
+
+# Characters of the standard output and error kept in a RunResult.
+tailSize = 2000
+
+
+class SimulationError(Exception):
+    """
+    EnergyPlus run that did not complete, with its RunResult.
+    """
+    def __init__(self, result):
+        super().__init__(result.reason)
+        self.result = result
+
+
+class Runner:
+    def __init__(self, iddfile, timeout, retries):
+        self.iddfile = iddfile
+        self.timeout = timeout
+        self.retries = retries
+
+    def executable(iddfile):
+        """
+        Returns the EnergyPlus binary installed with an idd file, or else found
+        on the path.
+        """
+        name = 'energyplus.exe' if sys.platform.startswith('win') else 'energyplus'
+        binary = os.path.join(os.path.dirname(os.path.abspath(iddfile)), name)
+        if os.path.isfile(binary):
+            return binary
+        binary = shutil.which('energyplus')
+        if binary is None:
+            raise FileNotFoundError('EnergyPlus binary not found next to %s or on the path'
+                                    % iddfile)
+        return binary
+
+    def command(idfPath, epw, runDir, iddfile, readvars = False):
+        """
+        Returns the command line of an EnergyPlus run.
+        """
+        command = [Runner.executable(iddfile), '--weather', os.path.abspath(epw),
+                   '--output-directory', os.path.abspath(runDir),
+                   '--idd', os.path.abspath(iddfile)]
+        if readvars:
+            command.append('--readvars')
+        return command + [os.path.abspath(idfPath)]
+
+    def err_summary(runDir):
+        """
+        Reads the severe and fatal errors of the err file of a run.
+
+        output
+        ------
+        errors: list
+            Severe and fatal error lines, with their continuation lines.
+        completed: bool
+            True if EnergyPlus reported a successful completion.
+        """
+        fileName = os.path.join(runDir, 'eplusout.err')
+        if not os.path.isfile(fileName):
+            return [], False
+
+        errors = []
+        completed = False
+        with open(fileName, 'r', errors = 'replace') as f:
+            for line in f:
+                line = line.strip()
+                if 'EnergyPlus Completed Successfully' in line:
+                    completed = True
+                elif line.startswith('** Severe  **') or line.startswith('**  Fatal  **'):
+                    errors.append(line)
+                elif line.startswith('**   ~~~   **'):
+                    if errors and errors[-1] is not None:
+                        errors[-1] += ' ' + line[13:].strip()
+                elif line.startswith('**'):
+                    # Continuation lines of warnings are not kept.
+                    if errors and errors[-1] is not None:
+                        errors.append(None)
+
+        return [e for e in errors if e is not None], completed
+
+    def run(idfPath, epw, runDir, iddfile, timeout = None, retries = 0, readvars = False):
+        """
+        Runs EnergyPlus in the run directory of a building.
+
+        A run that times out or stops without a severe error (e.g., a crash)
+        is tried again, up to retries times. A run with severe errors is
+        not, as the model would fail again.
+
+        parameters
+        ----------
+        idfPath: str
+            Idf file saved in the run directory.
+
+        epw: str
+            EnergyPlus weather file.
+
+        runDir: str
+            Directory where EnergyPlus writes its output.
+
+        iddfile: str
+            Path to the EnergyPlus idd file, next to the EnergyPlus binary.
+
+        timeout: float
+            Wall-clock time limit of each attempt (s), None for no limit.
+
+        retries: int
+            Number of retries after a failed attempt.
+
+        readvars: bool
+            Runs ReadVarsESO after the simulation (Output.run_options).
+
+        output
+        ------
+        RunResult
+        """
+        command = Runner.command(idfPath, epw, runDir, iddfile, readvars)
+
+        start = time()
+        for attempt in range(1, retries + 2):
+            # The err file of an earlier attempt is not read again.
+            if os.path.isfile(os.path.join(runDir, 'eplusout.err')):
+                os.remove(os.path.join(runDir, 'eplusout.err'))
+            try:
+                process = subprocess.run(command, cwd = runDir, capture_output = True,
+                                         text = True, errors = 'replace', timeout = timeout)
+                returnCode, stdout, stderr = process.returncode, process.stdout, process.stderr
+                errors, completed = Runner.err_summary(runDir)
+                if returnCode == 0 and completed:
+                    status, reason = 'done', None
+                else:
+                    status = 'failed'
+                    reason = (errors[0] if errors else
+                              'EnergyPlus stopped with return code %d' % returnCode)
+            except subprocess.TimeoutExpired as e:
+                # The process is killed by subprocess.run before the exception.
+                returnCode = None
+                stdout = e.stdout.decode(errors = 'replace') if isinstance(e.stdout, bytes) else e.stdout
+                stderr = e.stderr.decode(errors = 'replace') if isinstance(e.stderr, bytes) else e.stderr
+                errors, _ = Runner.err_summary(runDir)
+                status, reason = 'timeout', 'EnergyPlus timed out after %g s' % timeout
+
+            if status == 'done' or (status == 'failed' and errors):
+                break
+
+        return RunResult(status = status, runTime = time() - start, attempts = attempt,
+                         returnCode = returnCode, reason = reason, errors = errors,
+                         stdout = (stdout or '')[-tailSize:], stderr = (stderr or '')[-tailSize:])
+
+    def stats(result):
+        """
+        Summary of a RunResult for the journal, without the standard output.
+        """
+        return dict(status = result.status, runTime = result.runTime,
+                    attempts = result.attempts, returnCode = result.returnCode,
+                    reason = result.reason, severeErrors = len(result.errors))
+
+
+def main():
+    parser = argparse.ArgumentParser(description = 'Runs an idf with EnergyPlus.')
+    parser.add_argument('idf', help = 'idf file, run in its directory')
+    parser.add_argument('--epw', default = 'inputs/SWE_Stockholm.Arlanda.024600_IWEC.epw')
+    parser.add_argument('--idd', default = 'C:/EnergyPlusV9-2-0/Energy+.idd')
+    parser.add_argument('--timeout', type = float, default = None)
+    parser.add_argument('--retries', type = int, default = 0)
+    args = parser.parse_args()
+
+    result = Runner.run(args.idf, args.epw, os.path.dirname(os.path.abspath(args.idf)),
+                        args.idd, args.timeout, args.retries)
+    print('%s in %.1f s (%d attempts)' % (result.status, result.runTime, result.attempts))
+    if result.reason is not None:
+        print('Reason:', result.reason)
+    for error in result.errors:
+        print(error)
+
+
+if __name__ == '__main__':
+    main()
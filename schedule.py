@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 21:14:09 2026
+
+Compiler of the hourly occupancy profiles into Schedule:Compact objects.
+
+The profiles of Initials.profiles repeat a weekday and a weekend day for each
+month. Such a profile is written as a Schedule:Compact of at most twelve
+periods instead of a Schedule:File of 8760 rows that EnergyPlus reads at the
+start of every run. A compiled schedule is expanded again with the calendar
+of the run period and kept only if it is equal to the profile hour by hour.
+Other profiles (e.g., the stochastic variants) stay in Schedule:File.
+
+Usage (startup time of EnergyPlus with the profile files and the compiled schedules):
+    python schedule.py --idd C:/EnergyPlusV9-2-0/Energy+.idd --buildings 5 --repeat 3
+"""
+
+import os
+import shutil
+import argparse
+from time import time
+
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+from shapely import wkt
+from shapely.geometry.polygon import Polygon
+from eppy.modeleditor import IDF
+
+from occupancy import Initials
+from construction import Construction
+from template import Template
+from weather import Weather
+from runner import Runner, SimulationError
+
+
+# Days of each month of the calendar year, by leap year.
+monthDays = {leapYear: [31, 28 + leapYear, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
+             for leapYear in (0, 1)}
+
+
+class Schedule:
+    def __init__(self, values, firstDayWeek, leapYear):
+        self.values = values
+        self.firstDayWeek = firstDayWeek
+        self.leapYear = leapYear
+
+    def day_fields(day):
+        """
+        Returns the 'Until' fields of a daily profile, one per change of value.
+        """
+        fields = []
+        for h in range(24):
+            if h == 23 or day[h + 1] != day[h]:
+                fields += ['Until: %02d:00' % (h + 1), repr(float(day[h]))]
+        return fields
+
+    def compile(values, firstDayWeek, leapYear):
+        """
+        Compiles an hourly profile into the fields of a Schedule:Compact.
+
+        parameters
+        ----------
+        values: np.array
+            Hourly profile of a calendar year.
+        firstDayWeek: str
+            First day of the run period, i.e., Monday, Tuesday, or etc.
+        leapYear: int
+            1 if calendar year is a leap year, 0 if it is not.
+
+        output
+        ------
+        list
+            Fields of the Schedule:Compact after the schedule type limits,
+            None if the profile is not the same on the weekdays and on the
+            weekends of each month, or differs from its schedule.
+        """
+        values = np.asarray(values, dtype = float)
+        if values.ndim != 1 or len(values) != 24 * (365 + leapYear):
+            return None
+        weekend, month = Initials.calendar(firstDayWeek, leapYear)
+        days = values.reshape(-1, 24)
+
+        # Weekday and weekend of each month, consecutive months with the same
+        # days in the same period.
+        periods = []
+        for m in range(12):
+            pair = []
+            for dayType in (False, True):
+                d = days[(month == m) & (weekend == dayType)]
+                if not (d == d[0]).all():
+                    return None
+                pair.append(d[0])
+            if periods and all((a == b).all() for a, b in zip(periods[-1][1], pair)):
+                periods[-1][0] = m
+            else:
+                periods.append([m, pair])
+
+        fields = []
+        for m, (weekday, weekendDay) in periods:
+            fields.append('Through: %d/%d' % (m + 1, monthDays[leapYear][m]))
+            fields += ['For: Weekdays'] + Schedule.day_fields(weekday)
+            fields += ['For: AllOtherDays'] + Schedule.day_fields(weekendDay)
+
+        # The compiled schedule is only used if it gives the profile back.
+        if not np.array_equal(Schedule.expand(fields, firstDayWeek, leapYear), values):
+            return None
+
+        return fields
+
+    def expand(fields, firstDayWeek, leapYear):
+        """
+        Hourly values of the fields of a Schedule:Compact made by Schedule.compile,
+        with the calendar of the run period.
+
+        output
+        ------
+        np.array
+            Value of each hour of the calendar year.
+        """
+        weekend, month = Initials.calendar(firstDayWeek, leapYear)
+        dayOfMonth = np.concatenate([np.arange(1, n + 1) for n in monthDays[leapYear]])
+        days = np.full((365 + leapYear, 24), np.nan)
+
+        start = 0
+        for field, value in zip(fields, fields[1:] + [None]):
+            keyword, _, rest = field.partition(':')
+            if keyword == 'Through':
+                m, d = (int(x) for x in rest.split('/'))
+                end = np.flatnonzero((month == m - 1) & (dayOfMonth == d))[0] + 1
+                period = np.zeros(len(days), dtype = bool)
+                period[start:end] = True
+                start = end
+            elif keyword == 'For':
+                selected = period & (weekend if 'AllOtherDays' in rest else ~weekend)
+                hour = 0
+            elif keyword == 'Until':
+                until = int(rest.split(':')[0])
+                days[selected, hour:until] = float(value)
+                hour = until
+
+        return days.ravel()
+
+    def compile_profiles(profiles, firstDayWeek, leapYear):
+        """
+        Compiles the profiles of all types of buildings.
+
+        parameters
+        ----------
+        profiles: dict
+            Profiles of each main type of buildings (Initials.profiles), or
+            their variants (Initials.stochastic_profiles).
+        firstDayWeek: str
+            First day of the run period, i.e., Monday, Tuesday, or etc.
+        leapYear: int
+            1 if calendar year is a leap year, 0 if it is not.
+
+        output
+        ------
+        dict
+            Fields of the compiled schedule of each profile, by main type of
+            buildings and file name. Profiles that are not compiled are left
+            out and stay in their profile files.
+        """
+        schedules = {}
+        for building, buildingProfiles in profiles.items():
+            schedules[building] = {}
+            for profile, values in buildingProfiles.items():
+                fields = Schedule.compile(values, firstDayWeek, leapYear)
+                if fields is not None:
+                    schedules[building][profile] = fields
+
+        return schedules
+
+
+def main():
+    parser = argparse.ArgumentParser(description = 'Startup time of EnergyPlus with '
+                                     'the profile files and the compiled schedules.')
+    parser.add_argument('--idd', default = 'C:/EnergyPlusV9-2-0/Energy+.idd')
+    parser.add_argument('--epw', default = 'inputs/SWE_Stockholm.Arlanda.024600_IWEC.epw')
+    parser.add_argument('--data', default = 'inputs/exampleData.csv')
+    parser.add_argument('--buildings', type = int, default = 5)
+    parser.add_argument('--repeat', type = int, default = 3)
+    parser.add_argument('--runRoot', default = 'runs/schedule')
+    args = parser.parse_args()
+
+    from preprocessing import Preprocessing
+
+    IDF.setiddname(args.idd)
+    df = pd.read_csv(args.data)
+    df['geometry'] = df['geometry'].apply(wkt.loads)
+    df = gpd.GeoDataFrame(df, crs='epsg:3006')
+    df = df.drop([c for c in df.columns if c.startswith('Unnamed')], axis = 1)
+    parameters = pd.read_csv('inputs/parameters.txt', sep = ',', header = 'infer',
+                             encoding= 'ANSI')
+    epw = os.path.abspath(args.epw)
+    weather = Weather.read(epw)
+
+    # Profiles of the two main types of buildings, as in UBEM.py.
+    occupancyInputs = pd.read_csv('inputs/occupancyInputs.csv', sep = ';', low_memory = False)
+    buildings = ['Apartment', 'House']
+    profiles = {}
+    for i in range(2):
+        profiles[buildings[i]], maxFlowHotWater = Initials.profiles(
+            occupancyInputs.iloc[:,2*i:2*i+2], occupancyInputs.iloc[:,2*i+4:2*i+6],
+            occupancyInputs.iloc[:,2*i+8:2*i+10], occupancyInputs.iloc[:,2*i+12:2*i+14],
+            occupancyInputs.iloc[:,(24*i+20):(23*i+45)],
+            weather.firstDayOfYear, weather.leapYear)
+    profileDir = Initials.profile_directory(profiles, os.path.join(args.runRoot, 'profiles'))
+    schedules = Schedule.compile_profiles(profiles, weather.firstDayOfYear, weather.leapYear)
+    print('Compiled schedules:', {b: sorted(s) for b, s in schedules.items()})
+
+    modelInputs = Preprocessing.model_inputs(df)
+    rows = []
+    for idx in np.flatnonzero(modelInputs.validArchetype.values)[:args.buildings]:
+        b = modelInputs.iloc[idx]
+        material_idf = Construction.load(b.archetype)
+        row = dict(building = idx)
+        for name, compiled in [('file', None), ('compact', schedules)]:
+            idf = Template.building_idf(Polygon(df.geometry.iloc[idx]), b.area, b.height,
+                                        b.buildingId, b.basementInfo, epw, b.wwr,
+                                        material_idf, df, parameters.hotWaterTemp[0],
+                                        parameters.coldWaterTemp[0], maxFlowHotWater,
+                                        b.mainType, b.heatRecovery, b.heatRecoveryEffect,
+                                        b.infFlow, df, idx, b.propertyCode, profileDir,
+                                        schedules = compiled,
+                                        firstDayWeek = weather.firstDayOfYear,
+                                        weather = weather)
+            runDir = os.path.abspath(os.path.join(args.runRoot, '%s%d' % (name, idx)))
+            os.makedirs(runDir, exist_ok = True)
+            idf.saveas(os.path.join(runDir, 'in.idf'))
+            row['%sInput' % name] = (os.path.getsize(idf.idfname) +
+                                     sum(os.path.getsize(f) for f in idf.scheduleFiles)) / 1024
+
+            # The models only differ by their schedules, so does their run time.
+            t0 = time()
+            for _ in range(args.repeat):
+                result = Runner.run(idf.idfname, epw, runDir, args.idd)
+                if result.status != 'done':
+                    raise SimulationError(result)
+            row[name] = (time() - t0) / args.repeat
+            shutil.rmtree(runDir, ignore_errors = True)
+        rows.append(row)
+
+    rows = pd.DataFrame(rows)
+    rows['saved'] = rows['file'] - rows['compact']
+    print(rows.round(3).to_string(index = False))
+    print('Run time saved per building: mean %.3f s (%.1f%%), %.0f kB less input'
+          % (rows.saved.mean(), 100 * rows.saved.mean() / rows['file'].mean(),
+             (rows.fileInput - rows.compactInput).mean()))
+
+if __name__ == '__main__':
+    main()
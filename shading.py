@@ -5,12 +5,14 @@ Created on Mon Jun 27 13:00:38 2022
 @author: fatjo876
 """
 
+import shapely
 from shapely import affinity
 from shapely.geometry import LineString
+from shapely.geometry.polygon import orient
 import io
 from eppy.modeleditor import IDF
 import numpy as np
-import geopandas as gpd
+import pandas as pd
 
 class Shading:
     def __init__(self, propertyCode, df, gis, idx):
@@ -20,7 +22,30 @@ class Shading:
         self.idx = idx
 
 
-    def densification(df, propertyCode):
+    def densification(df, propertyCode, densityTable = None):
+        """
+        Decides if the buildings of a property are shaded, i.e., if the 
+        property is dense (FAR > 1 and BCR > 0.3).
+        
+        parameters
+        ----------
+        df: gpd.GeoDataFrame
+            GIS data of the city
+            
+        propertyCode: str
+            Property of the building.
+            
+        densityTable: pd.DataFrame
+            Density of all properties (Shading.density_table), looked up
+            instead of computing the density of the property from df.
+            
+        output
+        ------
+        int
+            1 if the buildings of the property are shaded, 0 otherwise.
+        """
+        if densityTable is not None:
+            return int(densityTable.shading.get(propertyCode, 0))
 
         building = df[df['propertyCode'] == propertyCode].reset_index(drop=True)
         
@@ -39,76 +64,147 @@ class Shading:
         else:
             return 0
              
+    def density_table(df):
+        """
+        Computes the density of all the properties of the stock at once,
+        with the same rules as Shading.densification.
         
-    def shading(df, gis):
+        parameters
+        ----------
+        df: gpd.GeoDataFrame
+            GIS data of the city
+            
+        output
+        ------
+        pd.DataFrame
+            BCR, FAR and shading flag (1 if shaded) of each propertyCode.
+        """
+        area = df.area.values
+        prop = pd.DataFrame({'propertyCode': df.propertyCode.values,
+                             'propertyArea': df.propertyArea.values,
+                             'area': area,
+                             'floorArea': area * np.round(df.buildingHeight.values/2.8)})
         
-
+        table = prop.groupby('propertyCode', sort = False)[['propertyArea', 'area',
+                                                             'floorArea']].sum()
         
-        #shadingDistance = df['modifiedHeight'][0]/np.tan(np.radians(15))
-        shadingDistance = 100
-        building = df
-        gdf = building.geometry.values
-        line = LineString([(gdf.centroid.x[0],gdf.centroid.y[0]),
-                           (gdf.centroid.x[0]+shadingDistance,gdf.centroid.y[0])])
-        
-        # Rotate i degrees CCW from origin at point (step 10°)
-        radii= [affinity.rotate(line, i, (gdf.centroid.x[0],
-                                          gdf.centroid.y[0])) for i in range(0,360,5)]
-        #mergedradii = cascaded_union(radii)
-        radius = gpd.GeoDataFrame()
-        radius['geometry']= radii
-        radius = radius.set_crs('EPSG:3006')
-
+        # The property area of the first building of the property decides.
+        first = prop.drop_duplicates('propertyCode').set_index('propertyCode').propertyArea
+        with np.errstate(divide='ignore', invalid='ignore'):
+            table['bcr'] = table.area / table.propertyArea
+            table['far'] = table.floorArea / table.propertyArea
+        table['shading'] = ((first.reindex(table.index) > 0) & (table.far > 1) &
+                            (table.bcr > 0.3)).astype(int)
         
-        shading = gpd.GeoDataFrame()
-        for i in range(len(radius)):
-            
-            intersect = gpd.overlay(radius.iloc[i:i+1],gis,how='intersection')           
-            intersect = intersect.drop_duplicates(subset = 'buildingId')
-            
+        return table[['bcr', 'far', 'shading']]
+        
+    def shading(df, gis, shadingDistance = 100, step = 5, minDistance = 0.2):
+        """
+        Finds the shading buildings of the first building of df.
+        
+        Rays of shadingDistance are cast from the centroid of the building
+        every step degrees. The nearest building hit by each ray, at least
+        minDistance away from the building, is a shading obstacle. The 
+        candidates are queried once from the spatial index of gis, and all 
+        the rays are intersected with them at once.
+        
+        parameters
+        ----------
+        df: gpd.GeoDataFrame
+            GIS data, the building is the first row.
+        
+        gis: gpd.GeoDataFrame
+            GIS dataset.
             
-            shadingObstacle = gpd.GeoDataFrame()
-            for b in intersect.index:
-                a = gis[gis['buildingId'] == intersect.buildingId[b]]
-                shadingObstacle = shadingObstacle.append(a)
+        output
+        ------
+        building: gpd.GeoDataFrame
+            First row of df, with the polygon and height of each shading
+            building in the columns shadingPolygon%d and shadingHeight%d.
             
-
-            distance = []
-            for k in shadingObstacle.index:
-               distance.append( building.geometry[0].distance(shadingObstacle.geometry[k]))
-   
-            shadingObstacle['distance']=distance
-            shadingObstacle = shadingObstacle[shadingObstacle['distance']>=0.2]
-            
-            if len(shadingObstacle)>0:
-
-                shadingObstacle = shadingObstacle[shadingObstacle['distance']==np.min(shadingObstacle['distance'])]
-                shadingObstacle = shadingObstacle.reset_index(drop=True)
-                
-                shading = shading.append(shadingObstacle)
-                
-        shading = shading.drop_duplicates(subset=['buildingId'])    
-        shading = shading.reset_index(drop=True)
+        int
+            Number of shading buildings.
+        """
+        #shadingDistance = df['modifiedHeight'][0]/np.tan(np.radians(15))
+        building = df.iloc[:1].copy().reset_index(drop=True)
+        footprint = building.geometry[0]
+        center = footprint.centroid
+        line = LineString([(center.x, center.y), (center.x + shadingDistance, center.y)])
         
+        # Rotate i degrees CCW from origin at the centroid.
+        radii = np.array([affinity.rotate(line, i, (center.x, center.y))
+                          for i in range(0, 360, step)])
         
+        # Buildings within reach of the rays, then the hits of every ray. Rays
+        # only touching a building at a point do not hit it, as with gpd.overlay.
+        candidates = np.sort(gis.sindex.query(center, predicate = 'dwithin',
+                                              distance = shadingDistance))
+        geometry = np.asarray(gis.geometry.values)[candidates]
+        ray, hit = np.nonzero(shapely.intersects(radii[:, None], geometry[None, :]))
+        lineHit = shapely.length(shapely.intersection(radii[ray], geometry[hit])) > 0
+        ray, hit = ray[lineHit], candidates[hit[lineHit]]
         
-        for i in shading.index:
-            shadingGeo = shading.geometry[i]
-            shadingHeight = shading.buildingHeight[i]
-            shadingPolygon =str("shadingPolygon%d"%i)
-            shadingH = str("shadingHeight%d"%i)
+        # All rows of the buildings hit, with their distance to the building.
+        ids = gis.buildingId.values
+        rows = np.flatnonzero(np.isin(ids, ids[hit]))
+        distance = dict(zip(rows, shapely.distance(footprint, gis.geometry.values[rows])))
+        rowsOf = {}
+        for r in rows:
+            rowsOf.setdefault(ids[r], []).append(r)
+        
+        # Nearest buildings of each ray, in the order of the rays.
+        selected = []
+        for i in range(len(radii)):
+            hitIds = dict.fromkeys(ids[hit[ray == i]])
+            obstacles = [r for b in hitIds for r in rowsOf[b] if distance[r] >= minDistance]
+            if obstacles:
+                nearest = min(distance[r] for r in obstacles)
+                selected += [r for r in obstacles if distance[r] == nearest]
+        
+        shading = gis.iloc[selected].drop_duplicates(subset=['buildingId'])
+        shading = shading.reset_index(drop=True)
         
-            building[shadingPolygon] = shadingGeo
-            building[shadingH]= shadingHeight
+        for i in shading.index:
+            building["shadingPolygon%d"%i] = [shading.geometry[i]]
+            building["shadingHeight%d"%i] = shading.buildingHeight[i]
                 
         return building, len(shading)
 
 
 
-    def shading_idf(building, d):
+    def shading_idf(building, d, minElevation = None):
+        text, before, after = Shading.shading_text(building, d, minElevation)
+        fhandle = io.StringIO(text) 
+        idfShading = IDF(fhandle) 
+       
+        return idfShading, before, after
+
+    def shading_text(building, d, minElevation = None):
+        """
+        Writes the idf text of the shading buildings found by Shading.shading.
+        
+        With a minimum elevation angle, the facets of the shading buildings
+        are reduced first (Shading.shading_facets) and written as one
+        surface each (Shading.facets_text).
+        
+        output
+        ------
+        str
+            idf text of the shading surfaces.
+            
+        before, after: int
+            Number of facets of the shading buildings before and after the 
+            reduction, the same without a minimum elevation angle.
+        """
+        if minElevation is not None:
+            facets, before = Shading.shading_facets(building, d, minElevation)
+            return Shading.facets_text(facets), before, len(facets)
+        
         shade = "" 
+        facets = 0
         for i in range(d):
             x,y = building['shadingPolygon%d'%i][0].exterior.xy
+            facets += len(x) - 1
             z0 = 0
             z1 = building['shadingHeight%d'%i][0]
             
@@ -130,9 +226,88 @@ class Shading:
                     str(x[-1])+',\n' + str(y[-1]) + ',\n' + str(z1) + ',\n' +
                     str(x[-1])+',\n' + str(y[-1]) + ',\n' + str(z1) + ',\n' +
                     str(x[-2])+',\n' + str(y[-2]) + ',\n' + str(z0) + ';\n' )               
-                
-            fhandle = io.StringIO(shade) 
-            idfShading = IDF(fhandle) 
        
-        return idfShading
+        return shade, facets, facets
+
+    def shading_facets(building, d, minElevation = 5, mergeTolerance = 0.1):
+        """
+        Reduces the facets of the shading buildings found by Shading.shading.
+        
+        Collinear facets of a footprint are merged, facets turning their
+        back to the building are dropped, and so are the shading buildings
+        seen from the building under the minimum elevation angle.
+        
+        parameters
+        ----------
+        building: gpd.GeoDataFrame
+            Building and its shading buildings (Shading.shading).
+            
+        d: int
+            Number of shading buildings.
+            
+        minElevation: float
+            Smallest elevation angle (degrees) of the top of a shading building,
+            seen from the ground at the nearest wall of the building.
+            
+        mergeTolerance: float
+            Largest deviation (m) of the merged vertices from a straight facet.
+            
+        output
+        ------
+        facets: np.array
+            x0, y0, x1, y1 and height of each facet, with the outside on the 
+            right of (x0, y0) to (x1, y1), and the shading building of the facet.
+            
+        before: int
+            Number of facets of the shading buildings before the reduction.
+        """
+        if d == 0:
+            return np.zeros((0, 6)), 0
+        target = building.geometry[0]
+        obstacles = np.array([building['shadingPolygon%d'%i][0] for i in range(d)], 
+                             dtype = object)
+        heights = np.array([building['shadingHeight%d'%i][0] for i in range(d)], 
+                           dtype = float)
+        before = int(np.sum(shapely.get_num_coordinates(shapely.get_exterior_ring(obstacles)) - 1))
+        
+        # Shading buildings under the minimum elevation angle are dropped.
+        distance = shapely.distance(target, obstacles)
+        visible = np.degrees(np.arctan2(heights, distance)) >= minElevation
+        
+        # Counterclockwise footprints, without the vertices of collinear facets.
+        footprints = shapely.simplify(obstacles[visible], mergeTolerance)
+        footprints = np.array([orient(p, 1.0) for p in footprints], dtype = object)
+        coords, owner = shapely.get_coordinates(shapely.get_exterior_ring(footprints),
+                                                return_index = True)
+        start = np.flatnonzero(owner[1:] == owner[:-1])
+        a, b = coords[start], coords[start + 1]
+        
+        # A facet faces the building if a vertex of the building is outside of it.
+        normal = np.stack([b[:, 1] - a[:, 1], a[:, 0] - b[:, 0]], axis = 1)
+        vertices = shapely.get_coordinates(target)
+        front = ((vertices[None, :, :] - a[:, None, :]) * normal[:, None, :]).sum(axis = 2)
+        facing = (front > 1e-9).any(axis = 1) & (np.hypot(*normal.T) > 0)
+        
+        number = np.flatnonzero(visible)[owner[start]]
+        facets = np.column_stack([a, b, heights[number], number])[facing]
+        
+        return facets, before
+
+    def facets_text(facets):
+        """
+        Writes the idf text of shading facets (Shading.shading_facets), 
+        one vertical surface per facet from the ground to the height of its
+        shading building.
+        """
+        shade = []
+        for f, (x0, y0, x1, y1, z1, i) in enumerate(facets.tolist()):
+            # Lower right corner first, counterclockwise seen from the outside.
+            vertices = [x1, y1, 0.0, x1, y1, z1, x0, y0, z1, x0, y0, 0.0]
+            shade.append('SHADING:BUILDING:DETAILED,\n' +
+                         'shadingBuilding%dFacet%d,\n' % (i, f) +
+                         ',\n' +
+                         '4,\n' +
+                         ',\n'.join(repr(v) for v in vertices) + ';\n')
+        
+        return ''.join(shade)
 
@@ -5,11 +5,13 @@ Created on Thu Apr 28 08:44:00 2022
 @author: fatjo876
 """
 
-import pandas as pd
-import numpy as np
+import os
 
+from eppy.modeleditor import IDF
 
 from base_idf import baseIDF
+from weather import Weather
+from fidelity import Fidelity
 from zoning import oneZone
 from hvac import HVAC
 from geometry import Geometry
@@ -17,6 +19,11 @@ from geometry import Geometry
 from occupancy import Occupancy
 from adjacency import Adjacency
 from shading import Shading
+from cache import Cache
+from construction import Construction
+from eso import SimulationOutput
+from output import Output
+from runner import Runner, SimulationError
 
 
 class Simulation:
@@ -24,7 +31,8 @@ class Simulation:
                  basementInfo, epw, wwr, 
                  material_idf,gis , hotWaterTemp, coldWaterTemp, 
                  maxFlowHotWater, buildingMainType, 
-                 heatRecovery, heatRecoveryEffect, infFlow, df, idx, propertyCode):
+                 heatRecovery, heatRecoveryEffect, infFlow, df, idx, propertyCode,
+                 profileDir):
         
         self.idf = idf
         self.buildingPolygon = buildingPolygon
@@ -46,13 +54,18 @@ class Simulation:
         self.gis = gis
         self.idx = idx
         self.propertyCode = propertyCode
+        self.profileDir = profileDir
 
         
     def building_idf (buildingPolygon, buildingArea, buildingHeight, buildingId, 
                       basementInfo,epw, wwr, material_idf, df,
                       hotWaterTemp, coldWaterTemp, maxFlowHotWater,
                       buildingMainType, heatRecovery, heatRecoveryEffect, infFlow, 
-                      gis, idx, propertyCode):
+                      gis, idx, propertyCode, profileDir = '', outputBackend = 'eso',
+                      adjacencyGraph = None, densityTable = None,
+                      shadingElevation = None, profileVariant = 0,
+                      schedules = None, firstDayWeek = 'Monday', weather = None,
+                      fidelity = 'standard', stats = None):
         """Creates a complete IDF from all the input variables and functions.
             
         parameters
@@ -75,8 +88,9 @@ class Simulation:
         wwr: float
             Window oto wall ratio of buildings.
             
-        material_idf: idf
-            Building construction and material found for each archetype.
+        material_idf: dict
+            Building construction and material found for each archetype
+            (Construction.load).
         
         basement_idf: idf
             Predefined specifications of the basement properties.
@@ -92,6 +106,45 @@ class Simulation:
            
         infFlow: int
             Infiltration flow rate (ACH)
+            
+        profileDir: str
+            Directory of the occupancy profile files, referenced by absolute path.
+            
+        outputBackend: str
+            Output backend read after the simulation ('eso', 'sqlite' or 'csv').
+            
+        adjacencyGraph: gpd.GeoDataFrame
+            Adjacency graph of the stock (Adjacency.graph), None to overlay
+            the building with the stock.
+            
+        densityTable: pd.DataFrame
+            Density of the properties (Shading.density_table), None to
+            compute the density of the property of the building.
+            
+        shadingElevation: float
+            Minimum elevation angle (degrees) of the reduced shading facets
+            (Shading.shading_facets), None to write the whole shading buildings.
+            
+        profileVariant: int
+            Variant of the occupancy profiles (Initials.stochastic_profiles).
+            
+        schedules: dict
+            Compiled schedules of the occupancy profiles (Schedule.compile_profiles),
+            None to read all the profile files.
+            
+        firstDayWeek: str
+            First day of the run period, the first day of the compiled schedules.
+            
+        weather: EPW
+            Parsed weather file (Weather.read), None to read it in this process.
+            
+        fidelity: str
+            Preset of the time step, solar distribution, shadow calculation
+            and convergence limits (fidelityPresets).
+            
+        stats: dict
+            Filled with the number of facets of the shading buildings before
+            and after the reduction (shadingFacets), None to leave them out.
                 
         output
         ------
@@ -108,10 +161,11 @@ class Simulation:
         idf = baseIDF.blank_idf(epw)
         
         # Add the main simulation parameters.
-        baseIDF.simulation_parameters(idf)
-        baseIDF.site_location(idf,epw)
-        baseIDF.simulation_period(idf)
-        baseIDF.simulation_output(idf)
+        timeStep, parameters = Fidelity.settings(fidelity)
+        baseIDF.simulation_parameters(idf, **parameters)
+        baseIDF.site_location(idf, (weather or Weather.read(epw)).location)
+        baseIDF.simulation_period(idf, timeStep = timeStep, firstDayWeek = firstDayWeek)
+        baseIDF.simulation_output(idf, outputBackend)
         
         # Specify the geometry rules.
         Geometry.global_geometry_rules (idf)
@@ -119,8 +173,11 @@ class Simulation:
         # Write the idf for a single-zone model.
         oneZone.zone (idf)
         
-        # Find the adjacent buildings
-        adj = Adjacency.adjacent_polygons(buildingPolygon, buildingId, df,gis)
+        # Find the adjacent buildings, looked up in the graph of the stock if given.
+        if adjacencyGraph is not None:
+            adj = Adjacency.neighbors(adjacencyGraph, buildingId)
+        else:
+            adj = Adjacency.adjacent_polygons(buildingPolygon, buildingId, df,gis)
 
         # Define the idf for construction and surfaces.
         surfaceidf = oneZone.onezone_building_surfaces(buildingPolygon, 
@@ -138,26 +195,8 @@ class Simulation:
         
 
                     
-        # Copy the construction and material from pre-defined archetype idfs.
-        for m in range (len(material_idf.idfobjects["Material"])):
-            idf.copyidfobject(material_idf.idfobjects["Material"][m]) 
-            
-        for ma in range (len(material_idf.idfobjects["MATERIAL:AIRGAP"])):
-            idf.copyidfobject(material_idf.idfobjects["MATERIAL:AIRGAP"][ma])         
-            
-            
-        for mgl in range (len(material_idf.idfobjects["WindowMaterial:SimpleGlazingSystem"])):
-            idf.copyidfobject(material_idf.idfobjects["WindowMaterial:SimpleGlazingSystem"][mgl])
-            
-        for c in range (len(material_idf.idfobjects["CONSTRUCTION"])):
-            idf.copyidfobject(material_idf.idfobjects["CONSTRUCTION"][c])
-            
-            
-        for mgl in range (len(material_idf.idfobjects["WINDOWMATERIAL:GLAZING"])):
-            idf.copyidfobject(material_idf.idfobjects["WINDOWMATERIAL:GLAZING"][mgl])
-       
-        for mgs in range (len(material_idf.idfobjects["WINDOWMATERIAL:GAS"])):
-            idf.copyidfobject(material_idf.idfobjects["WINDOWMATERIAL:GAS"][mgs])              
+        # Add the construction and material of the pre-defined archetype at once.
+        Construction.inject(idf, material_idf)
         
         # Add information of the HVAC system to the idf file.
         HVAC.ventilation(idf, 0.5, 'Exhaust', 'ZONE') 
@@ -181,24 +220,32 @@ class Simulation:
             
             
         # Add the infomation of the occupancy, gain and DHW to the idf file
-        Occupancy.people(idf,buildingArea, buildingHeight, buildingMainType)
-        Occupancy.equipment (idf, buildingArea, buildingHeight, buildingMainType)
+        schedules = schedules.get(buildingMainType) if schedules else None
+        Occupancy.people(idf,buildingArea, buildingHeight, buildingMainType,
+                         profileDir, profileVariant, schedules)
+        Occupancy.equipment (idf, buildingArea, buildingHeight, buildingMainType,
+                             profileDir, profileVariant, schedules)
         Occupancy.dhw (idf, buildingArea, buildingHeight, hotWaterTemp, 
-                       coldWaterTemp, maxFlowHotWater, buildingMainType)
+                       coldWaterTemp, maxFlowHotWater, buildingMainType,
+                       profileDir, profileVariant, schedules)
         
         # Add shading surfaces in case there is a shading building
-        shading = Shading.densification(df, propertyCode)
+        shading = Shading.densification(df, propertyCode, densityTable)
         if shading == 1:
             print('shading')
-            gdf, d  = Shading.shading(df, gis)
-            idfShading = Shading.shading_idf( gdf, d)
+            # Shading buildings around this building, the row idx of df.
+            gdf, d  = Shading.shading(df.iloc[[idx]], gis)
+            idfShading, before, after = Shading.shading_idf( gdf, d, shadingElevation)
+            if stats is not None:
+                stats['shadingFacets'] = [before, after]
             for obj in range(len(idfShading.idfobjects['SHADING:BUILDING:DETAILED'])):
                 idf.copyidfobject(idfShading.idfobjects['SHADING:BUILDING:DETAILED'][obj])
         
         return idf
 
 
-    def simulation (idf, basementInfo):
+    def simulation (idf, basementInfo, runDir = '.', cacheDir = None, backend = 'eso',
+                    stats = None, timeout = None, retries = 0):
         """
         Runs the idf file and reports the results in the output.
             
@@ -206,44 +253,61 @@ class Simulation:
         ----------
         idf:
             Completed idf file.
+            
+        runDir: str
+            Directory where the idf is saved and EnergyPlus writes its output.
+            
+        cacheDir: str
+            Directory of the result cache, None to always run EnergyPlus.
+            
+        backend: str
+            Output backend read after the run ('eso', 'sqlite' or 'csv'),
+            as chosen in Simulation.building_idf.
+            
+        stats: dict
+            Filled with the outcome of the run (Runner.stats), the size of the
+            output files and the parse time of the backend (Output.read), left
+            empty on a cache hit.
+            
+        timeout: float
+            Wall-clock time limit of each EnergyPlus attempt (s), None for no limit.
+            
+        retries: int
+            Number of retries of a run that timed out or crashed (Runner.run).
                 
         output
         ------       
-        spaceHeat: string
-            Hourly space heating demand.
-        
-        hotWater:
-            Hourly energy demand for DHW
-        
-        heatDemand:
-            Total houlry heat demand . 
+        SimulationOutput
+            Hourly ambient and room air temperatures, electricity use,
+            space heating and hot water demands of the building.
+            
+        Raises SimulationError, with the RunResult, if EnergyPlus fails.
         """ 
-        # Runs the idf file using eppy.run() function.        
-        idf.run()
-        
-        b = 1 if basementInfo > 0 else 0
-
-        # Reads hourly results of the space heating.
-        fout = 'eplusout.eso'
+        # Identical models are only simulated once: a cache hit skips EnergyPlus.
+        if cacheDir is not None:
+            key = Cache.key(idf, idf.epw)
+            output = Cache.get(cacheDir, key)
+            if output is not None:
+                return SimulationOutput(*output)
         
-
-        hourly = pd.read_csv(fout , sep = "[,\n]", skiprows=15+b,
-                             skipfooter = 2, usecols=[0,1], header=None,
-                             engine='python')
-        
-        ambientTemperature = np.array(hourly[hourly[0]==7][1])
-        roomAirTemperature = np.array(hourly[hourly[0]==81][1])
+        # Saves the idf in the run directory, so that parallel runs do not
+        # share any input or output file.
+        idf.saveas(os.path.join(runDir, 'in.idf'))
         
-        electricity = np.array(hourly[hourly[0]==22][1])
-        electricity  = electricity /3600000  # kWh/h       
+        # Runs EnergyPlus in the run directory, with a time limit and retries.
+        result = Runner.run(idf.idfname, idf.epw, runDir, IDF.iddname, timeout, retries,
+                            **Output.run_options(backend))
+        if stats is not None:
+            stats.update(Runner.stats(result))
+        if result.status != 'done':
+            raise SimulationError(result)
         
-        spaceHeat = np.array(hourly[(hourly[0]==295)|(hourly[0]==231)][1])
-        spaceHeat = spaceHeat/3600000  # kWh/h
+        # Reads the hourly results, found by name in the output of the backend.
+        output, backendStats = Output.read(runDir, backend)
+        if stats is not None:
+            stats.update(backendStats)
         
-        # Reads the hourly hot water use.
-        hotWater = np.array(hourly[(hourly[0]==457)|(hourly[0]==391)][1])
-        hotWater = hotWater/3600000  # kWh/h       
+        if cacheDir is not None:
+            Cache.put(cacheDir, key, output)
         
-        
-        return ambientTemperature, roomAirTemperature, electricity, spaceHeat, hotWater
-
+        return output
@@ -0,0 +1,295 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 18:05:44 2026
+
+Columnar store of the hourly results of a stock, written as buildings finish.
+
+The hourly series of the buildings are kept on disk in chunks of float32
+arrays (buildings x hours x variables), read back as memory maps. The series
+that only depend on the weather (the ambient temperature) are stored once.
+
+    storeDir/meta.json        buildingIds (index), variables, chunk size
+    storeDir/done.npy         1 for each building written to the store
+    storeDir/weather.npy      ambient temperature (hours)
+    storeDir/chunk00000.npy   hourly results of the first chunk of buildings
+
+Usage (annual sums of a store):
+    python store.py results/store --csv results/annual.csv
+"""
+
+import os
+import json
+import shutil
+import argparse
+
+import numpy as np
+import pandas as pd
+from numpy.lib.format import open_memmap
+
+from eso import SimulationOutput
+
+
+# Series of the simulation output stored for each building, in the order of
+# the last axis of the chunks. The ambient temperature is stored once.
+buildingVariables = ['roomAirTemperature', 'electricity', 'spaceHeat', 'hotWater']
+weatherVariable = 'ambientTemperature'
+
+
+class Store:
+    def __init__(self, storeDir):
+        self.storeDir = storeDir
+
+    def create(storeDir, buildingIds, chunkSize = 1024):
+        """
+        Creates an empty store for the buildings of a run, or opens the store
+        of the same buildings left by an interrupted run.
+
+        parameters
+        ----------
+        storeDir: str
+            Directory of the store.
+
+        buildingIds: list
+            Building IDs, in the order of the dataset.
+
+        chunkSize: int
+            Number of buildings per chunk file.
+
+        output
+        ------
+        dict
+            Metadata of the store.
+        """
+        meta = dict(buildingIds = [str(b) for b in buildingIds],
+                    variables = buildingVariables,
+                    chunkSize = int(chunkSize),
+                    dtype = 'float32')
+
+        try:
+            if Store.open(storeDir) == meta:
+                return meta
+        except (OSError, ValueError):
+            pass
+
+        # A store of other buildings is replaced.
+        shutil.rmtree(storeDir, ignore_errors=True)
+        os.makedirs(storeDir)
+        open_memmap(os.path.join(storeDir, 'done.npy'), mode='w+',
+                    dtype=np.uint8, shape=(len(buildingIds),)).flush()
+        with open(os.path.join(storeDir, 'meta.json'), 'w') as f:
+            json.dump(meta, f)
+
+        return meta
+
+    def open(storeDir):
+        """
+        Reads the metadata of a store.
+        """
+        with open(os.path.join(storeDir, 'meta.json'), 'r') as f:
+            return json.load(f)
+
+    def chunk_path(storeDir, chunk):
+        """
+        Returns the path of a chunk file.
+        """
+        return os.path.join(storeDir, 'chunk%05d.npy' % chunk)
+
+    def write(storeDir, meta, idx, output):
+        """
+        Writes the hourly results of a building to the store.
+
+        parameters
+        ----------
+        storeDir: str
+            Directory of the store.
+
+        meta: dict
+            Metadata of the store (Store.create).
+
+        idx: int
+            Index of the building in the dataset.
+
+        output: SimulationOutput
+            Hourly results of the building.
+
+        output
+        ------
+        None
+        """
+        output = SimulationOutput(*output)
+        hours = len(output.ambientTemperature)
+
+        weatherPath = os.path.join(storeDir, 'weather.npy')
+        if not os.path.isfile(weatherPath):
+            np.save(weatherPath, np.asarray(output.ambientTemperature, dtype=meta['dtype']))
+
+        # The chunk of the building is allocated on disk by its first building.
+        chunk, row = divmod(idx, meta['chunkSize'])
+        path = Store.chunk_path(storeDir, chunk)
+        if os.path.isfile(path):
+            data = open_memmap(path, mode='r+')
+        else:
+            n = min(meta['chunkSize'], len(meta['buildingIds']) - chunk * meta['chunkSize'])
+            data = open_memmap(path, mode='w+', dtype=meta['dtype'],
+                               shape=(n, hours, len(meta['variables'])))
+        if data.shape[1] != hours:
+            raise ValueError('%d hours in the output of building %d, %d in the store'
+                             % (hours, idx, data.shape[1]))
+
+        data[row] = np.column_stack([getattr(output, v) for v in meta['variables']])
+        data.flush()
+        del data
+
+        # The building is marked as written once its results are on disk.
+        done = open_memmap(os.path.join(storeDir, 'done.npy'), mode='r+')
+        done[idx] = 1
+        done.flush()
+
+        return None
+
+    def clear(storeDir, buildings):
+        """
+        Marks buildings as not written, before they are simulated again, so
+        a building that fails keeps no result of an earlier run.
+
+        parameters
+        ----------
+        storeDir: str
+            Directory of the store.
+
+        buildings: list
+            Indices of the buildings in the dataset.
+
+        output
+        ------
+        None
+        """
+        done = open_memmap(os.path.join(storeDir, 'done.npy'), mode='r+')
+        done[np.asarray(buildings, dtype=int)] = 0
+        done.flush()
+
+        return None
+
+    def done(storeDir):
+        """
+        Returns the mask of the buildings written to the store.
+        """
+        return np.load(os.path.join(storeDir, 'done.npy')).astype(bool)
+
+    def chunks(storeDir, meta = None):
+        """
+        Iterates over the chunks of a store as read-only memory maps.
+
+        output
+        ------
+        iterator
+            (index of the first building, array of buildings x hours x variables)
+            of each chunk written to the store.
+        """
+        meta = Store.open(storeDir) if meta is None else meta
+        n = len(meta['buildingIds'])
+        for chunk, start in enumerate(range(0, n, meta['chunkSize'])):
+            path = Store.chunk_path(storeDir, chunk)
+            if os.path.isfile(path):
+                yield start, np.load(path, mmap_mode='r')
+
+    def weather(storeDir):
+        """
+        Returns the ambient temperature of the run (C).
+        """
+        return np.load(os.path.join(storeDir, 'weather.npy'))
+
+    def building(storeDir, idx, meta = None):
+        """
+        Reads the hourly results of a building from the store.
+
+        parameters
+        ----------
+        storeDir: str
+            Directory of the store.
+
+        idx: int
+            Index of the building in the dataset. The building IDs of a
+            dataset are not always unique.
+
+        output
+        ------
+        SimulationOutput
+            Hourly results of the building, None if it is not in the store.
+        """
+        meta = Store.open(storeDir) if meta is None else meta
+        if not Store.done(storeDir)[idx]:
+            return None
+
+        chunk, row = divmod(idx, meta['chunkSize'])
+        data = np.load(Store.chunk_path(storeDir, chunk), mmap_mode='r')[row]
+        series = {v: np.asarray(data[:, i], dtype=float)
+                  for i, v in enumerate(meta['variables'])}
+        series[weatherVariable] = Store.weather(storeDir).astype(float)
+
+        return SimulationOutput(**series)
+
+    def hourly(storeDir, variable, meta = None):
+        """
+        Returns the hourly series of a variable for all buildings.
+
+        output
+        ------
+        np.array
+            Series of each building (buildings x hours), zero for the
+            buildings that are not in the store.
+        """
+        meta = Store.open(storeDir) if meta is None else meta
+        v = meta['variables'].index(variable)
+        hours = len(Store.weather(storeDir))
+        hourly = np.zeros((len(meta['buildingIds']), hours), dtype=meta['dtype'])
+        for start, data in Store.chunks(storeDir, meta):
+            hourly[start:start + len(data)] = data[:, :, v]
+        hourly[~Store.done(storeDir)] = 0
+
+        return hourly
+
+    def annual(storeDir, meta = None):
+        """
+        Sums the hourly results of every building over the year.
+
+        output
+        ------
+        pd.DataFrame
+            Annual sum (kWh) of the electricity use, space heating and hot
+            water demands of each building, with the buildingId, in the order
+            of the dataset. Zero for the buildings that are not in the store.
+        """
+        meta = Store.open(storeDir) if meta is None else meta
+        variables = [v for v in meta['variables'] if v != 'roomAirTemperature']
+        columns = [meta['variables'].index(v) for v in variables]
+
+        annual = np.zeros((len(meta['buildingIds']), len(columns)))
+        for start, data in Store.chunks(storeDir, meta):
+            annual[start:start + len(data)] = data[:, :, columns].sum(axis=1, dtype=float)
+        annual[~Store.done(storeDir)] = 0
+
+        annual = pd.DataFrame(annual, columns=variables)
+        annual.insert(0, 'buildingId', meta['buildingIds'])
+        return annual
+
+
+def main():
+    parser = argparse.ArgumentParser(description = 'Annual sums of a result store.')
+    parser.add_argument('store', help = 'directory of the store')
+    parser.add_argument('--csv', default = None, help = 'writes the annual sums to a csv file')
+    args = parser.parse_args()
+
+    meta = Store.open(args.store)
+    size = sum(entry.stat().st_size for entry in os.scandir(args.store) if entry.is_file())
+    print('%d / %d buildings, %.1f MB' % (Store.done(args.store).sum(),
+                                         len(meta['buildingIds']), size / 1024**2))
+
+    annual = Store.annual(args.store, meta)
+    print(annual.drop('buildingId', axis=1).sum().round(0).to_string())
+    if args.csv is not None:
+        annual.to_csv(args.csv, index=False)
+
+
+if __name__ == '__main__':
+    main()
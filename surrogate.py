@@ -0,0 +1,352 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Thu Oct  8 16:47:02 2026
+
+Surrogate model of the building simulations for fast stock-wide estimates.
+
+The surrogate is a ridge regression of the annual demands per heated floor
+area on the model inputs of the buildings, trained on simulation results.
+The hourly demands are the predicted annual demands distributed with the
+mean normalized hourly profile of the archetype.
+
+Usage:
+    python surrogate.py train --results results/simulationResults.csv
+                              --journal results/journal.jsonl
+                              --model results/surrogate.npz
+    python surrogate.py evaluate --results results/simulationResults.csv
+                                 --journal results/journal.jsonl --holdout 0.2
+The hourly demands are read from the result store with --store results/store,
+or from the journal of a run without a store.
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+import shapely
+from shapely import wkt
+
+from journal import Journal
+from store import Store
+from eso import SimulationOutput
+from preprocessing import Preprocessing
+
+
+# Annual demands predicted by the surrogate, as named in the results.
+targets = ['annualSH', 'annualDHW', 'annualELHousehold']
+
+# Position of the hourly series of each target in the simulation output.
+targetOutputs = [3, 4, 2]
+
+# Numeric features of the model inputs, standardized before the regression.
+numericFeatures = ['area', 'perimeter', 'compactness', 'height', 'floors', 'wwr',
+                   'heatRecovery', 'infiltration', 'adjacencyShare', 'shading']
+
+# Number of archetypes in archetypesCalibrated.txt.
+nArchetypes = 15
+
+
+class Surrogate:
+    def __init__(self, model):
+        self.model = model
+
+    def features(df, gis, floorHeight = 2.5):
+        """
+        Computes the features of all buildings with array operations,
+        from the model inputs of Preprocessing.model_inputs.
+
+        parameters
+        ----------
+        df: gpd.GeoDataFrame
+            GIS data of the buildings.
+
+        gis: gpd.GeoDataFrame
+            GIS dataset, used for the adjacent buildings.
+
+        output
+        ------
+        pd.DataFrame
+            One row of features per building.
+        """
+        n = len(df)
+        geometry = df.geometry.values
+        inputs = Preprocessing.model_inputs(df, floorHeight)
+        area = inputs.area.values
+
+        # Share of the exterior walls within 0.2 m of another building.
+        ring = shapely.get_exterior_ring(geometry)
+        buffered = gis.geometry.buffer(0.2, join_style = 2, mitre_limit=2, cap_style=2)
+        building, neighbor = buffered.sindex.query(ring, predicate = 'intersects')
+        other = gis.buildingId.values[neighbor] != df.buildingId.values[building]
+        building, neighbor = building[other], neighbor[other]
+        shared = shapely.length(shapely.intersection(ring[building],
+                                                     buffered.values[neighbor]))
+        total = shapely.length(ring)
+        adjacencyShare = np.clip(np.bincount(building, weights = shared, minlength = n)
+                                 / total, 0, 1)
+
+        features = inputs[['buildingId', 'mainType', 'archetype', 'area', 'perimeter',
+                           'height', 'floors', 'wwr', 'heatRecovery']].copy()
+        features['compactness'] = inputs.perimeter.values / area
+        features['infiltration'] = np.nan_to_num(inputs.infFlow.values)
+        features['adjacencyShare'] = adjacencyShare
+        features['shading'] = inputs.shading.values
+
+        return features
+
+    def design_matrix(features, mean, std):
+        """
+        Builds the regression matrix: one-hot archetypes and standardized numeric features.
+        """
+        onehot = (features.archetype.values[:, None] ==
+                  np.arange(1, nArchetypes + 1)[None, :]).astype(float)
+        numeric = (features[numericFeatures].values.astype(float) - mean) / std
+
+        return np.hstack([onehot, np.nan_to_num(numeric)])
+
+    def fit(features, annual, hourly = None, l2 = 1.0):
+        """
+        Trains the surrogate.
+
+        parameters
+        ----------
+        features: pd.DataFrame
+            Features of the training buildings (Surrogate.features).
+
+        annual: np.array
+            Annual demands (kWh) of the training buildings, one column per target.
+
+        hourly: np.array
+            Hourly demands (buildings x targets x hours), None for flat profiles.
+
+        l2: float
+            Ridge regularization.
+
+        output
+        ------
+        dict
+            The trained model.
+        """
+        floorArea = features.area.values * np.maximum(features.floors.values, 1)
+
+        mean = features[numericFeatures].values.astype(float).mean(axis=0)
+        std = features[numericFeatures].values.astype(float).std(axis=0)
+        std[std == 0] = 1
+
+        X = Surrogate.design_matrix(features, mean, std)
+        Y = annual / floorArea[:, None]
+
+        # Ridge regression of the demand per heated floor area (kWh/m2).
+        A = X.T @ X + l2 * np.eye(X.shape[1])
+        coef = np.linalg.solve(A, X.T @ Y)
+
+        # Mean normalized hourly profile per archetype, index 0 for all buildings.
+        hours = hourly.shape[2] if hourly is not None else 8760
+        shapes = np.full((nArchetypes + 1, len(targets), hours), 1/hours)
+        counts = np.bincount(features.archetype.values, minlength = nArchetypes + 1)
+        if hourly is not None:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                normalized = np.nan_to_num(hourly / hourly.sum(axis=2, keepdims=True))
+            shapes[0] = normalized.mean(axis=0)
+            for a in range(1, nArchetypes + 1):
+                if counts[a] > 0:
+                    shapes[a] = normalized[features.archetype.values == a].mean(axis=0)
+
+        return dict(coef = coef, mean = mean, std = std, shapes = shapes, counts = counts)
+
+    def predict(model, features):
+        """
+        Predicts the annual demands (kWh) of all buildings.
+
+        output
+        ------
+        np.array
+            One row per building, one column per target.
+        """
+        floorArea = features.area.values * np.maximum(features.floors.values, 1)
+        X = Surrogate.design_matrix(features, model['mean'], model['std'])
+
+        return np.clip(X @ model['coef'], 0, None) * floorArea[:, None]
+
+    def hourly(model, features, annual, target):
+        """
+        Distributes the annual demand of a target over the hours of the year
+        with the representative profile of the archetype of each building.
+
+        output
+        ------
+        np.array
+            Hourly demands (kWh/h), one row per building.
+        """
+        t = targets.index(target)
+        arch = features.archetype.values
+        known = (arch > 0) & (model['counts'][arch] > 0)
+        shape = model['shapes'][np.where(known, arch, 0), t]
+
+        return annual[:, t, None] * shape
+
+    def shapes(model, archetypes):
+        """
+        Representative hourly profiles of archetypes, as used by Surrogate.hourly.
+
+        parameters
+        ----------
+        model: dict
+            The trained model.
+
+        archetypes: list
+            Archetypes of the profiles.
+
+        output
+        ------
+        pd.DataFrame
+            Normalized hourly profile (sum 1 over the year) of each target
+            and archetype, in the columns target:archetype.
+        """
+        shapes = {}
+        for a in archetypes:
+            known = 0 < a <= nArchetypes and model['counts'][a] > 0
+            for t, target in enumerate(targets):
+                shapes['%s:%d' % (target, a)] = model['shapes'][a if known else 0, t]
+
+        return pd.DataFrame(shapes)
+
+    def save(model, path):
+        np.savez(path, **model)
+        return path
+
+    def load(path):
+        with np.load(path) as npz:
+            return {k: npz[k] for k in npz.files}
+
+    def training_set(resultsPath, journalPath = None, storeDir = None):
+        """
+        Reads a results set of a simulation run.
+
+        parameters
+        ----------
+        resultsPath: str
+            Results of the run (results/simulationResults.csv).
+
+        journalPath: str
+            Journal of the run, for the hourly profiles of a run without a store.
+
+        storeDir: str
+            Result store of the run, for the hourly profiles.
+
+        output
+        ------
+        df: gpd.GeoDataFrame
+            All the buildings of the run, for the features of the stock.
+        rows: np.array
+            Index in df of the buildings with a successful simulation.
+        annual: np.array
+            Annual demands (kWh) of the buildings of rows.
+        hourly: np.array
+            Hourly demands of the buildings of rows, None without a journal
+            or a store.
+        """
+        df = pd.read_csv(resultsPath)
+        df = df.drop([c for c in df.columns if c.startswith('Unnamed')], axis = 1)
+        df['geometry'] = df['geometry'].apply(wkt.loads)
+        df = gpd.GeoDataFrame(df, crs='epsg:3006')
+
+        # Failed simulations are reported as zero demand, flagged by the
+        # simulated column since the results have it.
+        if 'simulated' in df.columns:
+            simulated = df.simulated.astype(bool).values
+        else:
+            simulated = (df[targets].sum(axis=1) > 0).values
+        rows = np.flatnonzero(simulated)
+
+        hourly = None
+        if storeDir is not None:
+            # The results and the store are in the order of the dataset.
+            meta = Store.open(storeDir)
+            if meta['buildingIds'] != df.buildingId.astype(str).tolist():
+                raise ValueError('Buildings of %s different from %s' % (storeDir, resultsPath))
+            rows = rows[Store.done(storeDir)[rows]]
+            hourly = np.stack([Store.hourly(storeDir, SimulationOutput._fields[o], meta)[rows]
+                               for o in targetOutputs], axis=1).astype(float)
+
+        elif journalPath is not None:
+            # The last successful record of each building in the journal, by
+            # the index of the building as the building IDs are not unique.
+            records = {}
+            for key, record in sorted(Journal.read(journalPath).items(),
+                                      key = lambda r: r[1]['time']):
+                if record['status'] == 'done' and record.get('idx') is not None:
+                    records[record['idx']] = key
+            rows = np.array([idx for idx in rows if idx in records], dtype = int)
+            hourly = np.array([[Journal.load_output(journalPath, records[idx])[o]
+                                for o in targetOutputs] for idx in rows])
+
+        annual = df[targets].values.astype(float)[rows]
+
+        return df, rows, annual, hourly
+
+    def evaluate(model, features, annual, hourly = None):
+        """
+        Computes the error of the surrogate on a set of simulated buildings.
+
+        output
+        ------
+        pd.DataFrame
+            MAE (kWh), MAPE (%) and R2 of the annual demands and CV(RMSE) (%)
+            of the hourly demands for each target.
+        """
+        predicted = Surrogate.predict(model, features)
+        errors = []
+        for t, target in enumerate(targets):
+            y, p = annual[:, t], predicted[:, t]
+            error = dict(target = target,
+                         MAE = np.mean(np.abs(p - y)),
+                         MAPE = 100 * np.mean(np.abs(p - y)[y > 0] / y[y > 0]),
+                         R2 = 1 - np.sum((p - y)**2) / np.sum((y - y.mean())**2))
+            if hourly is not None:
+                h = Surrogate.hourly(model, features, predicted, target)
+                rmse = np.sqrt(np.mean((h - hourly[:, t])**2, axis=1))
+                error['CVRMSE'] = 100 * np.mean(rmse / np.maximum(hourly[:, t].mean(axis=1), 1e-9))
+            errors.append(error)
+
+        return pd.DataFrame(errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description = 'Surrogate model of the UBEM simulations.')
+    parser.add_argument('command', choices = ['train', 'evaluate'])
+    parser.add_argument('--results', default = 'results/simulationResults.csv')
+    parser.add_argument('--journal', default = None)
+    parser.add_argument('--store', default = None)
+    parser.add_argument('--model', default = 'results/surrogate.npz')
+    parser.add_argument('--holdout', type = float, default = 0.2)
+    parser.add_argument('--seed', type = int, default = 0)
+    parser.add_argument('--l2', type = float, default = 1.0)
+    args = parser.parse_args()
+
+    df, rows, annual, hourly = Surrogate.training_set(args.results, args.journal, args.store)
+
+    # The features of the training buildings are computed in the whole stock,
+    # with all their neighbors, as in the predictions of UBEM.py.
+    features = Surrogate.features(df, df).iloc[rows].reset_index(drop=True)
+    df = df.iloc[rows].reset_index(drop=True)
+
+    if args.command == 'evaluate':
+        rng = np.random.default_rng(args.seed)
+        test = rng.random(len(df)) < args.holdout
+        model = Surrogate.fit(features[~test], annual[~test],
+                              None if hourly is None else hourly[~test], args.l2)
+        print('Holdout error on', test.sum(), 'of', len(df), 'buildings:')
+        print(Surrogate.evaluate(model, features[test].reset_index(drop=True), annual[test],
+                                 None if hourly is None else hourly[test]).to_string(index=False))
+
+    else:
+        model = Surrogate.fit(features, annual, hourly, args.l2)
+        Surrogate.save(model, args.model)
+        print('Surrogate trained on', len(df), 'buildings and saved to', args.model)
+        print('Set mode = \'surrogate\' in UBEM.py to use it.')
+
+
+if __name__ == '__main__':
+    main()
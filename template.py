@@ -0,0 +1,418 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 09:31:52 2026
+
+Text-template idf writer of the building models.
+
+The objects of a model are rendered to text as they are added, exactly as
+eppy prints them, and only the objects that differ between buildings are
+rendered for every building. The objects that are the same for all buildings
+(version, simulation control, run period, outputs, schedules, HVAC templates)
+are rendered once per process and copied as text.
+
+Usage (benchmark against the eppy writer):
+    python template.py --idd C:/EnergyPlusV9-2-0/Energy+.idd --buildings 20
+"""
+
+import os
+import io
+import json
+import argparse
+import platform
+from time import time
+
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+from shapely import wkt
+from shapely.geometry.polygon import Polygon
+from eppy.modeleditor import IDF, newrawobject, extendlist
+from eppy.idfreader import convertfields, makeabunch
+from eppy.bunchhelpers import scientificnotation
+from eppy.EPlusInterfaceFunctions.eplusdata import removecomment
+
+from base_idf import baseIDF
+from weather import Weather
+from fidelity import Fidelity
+from zoning import oneZone
+from hvac import HVAC
+from geometry import Geometry
+from occupancy import Occupancy
+from adjacency import Adjacency
+from shading import Shading
+from construction import Construction, constructionObjects
+
+
+# Blank idf of this process, for the IDD information of the objects.
+reference = {}
+
+# Field comments, default raw objects and field positions, by object type.
+comments = {}
+defaults = {}
+
+# Objects of the calls that are the same for many buildings, by call.
+rendered = {}
+
+
+class Template:
+    def __init__(self, epw = None):
+        self.epw = epw
+        self.idfname = None
+        # Rendered text of the objects, by object type, in the order they are added.
+        self.objects = {}
+        # Files of the Schedule:File objects, for the result cache.
+        self.scheduleFiles = []
+
+    def idd():
+        """
+        Returns the blank idf of the process, made once after IDF.setiddname.
+        """
+        if 'idf' not in reference:
+            idf = IDF(io.StringIO(''))
+            reference['idf'] = idf
+            reference['index'] = {key: i for i, key in enumerate(idf.model.dtls)}
+        return reference['idf']
+
+    def fields(key):
+        """
+        Returns the default raw object of an object type, as made by
+        idf.newidfobject, and the position of each field by name.
+        """
+        key = key.upper()
+        if key not in defaults:
+            idf = Template.idd()
+            obj = newrawobject(idf.model, idf.idd_info, key, block = idf.block)
+            bunch = makeabunch(idf.idd_info, list(obj), reference['index'][key],
+                               block = idf.block)
+            defaults[key] = obj, {name: i for i, name in enumerate(bunch.objls)}
+        return defaults[key]
+
+    def field_comments(key, n):
+        """
+        Returns the '!-' comments of the first n fields of an object type.
+        """
+        key = key.upper()
+        if key not in comments or len(comments[key]) < n:
+            idf = Template.idd()
+            # Objects longer than the IDD extend the IDD as they do in eppy.
+            bunch = makeabunch(idf.idd_info, [key] + [''] * (n - 1),
+                               reference['index'][key], block = idf.block)
+            comments[key] = ['%s {%s}' % (comm.replace('_', ' '), bunch.getunits(comm))
+                             if bunch.getunits(comm) else comm.replace('_', ' ')
+                             for comm in bunch.objls]
+        return comments[key]
+
+    def render(obj):
+        """
+        Renders a raw object to idf text, as EpBunch.__repr__ does.
+
+        parameters
+        ----------
+        obj: list
+            Object type followed by the field values.
+
+        output
+        ------
+        str
+        """
+        # Integers are printed without decimals.
+        lines = []
+        for val in obj:
+            try:
+                value = int(val)
+                if value != val:
+                    value = val
+            except ValueError:
+                value = val
+            lines.append(value)
+
+        fieldComments = Template.field_comments(obj[0], len(obj))
+        lines[0] = '%s,' % (lines[0],)
+        for i, line in enumerate(lines[1:-1]):
+            lines[i + 1] = '    %s,' % (scientificnotation(line, width=18),)
+        lines[-1] = '    %s;' % (lines[-1],)
+        nlines = [lines[0]] + ['%s    !- %s' % (line.ljust(26), comm)
+                               for line, comm in zip(lines[1:], fieldComments[1:])]
+
+        return '\n%s\n' % ('\n'.join(nlines),)
+
+    def parse(idftxt):
+        """
+        Reads the raw objects of an idf text, with the same field conversions
+        as eppy, but without making an idf.
+
+        parameters
+        ----------
+        idftxt: str
+            Idf text, e.g., from oneZone.surfaces_text.
+
+        output
+        ------
+        list
+            Raw objects of the text.
+        """
+        idf = Template.idd()
+        objs = []
+        for element in removecomment(idftxt, '!').split(';'):
+            obj = [field.strip() for field in element.split(',')]
+            key = obj[0].upper()
+            if key not in reference['index']:
+                continue
+            key_i = reference['index'][key]
+            obj = convertfields(idf.idd_info[key_i], obj, idf.block[key_i])
+            if len(obj) > len(idf.idd_info[key_i]):
+                obj = makeabunch(idf.idd_info, obj, key_i, block = idf.block).obj
+            objs.append(obj)
+        return objs
+
+    def add(self, obj):
+        """
+        Renders a raw object and adds it to the model.
+        """
+        key = obj[0].upper()
+        self.objects.setdefault(key, []).append(Template.render(obj))
+        if key == 'SCHEDULE:FILE':
+            self.scheduleFiles.append(obj[Template.fields(key)[1]['File_Name']])
+        return self
+
+    def newidfobject(self, key, **kwargs):
+        """
+        Adds a new object, as idf.newidfobject does.
+        """
+        obj, position = Template.fields(key)
+        obj = list(obj)
+        for name, value in kwargs.items():
+            extendlist(obj, position[name])
+            obj[position[name]] = value
+        return self.add(obj)
+
+    def copyidfobject(self, idfobject):
+        """
+        Adds a copy of an eppy object, as idf.copyidfobject does.
+        """
+        return self.add(list(idfobject.obj))
+
+    def invariant(self, function, *args, **kwargs):
+        """
+        Adds the objects of a call that is the same for many buildings,
+        e.g., HVAC.ideal_schedule(idf, 21). The call is rendered once per
+        process and arguments.
+        """
+        call = (function.__qualname__, args, tuple(sorted(kwargs.items())))
+        if call not in rendered:
+            part = Template(self.epw)
+            function(part, *args, **kwargs)
+            rendered[call] = part
+        part = rendered[call]
+        for key, texts in part.objects.items():
+            self.objects.setdefault(key, []).extend(texts)
+        self.scheduleFiles.extend(part.scheduleFiles)
+        return self
+
+    def idfstr(self):
+        """
+        Returns the text of the model, with the objects in the order of the IDD
+        as in idf.idfstr().
+        """
+        dtls = Template.idd().model.dtls
+        return ''.join(text for key in dtls for text in self.objects.get(key, ()))
+
+    def saveas(self, filename, encoding = 'latin-1'):
+        """
+        Saves the model as idf.saveas does, with the line endings of the system.
+        """
+        s = '!- {} Line endings \n'.format(platform.system()) + self.idfstr()
+        s = os.linesep.join(s.splitlines())
+        with open(filename, 'wb') as f:
+            f.write(s.encode(encoding))
+        self.idfname = filename
+        return filename
+
+    def dump(self, fileName):
+        """
+        Writes the rendered objects of the model to a file, to be completed
+        and run later with Template.load.
+        """
+        with open(fileName, 'w') as f:
+            json.dump(dict(objects = self.objects, scheduleFiles = self.scheduleFiles), f)
+        return fileName
+
+    def load(fileName, epw = None):
+        """
+        Reads a model written by Template.dump, to be run with a weather file.
+        """
+        with open(fileName, 'r') as f:
+            model = json.load(f)
+        idf = Template(epw)
+        idf.objects = model['objects']
+        idf.scheduleFiles = model['scheduleFiles']
+        return idf
+
+    def blank_idf(epw, version = 9.2):
+        """
+        Creates a blank model, as baseIDF.blank_idf does.
+        """
+        idf = Template(epw)
+        idf.newidfobject('VERSION', Version_Identifier = version)
+        return idf
+
+    def building_idf (buildingPolygon, buildingArea, buildingHeight, buildingId,
+                      basementInfo, epw, wwr, material_idf, df,
+                      hotWaterTemp, coldWaterTemp, maxFlowHotWater,
+                      buildingMainType, heatRecovery, heatRecoveryEffect, infFlow,
+                      gis, idx, propertyCode, profileDir = '', outputBackend = 'eso',
+                      adjacencyGraph = None, densityTable = None,
+                      shadingElevation = None, profileVariant = 0,
+                      schedules = None, firstDayWeek = 'Monday', weather = None,
+                      fidelity = 'standard', stats = None):
+        """
+        Creates the model of a building with the text templates.
+
+        Same parameters and same idf text as Simulation.building_idf, which
+        makes the model with eppy objects.
+
+        output
+        ------
+        Template
+            Completed model for simulation, with idfstr and saveas as an idf.
+        """
+        # Modify the geometry rules of the building polygon.
+        buildingPolygon = Geometry.global_geometry(buildingPolygon)
+
+        #Activate the idf of the basement.
+        basement = 1 if basementInfo > 0 else 0
+
+        # Objects of the same calls as Simulation.building_idf, in the same order.
+        idf = Template.blank_idf(epw)
+        timeStep, parameters = Fidelity.settings(fidelity)
+        idf.invariant(baseIDF.simulation_parameters, **parameters)
+        idf.invariant(baseIDF.site_location, (weather or Weather.read(epw)).location)
+        idf.invariant(baseIDF.simulation_period, timeStep = timeStep,
+                      firstDayWeek = firstDayWeek)
+        idf.invariant(baseIDF.simulation_output, outputBackend)
+        idf.invariant(Geometry.global_geometry_rules)
+        idf.invariant(oneZone.zone)
+
+        # Surfaces and windows of the building.
+        if adjacencyGraph is not None:
+            adj = Adjacency.neighbors(adjacencyGraph, buildingId)
+        else:
+            adj = Adjacency.adjacent_polygons(buildingPolygon, buildingId, df,gis)
+        for obj in Template.parse(oneZone.surfaces_text(buildingPolygon, buildingHeight,
+                                                        basement, wwr, adj)):
+            idf.add(obj)
+
+        # Construction and material of the archetype.
+        for key in constructionObjects:
+            for obj in material_idf[key]:
+                idf.add(list(obj))
+
+        # HVAC
+        idf.invariant(HVAC.ventilation, 0.5, 'Exhaust', 'ZONE')
+        HVAC.infiltration(idf, infFlow,'ZONE')
+        idf.invariant(HVAC.ventilation_schedule)
+        heatRecovery = 'Sensible' if  heatRecovery == 1 else 'None'
+        idf.invariant(HVAC.ideal, heatRecovery, heatRecoveryEffect, 'ZONE')
+        idf.invariant(HVAC.ideal_schedule, 21)
+
+        if basement == 1:
+            idf.invariant(oneZone.zone_basement)
+            idf.invariant(HVAC.ventilation, 0.5, 'Exhaust', 'BASEMENT')
+            HVAC.infiltration(idf, infFlow, 'BASEMENT')
+            idf.invariant(HVAC.ideal, heatRecovery, heatRecoveryEffect, 'BASEMENT')
+
+        # Occupancy, gains and DHW.
+        schedules = schedules.get(buildingMainType) if schedules else None
+        Occupancy.people(idf,buildingArea, buildingHeight, buildingMainType,
+                         profileDir, profileVariant, schedules)
+        Occupancy.equipment (idf, buildingArea, buildingHeight, buildingMainType,
+                             profileDir, profileVariant, schedules)
+        Occupancy.dhw (idf, buildingArea, buildingHeight, hotWaterTemp,
+                       coldWaterTemp, maxFlowHotWater, buildingMainType,
+                       profileDir, profileVariant, schedules)
+
+        # Shading surfaces in case there is a shading building.
+        shading = Shading.densification(df, propertyCode, densityTable)
+        if shading == 1:
+            print('shading')
+            # Shading buildings around this building, the row idx of df.
+            gdf, d  = Shading.shading(df.iloc[[idx]], gis)
+            text, before, after = Shading.shading_text(gdf, d, shadingElevation)
+            if stats is not None:
+                stats['shadingFacets'] = [before, after]
+            for obj in Template.parse(text):
+                idf.add(obj)
+
+        return idf
+
+    def benchmark(df, modelInputs, epw, hotWaterTemp, coldWaterTemp, maxFlowHotWater,
+                  buildings, profileDir = ''):
+        """
+        Times the model build of buildings with eppy and with the text templates,
+        and checks that both give the same idf text.
+
+        output
+        ------
+        pd.DataFrame
+            Build time (s) with each writer and equality of the texts, per building.
+        """
+        from simulation import Simulation
+
+        writers = {'eppy': Simulation.building_idf, 'template': Template.building_idf}
+        times = []
+        for idx in buildings:
+            b = modelInputs.iloc[idx]
+            material_idf = Construction.load(b.archetype)
+            args = (Polygon(df.geometry.iloc[idx]), b.area, b.height, b.buildingId,
+                    b.basementInfo, epw, b.wwr, material_idf, df, hotWaterTemp,
+                    coldWaterTemp, maxFlowHotWater, b.mainType, b.heatRecovery,
+                    b.heatRecoveryEffect, b.infFlow, df, idx, b.propertyCode,
+                    profileDir)
+            row = dict(building = idx)
+            texts = []
+            for name, writer in writers.items():
+                t0 = time()
+                texts.append(writer(*args).idfstr())
+                row[name] = time() - t0
+            row['identical'] = texts[0] == texts[1]
+            times.append(row)
+
+        return pd.DataFrame(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description = 'Model build time of the idf writers.')
+    parser.add_argument('--idd', default = 'C:/EnergyPlusV9-2-0/Energy+.idd')
+    parser.add_argument('--epw', default = 'inputs/SWE_Stockholm.Arlanda.024600_IWEC.epw')
+    parser.add_argument('--data', default = 'inputs/exampleData.csv')
+    parser.add_argument('--buildings', type = int, default = 20)
+    parser.add_argument('--maxFlowHotWater', type = float, default = 1e-7)
+    args = parser.parse_args()
+
+    from preprocessing import Preprocessing
+
+    IDF.setiddname(args.idd)
+    df = pd.read_csv(args.data)
+    df['geometry'] = df['geometry'].apply(wkt.loads)
+    df = gpd.GeoDataFrame(df, crs='epsg:3006')
+    df = df.drop([c for c in df.columns if c.startswith('Unnamed')], axis = 1)
+    parameters = pd.read_csv('inputs/parameters.txt', sep = ',', header = 'infer',
+                             encoding= 'ANSI')
+
+    modelInputs = Preprocessing.model_inputs(df)
+    buildings = np.flatnonzero(modelInputs.validArchetype.values)[:args.buildings]
+
+    # The first build of each writer includes the one-off parsing and rendering.
+    times = Template.benchmark(df, modelInputs, os.path.abspath(args.epw),
+                               parameters.hotWaterTemp[0], parameters.coldWaterTemp[0],
+                               args.maxFlowHotWater, buildings, os.getcwd())
+    print(times.to_string(index = False))
+    print('Model build time per building (ms), without the first building:')
+    for name in ['eppy', 'template']:
+        print('    %-8s mean %.1f, median %.1f' % (name, 1000 * times[name][1:].mean(),
+                                                   1000 * times[name][1:].median()))
+    print('Identical idf text:', times.identical.sum(), '/', len(times))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 14:05:12 2026
+
+Fixtures shared by the tests: the example data, as read by UBEM.py, the
+EnergyPlus idd file and a fake simulation of the buildings. The idd file is
+given by the ENERGYPLUS_IDD environment variable, or else the idd file
+installed with eppy is used.
+"""
+
+import os
+import sys
+import codecs
+
+import pytest
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+from shapely import wkt
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root)
+
+# The modules read their inputs relative to the root of the repository.
+os.chdir(root)
+
+# The input tables are read with the Windows code page, named ANSI on Windows only.
+try:
+    codecs.lookup('ANSI')
+except LookupError:
+    codecs.register(lambda name: codecs.lookup('cp1252') if name == 'ansi' else None)
+
+
+@pytest.fixture(scope='session')
+def df():
+    df = pd.read_csv(os.path.join(root, 'inputs', 'exampleData.csv'))
+    df['geometry'] = df['geometry'].apply(wkt.loads)
+    df = gpd.GeoDataFrame(df, crs='epsg:3006')
+    return df.drop('Unnamed: 0', axis = 1)
+
+
+@pytest.fixture(scope='session')
+def epw():
+    return os.path.join(root, 'inputs', 'SWE_Stockholm.Arlanda.024600_IWEC.epw')
+
+
+@pytest.fixture(scope='session')
+def idd():
+    from eppy.modeleditor import IDF
+    if IDF.iddname is None:
+        import eppy
+        iddfile = os.environ.get('ENERGYPLUS_IDD',
+                                 os.path.join(os.path.dirname(eppy.__file__), 'resources',
+                                              'iddfiles', 'Energy+V8_9_0.idd'))
+        IDF.setiddname(iddfile)
+    return IDF.iddname
+
+
+# Buildings failing in the fake simulation.
+failed = set()
+
+
+def fake_output(idx, hours = 24):
+    return [np.full(hours, float(idx + k)) for k in range(5)]
+
+
+def fake_building(idx):
+    # Simulation of a building, as Parallel.building, without EnergyPlus.
+    if idx in failed:
+        return idx, 1, None, 'EnergyPlus failed', {}
+    return idx, 1, fake_output(idx), None, {}
+
+
+@pytest.fixture
+def fake(monkeypatch):
+    # The workers of the pool are forked with the fake simulation.
+    from parallel import Parallel
+    monkeypatch.setattr(Parallel, 'building', fake_building)
+    failed.clear()
+    yield failed
+    failed.clear()
+
+
+@pytest.fixture
+def stock(epw):
+    # Two buildings with the same ID, as buildingId 45 of the example data.
+    df = pd.DataFrame({'buildingId': ['1', '2', '2', '3'],
+                       'buildingHeight': [6.0, 9.0, 12.0, 12.0]})
+    return dict(df = df, epw = epw, hotWaterTemp = 55, coldWaterTemp = 10,
+                maxFlowHotWater = 1e-7)
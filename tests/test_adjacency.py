@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 16:03:35 2026
+
+Tests of the adjacency graph of the stock and of the shared walls, on the
+example data.
+"""
+
+import numpy as np
+import pytest
+from shapely.geometry.polygon import Polygon
+
+from adjacency import Adjacency
+from construction import Construction
+from preprocessing import Preprocessing
+from shading import Shading
+from simulation import Simulation
+
+
+@pytest.fixture(scope='module')
+def graph(df):
+    return Adjacency.graph(df, df)
+
+
+@pytest.fixture(scope='module')
+def walls(df, graph):
+    return Preprocessing.shared_walls(df, graph)
+
+
+def test_graph_same_as_overlay(df, graph):
+    # Same neighbors and intersections as gpd.overlay, building by building.
+    assert len(graph) > 0
+    for buildingId in df.buildingId.unique():
+        overlay = Adjacency.adjacent_polygons(None, buildingId, df, df)
+        neighbors = Adjacency.neighbors(graph, buildingId)
+        assert (sorted(zip(overlay.buildingId, np.round(overlay.area, 6))) ==
+                sorted(zip(neighbors.neighborId, np.round(neighbors.area, 6))))
+        assert (len(neighbors) > 0) == Adjacency.has_adjacent(buildingId, df, df)
+
+
+def test_graph_symmetric(graph):
+    pairs = set(zip(graph.buildingId, graph.neighborId))
+    assert pairs == set((b, a) for a, b in pairs)
+
+
+def test_save_graph(graph, tmp_path):
+    path = tmp_path / 'adjacency.csv'
+    Adjacency.save_graph(graph, path)
+    loaded = Adjacency.load_graph(path)
+    assert list(loaded.buildingId) == list(graph.buildingId)
+    assert list(loaded.neighborId) == list(graph.neighborId)
+    assert all(a.equals_exact(b, 1e-9) for a, b in zip(loaded.geometry, graph.geometry))
+
+
+def test_shared_walls(df, graph, walls):
+    assert walls.sharedLength.between(0, walls.length + 1e-9).all()
+    assert (walls.adiabatic == (walls.sharedLength >= 0.5 * walls.length)).all()
+
+    # Only the buildings of the graph share walls.
+    shared = walls[walls.sharedLength > 0].buildingId.unique()
+    assert walls.adiabatic.sum() > 0
+    assert set(shared) <= set(graph.buildingId)
+
+    # The walls of each footprint are numbered from 0, in the order of the
+    # dataset (buildingId 45 has two footprints).
+    wall = walls.wall.values
+    assert (wall == 0).sum() == len(df)
+    assert ((wall[1:] == wall[:-1] + 1) | (wall[1:] == 0)).all()
+
+
+@pytest.mark.parametrize('idx', [12, 13, 60])
+def test_adiabatic_walls_of_model(idd, df, epw, graph, walls, idx):
+    # The adiabatic walls of the model are the walls classified for the stock.
+    b = Preprocessing.model_inputs(df).iloc[idx]
+    idf = Simulation.building_idf(Polygon(df.geometry.iloc[idx]), b.area, b.height,
+                                  b.buildingId, b.basementInfo, epw, b.wwr,
+                                  Construction.load(b.archetype), df, 55, 10, 1e-7,
+                                  b.mainType, b.heatRecovery, b.heatRecoveryEffect,
+                                  b.infFlow, df, idx, b.propertyCode, '/profiles',
+                                  adjacencyGraph = graph,
+                                  densityTable = Shading.density_table(df))
+    adiabatic = [s.Name for s in idf.idfobjects['BUILDINGSURFACE:DETAILED']
+                 if s.Outside_Boundary_Condition == 'Adiabatic']
+    expected = walls[(walls.buildingId == b.buildingId) & walls.adiabatic].wall
+    assert adiabatic == ['Wall%d' % w for w in expected]
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 15:41:16 2026
+
+Tests of the assignment of the archetypes at the bounds of their year ranges.
+"""
+
+import numpy as np
+import pytest
+
+from archetype import Archetype
+
+
+def filtered_archetype(listOfArchetypes, buildingType, buildingYear):
+    # The first archetype of the list covering the year, as in a filter of the list.
+    rows = listOfArchetypes[(listOfArchetypes.buildingType == buildingType) &
+                            (listOfArchetypes.buildingYearFrom < buildingYear) &
+                            (buildingYear <= listOfArchetypes.buildingYearTo)]
+    return int(rows.archetype.iloc[0]) if len(rows) > 0 else 0
+
+
+@pytest.mark.parametrize('buildingType, buildingYear, arch', [
+    ('House', 2022, 0), ('House', 2021, 1), ('House', 2011, 1), ('House', 2010, 2),
+    ('House', 2001, 2), ('House', 2000, 3), ('House', 1950, 8), ('House', 1, 8),
+    ('House', 0, 0), ('Apartment', 2021, 9), ('Apartment', 1975, 13),
+    ('Apartment', 1976, 12), ('Apartment', 1946, 14), ('Apartment', 1945, 15)])
+def test_bounds(buildingType, buildingYear, arch):
+    mainType, archs, infiltration, valid = Archetype.assign_archetypes(
+        [buildingType], [buildingYear], mainTypes = True)
+    assert archs[0] == arch
+    assert valid[0] == (arch > 0)
+    assert np.isnan(infiltration[0]) == (arch == 0)
+
+
+def test_same_as_filter():
+    listOfArchetypes, _ = Archetype.table()
+    years = np.arange(-1, 2025)
+    for buildingType in ('House', 'Apartment'):
+        _, arch, infiltration, _ = Archetype.assign_archetypes(
+            [buildingType] * len(years), years, mainTypes = True)
+        expected = [filtered_archetype(listOfArchetypes, buildingType, y) for y in years]
+        assert list(arch) == expected
+
+        table = listOfArchetypes.set_index('archetype').infiltration
+        assert np.allclose(infiltration[arch > 0], table[arch[arch > 0]].values)
+
+
+def test_main_types():
+    mainType, arch, _, _ = Archetype.assign_archetypes(
+        ['Bostad; Flerfamiljshus', 'Bostad; Småhus friliggande'], [1980, 1980])
+    assert list(mainType) == ['Apartment', 'House']
+    assert list(arch) == [12, 5]
+
+
+def test_archetype():
+    assert Archetype.archetype('Apartment', 2015) == 9
+    with pytest.raises(ValueError):
+        Archetype.archetype('House', 2030)
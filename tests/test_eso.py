@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 15:02:27 2026
+
+Tests of the reader of the hourly results in the ESO file, on a small ESO
+file with a sizing period before the run period.
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+from eso import ESO, outputVariables
+
+fileName = os.path.join(os.path.dirname(__file__), 'data', 'small.eso')
+
+
+def test_dictionary():
+    with open(fileName, 'r') as f:
+        reports = ESO.dictionary(f)
+    assert reports[('ENVIRONMENT', 'SITE OUTDOOR AIR DRYBULB TEMPERATURE', 'HOURLY')] == '7'
+    assert reports[('ENVIRONMENT', 'SITE OUTDOOR AIR DRYBULB TEMPERATURE', 'DAILY')] == '8'
+    assert reports[(None, 'ELECTRICITY:BUILDING', 'HOURLY')] == '22'
+    assert reports[('ZONE', 'ZONE MEAN AIR TEMPERATURE', 'HOURLY')] == '81'
+
+
+def test_read_run_period():
+    # The values of the sizing period are dropped, the daily report is not read.
+    series = ESO.read(fileName, {'t': ('Environment', 'Site Outdoor Air Drybulb Temperature'),
+                                 'e': (None, 'Electricity:Building')})
+    assert np.array_equal(series['t'], [-5.5, -6.0])
+    assert np.array_equal(series['e'], [1800000.0, 3600000.0])
+
+
+def test_simulation_output():
+    output = ESO.simulation_output(fileName)
+    assert output._fields == tuple(outputVariables)
+    assert np.array_equal(output.ambientTemperature, [-5.5, -6.0])
+    assert np.array_equal(output.roomAirTemperature, [20.5, 20.25])
+    assert np.allclose(output.electricity, [0.5, 1.0])
+    assert np.allclose(output.spaceHeat, [2.0, 3.0])
+    assert np.allclose(output.hotWater, [0.1, 0.0])
+
+
+def test_missing_report():
+    with pytest.raises(ValueError, match = 'Heating:Electricity'):
+        ESO.read(fileName, {'heat': (None, 'Heating:Electricity')})
+    # A report of another frequency is missing too.
+    with pytest.raises(ValueError, match = 'Zone Mean Air Temperature'):
+        ESO.read(fileName, {'t': ('ZONE', 'Zone Mean Air Temperature')}, frequency = 'Daily')
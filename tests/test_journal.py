@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 16:31:08 2026
+
+Tests of the run journal: records, progress, fingerprints and the resume of
+a run, with the fake building simulation of conftest.
+"""
+
+import json
+
+import numpy as np
+
+from conftest import fake_output
+from journal import Journal
+from parallel import Parallel
+
+
+def test_append_read(tmp_path):
+    journalPath = str(tmp_path / 'journal.jsonl')
+    assert Journal.read(journalPath) == {}
+
+    first = Journal.append(journalPath, '1', 'a', 3, None, error = 'timeout')
+    last = Journal.append(journalPath, '1', 'a', 3, fake_output(0))
+    Journal.append(journalPath, '2', 'a', 4, fake_output(1))
+
+    # The last record of a building wins, a record cut by a crash is ignored.
+    with open(journalPath, 'a') as f:
+        f.write(json.dumps(dict(first, key = '3:a'))[:20])
+    records = Journal.read(journalPath)
+    assert sorted(records) == ['1:a', '2:a']
+    assert records['1:a'] == last and last['status'] == 'done'
+    assert first['status'] == 'failed' and first['error'] == 'timeout'
+
+    output = Journal.load_output(journalPath, '2:a')
+    assert all(np.array_equal(a, b) for a, b in zip(output, fake_output(1)))
+
+
+def test_no_output_file(tmp_path):
+    # Without output, i.e., with a result store, only the record is written.
+    journalPath = str(tmp_path / 'journal.jsonl')
+    Journal.append(journalPath, '1', 'a', 3, None)
+    assert [p.name for p in tmp_path.iterdir()] == ['journal.jsonl']
+
+
+def test_progress(tmp_path):
+    journalPath = str(tmp_path / 'journal.jsonl')
+    Journal.append(journalPath, '1', 'old', 3, None)
+    Journal.append(journalPath, '1', 'new', 3, None)
+    Journal.append(journalPath, '2', 'new', 3, None, error = 'timeout')
+
+    # Only the records of the current keys count.
+    keys = [Journal.key(b, 'new') for b in ['1', '2', '3']]
+    progress = Journal.progress(journalPath, keys)
+    assert (progress['done'], progress['failed'], progress['remaining']) == (1, 1, 2)
+
+
+def test_fingerprint(stock):
+    df = stock['df']
+    fingerprints = Journal.fingerprint(df, *Parallel.settings(stock))
+    assert len(fingerprints) == len(df)
+    assert len(set(Journal.key(b, f) for b, f in zip(df.buildingId, fingerprints))) == 4
+    assert fingerprints == Journal.fingerprint(df, *Parallel.settings(dict(stock)))
+
+    # A building, or a setting that changes the results, changes the fingerprint.
+    changed = df.assign(buildingHeight = [6.0, 9.0, 12.0, 15.0])
+    assert Journal.fingerprint(changed, *Parallel.settings(stock))[:3] == fingerprints[:3]
+    assert Journal.fingerprint(changed, *Parallel.settings(stock))[3] != fingerprints[3]
+    for setting, value in [('hotWaterTemp', 60), ('shadingElevation', 5),
+                           ('profileVariants', 4), ('writer', 'template'),
+                           ('schedules', {'House': {}})]:
+        settings = Parallel.settings(dict(stock, **{setting: value}))
+        assert Journal.fingerprint(df, *settings)[0] != fingerprints[0], setting
+
+
+def test_resume(idd, stock, fake, tmp_path):
+    journalPath = str(tmp_path / 'journal.jsonl')
+    fake.add(2)
+    output, arch = Parallel.run_stock(idd, stock, 2, journalPath)
+    assert output[2] is None and output[3] is not None
+
+    # Only the failed building is run again, the others are read back.
+    fake.clear()
+    output, arch = Parallel.run_stock(idd, stock, 2, journalPath)
+    with open(journalPath) as f:
+        assert len(f.readlines()) == 5
+    assert all(np.array_equal(output[i][0], fake_output(i)[0]) for i in range(4))
+    assert arch == [1] * 4
+
+    # Other inputs run all the buildings again.
+    stock['hotWaterTemp'] = 60
+    Parallel.run_stock(idd, stock, 2, journalPath)
+    with open(journalPath) as f:
+        assert len(f.readlines()) == 9
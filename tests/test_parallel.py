@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 11:06:52 2026
+
+Tests of the deduplication of the simulations of identical buildings, with
+the fake building simulation of conftest.
+"""
+
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+import pytest
+from shapely import affinity
+
+from adjacency import Adjacency
+from conftest import fake_output
+from parallel import Parallel
+from preprocessing import Preprocessing
+
+
+@pytest.fixture(scope='module')
+def copies(df):
+    # The example data with moved copies of a free standing building (0), of
+    # two adjacent buildings (11 and 12) and of a shaded building (71), far
+    # from the stock, and a rotated copy of building 0.
+    copies = df.iloc[[0, 11, 12, 71, 0]].copy()
+    copies['geometry'] = [affinity.translate(g, 5000, 5000) for g in copies.geometry]
+    copies.iloc[4, copies.columns.get_loc('geometry')] = affinity.rotate(
+        affinity.translate(copies.geometry.iloc[4], 1000), 90)
+    copies['buildingId'] = [1000, 1011, 1012, 1071, 2000]
+    stock = pd.concat([df, copies], ignore_index = True)
+    return gpd.GeoDataFrame(stock, geometry = 'geometry', crs = df.crs)
+
+
+@pytest.fixture(scope='module')
+def signatures(copies):
+    modelInputs = Preprocessing.model_inputs(copies)
+    return Parallel.signatures(copies, copies, modelInputs, Adjacency.graph(copies, copies))
+
+
+def test_signatures(df, copies, signatures):
+    n = len(df)
+    modelInputs = Preprocessing.model_inputs(copies)
+
+    # Only a moved copy shares the signature of a building.
+    assert signatures[0] is not None
+    assert signatures[n] == signatures[0]
+    assert signatures[n + 4] is not None and signatures[n + 4] != signatures[0]
+
+    # Adjacent and shaded buildings, and their copies, are simulated alone.
+    assert signatures[11] is None and signatures[12] is None
+    assert signatures[n + 1] is None and signatures[n + 2] is None
+    assert modelInputs.shading[71] == 1 and signatures[71] is None
+    graph = set(Adjacency.graph(copies, copies).buildingId)
+    for idx, b in enumerate(modelInputs.itertuples(index = False)):
+        if b.buildingId in graph or b.shading == 1 or not b.validArchetype:
+            assert signatures[idx] is None
+
+    # Same signatures with the adjacent buildings queried one by one.
+    assert Parallel.signatures(copies, copies, modelInputs) == signatures
+
+
+def test_groups(signatures):
+    members = Parallel.groups(range(len(signatures)), signatures)
+    assert sorted(i for group in members.values() for i in group) == list(range(len(signatures)))
+    for idx, group in members.items():
+        assert group[0] == idx
+        assert all(signatures[i] == signatures[idx] and signatures[i] is not None
+                   for i in group[1:])
+
+
+def test_run_stock(idd, copies, signatures, fake):
+    n = len(copies)
+    inputs = dict(df = copies, gis = copies, modelInputs = Preprocessing.model_inputs(copies),
+                  adjacencyGraph = Adjacency.graph(copies, copies))
+    output, arch = Parallel.run_stock(idd, inputs, 2, deduplicate = True)
+    simulated = [o[0][0] for o in output]
+
+    # The copy of building 0 is given the simulation of building 0.
+    assert simulated[n - 5] == 0
+    assert all(np.array_equal(a, b) for a, b in zip(output[n - 5], fake_output(0)))
+
+    # Each building is given the simulation of the first building of its
+    # signature, and the buildings without signature their own simulation.
+    for idx in range(n):
+        first = signatures.index(signatures[idx]) if signatures[idx] is not None else idx
+        assert simulated[idx] == first
+    assert len(set(simulated)) < n
+    assert arch == [1] * n
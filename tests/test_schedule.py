@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 15:20:51 2026
+
+Tests of the compiler of the hourly profiles into Schedule:Compact objects.
+"""
+
+import numpy as np
+import pytest
+
+from occupancy import Initials
+from schedule import Schedule
+
+
+def repeating_profile(firstDayWeek, leapYear, seed = 0):
+    # A weekday and a weekend day for each month, the same in June and July.
+    rng = np.random.default_rng(seed)
+    days = np.round(rng.random((12, 2, 24)), 2)
+    days[6] = days[5]
+    weekend, month = Initials.calendar(firstDayWeek, leapYear)
+    return days[month, weekend.astype(int)].ravel()
+
+
+@pytest.mark.parametrize('firstDayWeek, leapYear', [('Monday', 0), ('Thursday', 0),
+                                                    ('Sunday', 1)])
+def test_round_trip(firstDayWeek, leapYear):
+    values = repeating_profile(firstDayWeek, leapYear)
+    fields = Schedule.compile(values, firstDayWeek, leapYear)
+    assert fields is not None
+    assert np.array_equal(Schedule.expand(fields, firstDayWeek, leapYear), values)
+
+    # June and July are one period, through the last day of July.
+    through = [f for f in fields if f.startswith('Through')]
+    assert len(through) == 11
+    assert 'Through: 7/31' in through and 'Through: 6/30' not in through
+    assert through[-1] == 'Through: 12/31'
+
+
+def test_constant_profile():
+    fields = Schedule.compile(np.ones(8760), 'Monday', 0)
+    assert fields == ['Through: 12/31', 'For: Weekdays', 'Until: 24:00', '1.0',
+                      'For: AllOtherDays', 'Until: 24:00', '1.0']
+
+
+def test_not_compiled():
+    values = repeating_profile('Monday', 0)
+
+    # One changed hour of a day.
+    changed = values.copy()
+    changed[24 * 40 + 12] += 1
+    assert Schedule.compile(changed, 'Monday', 0) is None
+
+    # Another calendar, or the length of another year.
+    assert Schedule.compile(values, 'Tuesday', 0) is None
+    assert Schedule.compile(values, 'Monday', 1) is None
+    assert Schedule.compile(values[:-24], 'Monday', 0) is None
+
+
+def test_compile_profiles():
+    values = repeating_profile('Monday', 0)
+    profiles = {'House': {'occupancyProfile': values,
+                          'lightingProfile': values[::-1]},
+                'Apartment': {'occupancyProfile': np.stack([values, values])}}
+    schedules = Schedule.compile_profiles(profiles, 'Monday', 0)
+
+    # The profiles that are not compiled, e.g., the variants, are left out.
+    assert sorted(schedules) == ['Apartment', 'House']
+    assert list(schedules['House']) == ['occupancyProfile']
+    assert schedules['Apartment'] == {}
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 14:18:40 2026
+
+Tests of the shading buildings written in the models of the shaded buildings.
+"""
+
+import numpy as np
+import pytest
+from shapely.geometry import MultiPoint
+from shapely.geometry.polygon import Polygon
+
+from construction import Construction
+from preprocessing import Preprocessing
+from shading import Shading
+from simulation import Simulation
+from template import Template
+
+
+@pytest.fixture(scope='module')
+def modelInputs(df):
+    return Preprocessing.model_inputs(df)
+
+
+def shaded_model(writer, df, modelInputs, epw, idx, shadingElevation, stats = None):
+    b = modelInputs.iloc[idx]
+    return writer(Polygon(df.geometry.iloc[idx]), b.area, b.height, b.buildingId,
+                  b.basementInfo, epw, b.wwr, Construction.load(b.archetype), df, 55, 10,
+                  1e-7, b.mainType, b.heatRecovery, b.heatRecoveryEffect, b.infFlow, df,
+                  idx, b.propertyCode, '/profiles',
+                  densityTable = Shading.density_table(df),
+                  shadingElevation = shadingElevation, stats = stats)
+
+
+def test_shaded_buildings(modelInputs):
+    # The buildings of the properties Example 13:2 to 13:9.
+    assert list(np.flatnonzero(modelInputs.shading.values)) == list(range(71, 79))
+
+
+@pytest.mark.parametrize('shadingElevation', [None, 5])
+@pytest.mark.parametrize('idx', [71, 75, 78])
+def test_shading_around_building(idd, df, modelInputs, epw, idx, shadingElevation):
+    idf = shaded_model(Simulation.building_idf, df, modelInputs, epw, idx,
+                       shadingElevation)
+    surfaces = idf.idfobjects['SHADING:BUILDING:DETAILED']
+    assert len(surfaces) > 0
+
+    # Every shading surface is in reach of the rays cast from the building
+    # (100 m), not around another building of the stock.
+    footprint = df.geometry.iloc[idx]
+    for surface in surfaces:
+        points = MultiPoint([(x, y) for x, y, z in surface.coords])
+        assert points.convex_hull.distance(footprint) <= 100
+        assert points.convex_hull.distance(df.geometry.iloc[0]) > 100
+
+    # Both writers shade the same building.
+    template = shaded_model(Template.building_idf, df, modelInputs, epw, idx,
+                            shadingElevation)
+    assert template.idfstr() == idf.idfstr()
+
+
+def test_shading_of_each_building(df):
+    # The obstacles of a building are found around its own footprint.
+    first, _ = Shading.shading(df.iloc[[71]], df)
+    last, _ = Shading.shading(df.iloc[[78]], df)
+    assert first.buildingId[0] == df.buildingId.iloc[71]
+    assert last.buildingId[0] == df.buildingId.iloc[78]
+    assert first.geometry[0].equals(df.geometry.iloc[71])
+
+
+@pytest.mark.parametrize('idx', [71, 78])
+def test_facet_counts(idd, df, modelInputs, epw, idx):
+    # The facet counts of the shading buildings, the same with both writers.
+    counts = {}
+    for shadingElevation in [None, 5]:
+        stats, templateStats = {}, {}
+        idf = shaded_model(Simulation.building_idf, df, modelInputs, epw, idx,
+                           shadingElevation, stats)
+        shaded_model(Template.building_idf, df, modelInputs, epw, idx,
+                     shadingElevation, templateStats)
+        assert stats == templateStats
+        counts[shadingElevation] = stats['shadingFacets']
+
+    # One surface per facet left after the reduction.
+    assert counts[5][1] == len(idf.idfobjects['SHADING:BUILDING:DETAILED'])
+
+    # The reduction starts from all the facets of the shading buildings.
+    before, after = counts[5]
+    assert counts[None] == [before, before]
+    assert 0 < after < before
+
+    # Without stats, the model is the same.
+    assert shaded_model(Simulation.building_idf, df, modelInputs, epw, idx,
+                        5).idfstr() == idf.idfstr()
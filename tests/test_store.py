@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 16:58:22 2026
+
+Tests of the result store: chunks written as buildings finish, read back
+by building and for the whole stock.
+"""
+
+import numpy as np
+import pytest
+
+from conftest import fake_output
+from parallel import Parallel
+from store import Store
+
+
+def test_write_read(tmp_path):
+    storeDir = str(tmp_path / 'store')
+    buildingIds = ['1', '45', '45', '7', '8']
+    meta = Store.create(storeDir, buildingIds, chunkSize = 2)
+    assert not Store.done(storeDir).any()
+
+    for idx in (0, 1, 2, 4):
+        Store.write(storeDir, meta, idx, fake_output(idx))
+    assert list(Store.done(storeDir)) == [True, True, True, False, True]
+    assert sorted(p.name for p in tmp_path.joinpath('store').iterdir()) == [
+        'chunk00000.npy', 'chunk00001.npy', 'chunk00002.npy', 'done.npy',
+        'meta.json', 'weather.npy']
+
+    # Both buildings with the same ID are read by their index.
+    for idx in (1, 2):
+        output = Store.building(storeDir, idx)
+        assert np.array_equal(output.ambientTemperature, fake_output(0)[0])
+        for k, series in enumerate(output[1:]):
+            assert np.array_equal(series, fake_output(idx)[k + 1])
+    assert Store.building(storeDir, 3) is None
+
+    hourly = Store.hourly(storeDir, 'electricity')
+    assert hourly.shape == (5, 24)
+    assert list(hourly[:, 0]) == [2, 3, 4, 0, 6]
+
+    annual = Store.annual(storeDir)
+    assert list(annual.columns) == ['buildingId', 'electricity', 'spaceHeat', 'hotWater']
+    assert list(annual.buildingId) == buildingIds
+    assert list(annual.electricity) == [48, 72, 96, 0, 144]
+
+
+def test_clear(tmp_path):
+    storeDir = str(tmp_path / 'store')
+    meta = Store.create(storeDir, ['1', '2', '3'])
+    for idx in range(3):
+        Store.write(storeDir, meta, idx, fake_output(idx))
+
+    # A cleared building is read as not in the store, and not summed.
+    Store.clear(storeDir, [1])
+    assert list(Store.done(storeDir)) == [True, False, True]
+    assert Store.building(storeDir, 1) is None
+    assert list(Store.annual(storeDir).spaceHeat) == [72, 0, 120]
+
+
+def test_reopen(tmp_path):
+    storeDir = str(tmp_path / 'store')
+    meta = Store.create(storeDir, ['1', '2'])
+    Store.write(storeDir, meta, 1, fake_output(1))
+
+    # The store of the same buildings is kept, another store is replaced.
+    assert Store.create(storeDir, ['1', '2']) == meta
+    assert list(Store.done(storeDir)) == [False, True]
+    assert Store.create(storeDir, ['1', '3'])['buildingIds'] == ['1', '3']
+    assert not Store.done(storeDir).any()
+
+
+def test_hours(tmp_path):
+    storeDir = str(tmp_path / 'store')
+    meta = Store.create(storeDir, ['1', '2'])
+    Store.write(storeDir, meta, 0, fake_output(0))
+    with pytest.raises(ValueError):
+        Store.write(storeDir, meta, 1, fake_output(1, hours = 48))
+
+
+def test_run_stock(idd, stock, fake, tmp_path):
+    journalPath = str(tmp_path / 'journal.jsonl')
+    storeDir = str(tmp_path / 'store')
+    output, _ = Parallel.run_stock(idd, stock, 2, journalPath, storeDir = storeDir)
+    assert output == [None] * 4
+    assert Store.done(storeDir).all()
+
+    # A building failing with other inputs keeps no result of the earlier run.
+    fake.add(2)
+    stock['hotWaterTemp'] = 60
+    Parallel.run_stock(idd, stock, 2, journalPath, storeDir = storeDir)
+    assert list(Store.done(storeDir)) == [True, True, False, True]
+    assert Store.annual(storeDir).electricity[2] == 0
+
+    # The resumed run only simulates the failed building.
+    fake.clear()
+    Parallel.run_stock(idd, stock, 2, journalPath, storeDir = storeDir)
+    assert Store.done(storeDir).all()
+    assert list(Store.annual(storeDir).electricity) == [48, 72, 96, 120]
+    with open(journalPath) as f:
+        assert len(f.readlines()) == 9
+
+    # The journal holds no output with a store.
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['journal.jsonl', 'store']
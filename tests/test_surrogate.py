@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 10:12:45 2026
+
+Tests of the training set of the surrogate, read from the results of a run
+on the example data.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+import shapely
+
+from conftest import fake_output
+from journal import Journal
+from surrogate import Surrogate, targets
+
+
+@pytest.fixture
+def results(df, tmp_path):
+    # Results as written by UBEM.py, with two failed buildings: 12 is adjacent
+    # to 11, and 53 has the same buildingId as 44.
+    results = pd.DataFrame(df.drop(columns = 'geometry'))
+    results['geometry'] = shapely.to_wkt(df.geometry.values)
+    results['simulated'] = 1
+    results.loc[[12, 53], 'simulated'] = 0
+    for t, target in enumerate(targets):
+        results[target] = np.where(results.simulated, 1000.0 * (t + 1) + np.arange(len(df)), 0)
+    resultsPath = str(tmp_path / 'simulationResults.csv')
+    results.to_csv(resultsPath)
+    return resultsPath
+
+
+def test_training_rows(df, results):
+    stock, rows, annual, hourly = Surrogate.training_set(results)
+    assert len(stock) == len(df)
+    assert 12 not in rows and 53 not in rows and len(rows) == len(df) - 2
+    assert np.array_equal(annual[:, 0], 1000.0 + rows)
+    assert hourly is None
+
+
+def test_features_of_stock(df, results):
+    # The features of a building do not depend on the failed buildings.
+    stock, rows, _, _ = Surrogate.training_set(results)
+    features = Surrogate.features(stock, stock).iloc[rows].reset_index(drop=True)
+    expected = Surrogate.features(df, df).iloc[rows].reset_index(drop=True)
+    assert np.allclose(features.adjacencyShare, expected.adjacencyShare)
+    assert features.adjacencyShare[list(rows).index(11)] > 0
+    assert (features.shading.values == expected.shading.values).all()
+
+
+def test_journal_by_index(df, results, tmp_path):
+    # The hourly output of each building is found by its index, the two
+    # buildings with buildingId 45 have their own output.
+    journalPath = str(tmp_path / 'journal.jsonl')
+    for idx in [44, 53, 11]:
+        Journal.append(journalPath, df.buildingId.iloc[idx], 'a%d' % idx, 1,
+                       fake_output(idx), idx = idx)
+    Journal.append(journalPath, df.buildingId.iloc[11], 'b11', 1, None, error = 'timeout',
+                   idx = 11)
+
+    _, rows, annual, hourly = Surrogate.training_set(results, journalPath)
+    assert list(rows) == [11, 44]
+    assert np.array_equal(annual[:, 0], [1011.0, 1044.0])
+    assert np.array_equal(hourly[:, 0, 0], [11 + 3, 44 + 3])
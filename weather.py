@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 22:02:51 2026
+
+EnergyPlus weather file (EPW) parsed once into its header and hourly columns.
+
+The parsed weather is kept by each process and, with a cache directory, on
+disk by the digest of the weather file, so the weather file is read once for
+all runs with the same file.
+
+Usage (header of a weather file):
+    python weather.py inputs/SWE_Stockholm.Arlanda.024600_IWEC.epw --cache cache/weather
+"""
+
+import os
+import json
+import argparse
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from cache import Cache
+
+
+# Site of the weather file, with the fields as written in the file.
+Location = namedtuple('Location', ['city', 'latitude', 'longitude', 'timeZone', 'elevation'])
+
+# Header and hourly columns of a weather file.
+EPW = namedtuple('EPW', ['digest', 'location', 'firstDayOfYear', 'year', 'leapYear',
+                         'holidays', 'hourly'])
+
+# Columns of the data of a weather file. The data source flags and the present
+# weather codes are not kept.
+columns = ['year', 'month', 'day', 'hour', 'minute', None, 'dryBulbTemperature',
+           'dewPointTemperature', 'relativeHumidity', 'atmosphericPressure',
+           'extraterrestrialHorizontalRadiation', 'extraterrestrialDirectNormalRadiation',
+           'horizontalInfraredRadiation', 'globalHorizontalRadiation',
+           'directNormalRadiation', 'diffuseHorizontalRadiation',
+           'globalHorizontalIlluminance', 'directNormalIlluminance',
+           'diffuseHorizontalIlluminance', 'zenithLuminance', 'windDirection',
+           'windSpeed', 'totalSkyCover', 'opaqueSkyCover', 'visibility', 'ceilingHeight',
+           'presentWeatherObservation', None, 'precipitableWater', 'aerosolOpticalDepth',
+           'snowDepth', 'daysSinceLastSnowfall', 'albedo', 'liquidPrecipitationDepth',
+           'liquidPrecipitationQuantity']
+
+# Weather files already parsed by this process, by digest.
+weathers = {}
+
+
+class Weather:
+    def __init__(self, epw, cacheDir):
+        self.epw = epw
+        self.cacheDir = cacheDir
+
+    def parse(epw):
+        """
+        Parses a weather file.
+
+        parameters
+        ----------
+        epw: str
+            EnergyPlus weather file.
+
+        output
+        ------
+        header: dict
+            Location, first day of the year, year, leap year and number of
+            holidays of the weather file.
+        hourly: dict
+            Hourly values of each column of the data.
+        """
+        with open(epw, 'r', errors = 'replace') as f:
+            lines = {}
+            for line in f:
+                key = line.split(',', 1)[0]
+                lines[key] = line.rstrip('\n').split(',')
+                if key == 'DATA PERIODS':
+                    break
+            data = pd.read_csv(f, header = None, low_memory = False,
+                               usecols = [i for i, c in enumerate(columns) if c])
+
+        location = lines['LOCATION']
+        hourly = {columns[i]: data[i].to_numpy(dtype = float) for i in data.columns}
+
+        # The calendar of the data: typical years take their year from January,
+        # but have no 29 February.
+        header = dict(location = [location[1], location[6], location[7], location[8],
+                                  location[9]],
+                      firstDayOfYear = lines['DATA PERIODS'][4].strip(),
+                      year = int(hourly['year'][0]),
+                      leapYear = int(len(data) == 24 * 366),
+                      holidays = int(lines['HOLIDAYS/DAYLIGHT SAVINGS'][4]))
+
+        return header, hourly
+
+    def read(epw, cacheDir = None):
+        """
+        Reads a weather file, parsed once per process and stored in the cache
+        directory by the digest of the file.
+
+        parameters
+        ----------
+        epw: str
+            EnergyPlus weather file.
+
+        cacheDir: str
+            Directory of the parsed weather files, None to parse the weather
+            file in each process.
+
+        output
+        ------
+        EPW
+            Digest, location, first day of the year, year, leap year (1 if
+            the data has 29 February), number of holidays and hourly columns
+            of the weather file.
+        """
+        digest = Cache.file_digest(epw)
+        if digest in weathers:
+            return weathers[digest]
+
+        path = None if cacheDir is None else os.path.join(cacheDir, '%s.npz' % digest[:16])
+        if path is not None and os.path.isfile(path):
+            with np.load(path) as f:
+                header = json.loads(str(f['header']))
+                hourly = {c: f[c] for c in f.files if c != 'header'}
+        else:
+            header, hourly = Weather.parse(epw)
+            if path is not None:
+                # Written to a temporary file renamed at once for parallel runs.
+                os.makedirs(cacheDir, exist_ok = True)
+                tmp = '%s.%d.tmp.npz' % (path[:-4], os.getpid())
+                np.savez(tmp, header = np.array(json.dumps(header)), **hourly)
+                os.replace(tmp, path)
+
+        weathers[digest] = EPW(digest = digest, location = Location(*header['location']),
+                               firstDayOfYear = header['firstDayOfYear'],
+                               year = header['year'], leapYear = header['leapYear'],
+                               holidays = header['holidays'], hourly = hourly)
+        return weathers[digest]
+
+
+def main():
+    parser = argparse.ArgumentParser(description = 'Header of a weather file.')
+    parser.add_argument('epw', help = 'EnergyPlus weather file')
+    parser.add_argument('--cache', default = None, help = 'directory of the parsed weather files')
+    args = parser.parse_args()
+
+    weather = Weather.read(args.epw, args.cache)
+    print(weather.location)
+    print('First day %s, year %d, leap year %d, %d holidays, %d hours'
+          % (weather.firstDayOfYear, weather.year, weather.leapYear, weather.holidays,
+             len(weather.hourly['dryBulbTemperature'])))
+    print(pd.DataFrame(weather.hourly).drop(['year', 'month', 'day', 'hour', 'minute'],
+                                            axis = 1).describe().T.round(1).to_string())
+
+
+if __name__ == '__main__':
+    main()
@@ -5,397 +5,38 @@ Created on Sun May  9 17:40:52 2021
 @author: fatjo876
 """
 
-from shapely.geometry.polygon import Polygon
-import math
 from eppy.modeleditor import IDF
-from shapely.geometry import Point, LineString
 import io
 import numpy as np
+import shapely
 
 
-def external_wall(x0,x1,y0,y1,z0,z1, i):
-    """
-    Writes the information of the external walls.
-    
-    parameters
-    ----------
-    x0,x1,y0,y1,z0,z1: int
-        The vertices of the wall as illustrated below:
-    
-          (x1,y1,z1)                (x0,y0,z1)
-                    * * * *  * * * *
-                    *              *
-                    *              *
-                    *              *
-                    * * * *  * * * *
-          (x1,y1,z0)                (x0,y0,z0)
-  
-    i: int
-        Number of external wall in the building
-     
-    output
-    ------
-    str
-    """
-    
-    wallVertices = 4
-    wall = ""        
-    wall += ('BUILDINGSURFACE:DETAILED,'+'\n'+
-             'Wall'+str(i)+',\n'+              #!- Name
-             'Wall, \n'+                       #!- Surface Type
-             'Exterior Wall, \n'+              #!- Construction Name
-             'ZONE'+',\n'+                     #!- Zone Name
-             'Outdoors, \n'+                   #!- Outside Boundary Condition
-             ', \n'+                           #!- Outside Boundary Condition Object
-             'SunExposed, \n'+                 #!- Sun Exposure
-             'WindExposed, \n'+                #!- Wind Exposure
-             ',\n' +                           #!- View Factor to Ground
-             str(wallVertices)+',\n')         #!- Number of Vertices
-    
-    # Vertices of the wall.
-    wall += (str(x0)+',\n' + str(y0) + ',\n' + str(z0) + ',\n' +
-             str(x0)+',\n' + str(y0) + ',\n' + str(z1) + ',\n' +
-             str(x1)+',\n' + str(y1) + ',\n' + str(z1) + ',\n' +
-             str(x1)+',\n' + str(y1) + ',\n' + str(z0) + ';\n' )
-    
-    return wall 
-
-def adiabatic_wall(x0,x1,y0,y1,z0,z1, i):
-    """
-    Writes the information of the adjacent walls.
-    Assumed to be adiabatic.
-    
-    parameters
-    ----------
-    x0,x1,y0,y1,z0,z1: int 
-        The vertices of the external walls.
-    i: int
-        Number of external walls in the building
-      
-    output
-    ------
-    str
-    """
-    
-    wallVertices = 4
-    wall = ""        
-    wall += ('BUILDINGSURFACE:DETAILED,'+'\n'+
-             'Wall'+str(i)+',\n'+              #!- Name
-             'Wall, \n'+                       #!- Surface Type
-             'Exterior Wall, \n'+              #!- Construction Name
-             'ZONE'+',\n'+                     #!- Zone Name
-             'Adiabatic, \n'+                   #!- Outside Boundary Condition
-             ', \n'+                           #!- Outside Boundary Condition Object
-             'NoSun, \n'+                 #!- Sun Exposure
-             'NoWind, \n'+                #!- Wind Exposure
-             ',\n' +                           #!- View Factor to Ground
-             str(wallVertices)+',\n')         #!- Number of Vertices
-    # Vertices of the wall.
-    wall += (str(x0)+',\n' + str(y0) + ',\n' + str(z0) + ',\n' +
-             str(x0)+',\n' + str(y0) + ',\n' + str(z1) + ',\n' +
-             str(x1)+',\n' + str(y1) + ',\n' + str(z1) + ',\n' +
-             str(x1)+',\n' + str(y1) + ',\n' + str(z0) + ';\n' )
-    
-    return wall 
-
-def external_win(x0, x1, y0, y1, z0, z1, i, basement):
-    """
-    Writes the information of the external windows.
-    
-    parameters
-    ----------
-    x0,x1,y0,y1,z0,z1: int
-        The vertices of the windows on external walls.
- 
-    i: int
-        Number of external windows in the building.
-       
-    output
-    ------
-    str
-    """
-    
-    winVertices = 4
-    win = ""        
-    win += ('FENESTRATIONSURFACE:DETAILED,'+'\n'+
-            'Window'+basement+str(i)+',\n'+                  #!- Name
-            'Window, \n'+                           # !- Surface Type
-            'Exterior Window, \n'+                  # !- Construction Name
-            'Wall'+basement+ str(i)+',\n'+                   # !-Building Surface Name
-            ', \n'+
-            ', \n'+
-            ', \n'+
-            ', \n'+
-            str(winVertices)+',\n')
-
-    win += (str(x0) + ',\n' + str(y0) + ',\n' + str(z0) + ',\n' +
-            str(x0) + ',\n' + str(y0) + ',\n' + str(z1) + ',\n' +
-            str(x1) + ',\n' + str(y1) + ',\n' + str(z1) + ',\n' +
-            str(x1) + ',\n' + str(y1) + ',\n' + str(z0) + ';\n' )
-    
-    return win 
-
-
-
-def roof(x,y,z):
-    """
-    Writes information of the external roof.
-    
-    Parameters
-    ----------
-    x,y,z: int
-        The vertices of the external roof.
-              
-    output
-    ------
-    str
-    """
-    
-    roofVertices = len(x)-1
-    roof = ""
-    roof += ('BUILDINGSURFACE:DETAILED,'+'\n'+
-             'Roof'+',\n'+                      #!- Name
-             'Roof, \n'+                        #!- Surface Type
-             'Exterior Roof, \n'+               #!- Construction Name
-             'ZONE'+',\n'+                      #!- Zone Name
-             'Outdoors, \n'+                    #!- Outside Boundary Condition
-             ', \n'+                            #!- Outside Boundary Condition Object
-             'SunExposed, \n'+                  #!- Sun Exposure
-             'WindExposed, \n'+                 #!- Wind Exposure
-             ',\n' +                            #!- View Factor to Ground
-             str(roofVertices)+',\n')          #!- Number of Vertices
-       
-
-    for i in range(roofVertices-1):
-        roof += (str(x[i]) + ',\n '+
-                 str(y[i]) + ',\n' +
-                 str(z) + ',\n' )
-
-    roof += (str(x[-2]) + ',\n' +
-             str(y[-2]) + ',\n' +
-             str(z) + ';\n' )
-    
-    return roof
-
-
-def floor(x,y,z0,basement):
-    """
-    Writes information of the floor. 
-    It is an external floor unless the building has a basement. 
-    Then, the floor is regarded as the internal floor. 
-    
-    parameters
-    ----------
-    x,y: nd.array
-    z: int
-        The vertices of the floor.
-              
-    output
-    ------
-    str
-    """
-    
-    floorVertices = len(x)-1
-    
-    floor = ""
-    
-    if basement == 1:
-        
-        floor += ('BUILDINGSURFACE:DETAILED,'+'\n'+
-                  'Interior Floor'+ ',\n'+              #!- Name
-                  'Floor, \n'+                          #!- Surface Type
-                  'Interior Floor, \n'+                 #!- Construction Name
-                  'ZONE'+',\n'+                         #!- Zone Name
-                  'Surface, \n'+                        #!- Outside Boundary Condition
-                  'Interior Ceiling'+',\n'+    #!- Outside Boundary Condition Object
-                  'NoSun, \n'+                          #!- Sun Exposure
-                  'NoWind, \n'+                         #!- Wind Exposure
-                  ',\n' +                               #!- View Factor to Ground
-                  str(floorVertices)+',\n')            #!- Number of Vertices      
-        
-        
-    else:    
-        floor += ('BUILDINGSURFACE:DETAILED,'+'\n'+
-                  'Floor'+',\n'+                        #!- Name
-                  'Floor, \n'+                          #!- Surface Type
-                  'Exterior Floor, \n'+                 #!- Construction Name
-                  'ZONE'+',\n'+                         #!- Zone Name
-                  'Ground, \n'+                         #!- Outside Boundary Condition
-                  ', \n'+                               #!- Outside Boundary Condition Object
-                  'NoSun, \n'+                          #!- Sun Exposure
-                  'NoWind, \n'+                         #!- Wind Exposure
-                  ',\n' +                               #!- View Factor to Ground
-                  str(floorVertices)+',\n')            #!- Number of Vertices     
-
-        
-    for i in range(floorVertices-1):
-        floor += (str(x[i]) + ',\n' +
-                  str(y[i]) + ',\n' +
-                  str(z0) + ',\n')
+# Idf text of a building surface: name, surface type, construction, zone,
+# outside boundary condition and its object, sun and wind exposure and the
+# number of vertices. The vertices follow.
+surfaceText = ('BUILDINGSURFACE:DETAILED,\n%s,\n%s,\n%s,\n%s,\n%s,\n%s,\n%s,\n%s,\n,\n%d,\n')
 
-    floor += (str(x[-2]) + ',\n' +
-              str(y[-2]) + ',\n' +
-              str(z0) + ';\n' )
-    
+# Idf text of a window: name and building surface. The 4 vertices follow.
+windowText = ('FENESTRATIONSURFACE:DETAILED,\n%s,\nWindow,\nExterior Window,\n%s,\n,\n,\n,\n,\n4,\n')
 
-    return floor
 
-
-def basement_ceiling(x,y,z0):
+def vertices_text(vertices, number):
     """
-    Writes information of the basement ceiling.
+    Formats the vertices of a surface.
     
     parameters
     ----------
-    x,y: nd.array
-    z0: int
-        The vertices of the ceiling of the basement.
-        
-    output
-    ------
-    str
-    """
-    basementCeilingVertices = len(x)-1
+    vertices: list
+        x, y, z of the vertices, one after the other.
     
-    basementCeiling = ""    
-    basementCeiling += ('BUILDINGSURFACE:DETAILED,'+'\n'+
-                        'Interior Ceiling'+',\n'+       #!- Name
-                        'Ceiling, \n'+                           #!- Surface Type
-                        'Interior Ceiling, \n'+                  #!- Construction Name
-                        'BASEMENT,\n'+                           #!- Zone Name
-                        'Surface, \n'+                           #!- Outside Boundary Condition
-                        'Interior Floor'+', \n'+                 #!- Outside Boundary Condition Object
-                        'NoSun, \n'+                             #!- Sun Exposure
-                        'NoWind, \n'+                            #!- Wind Exposure
-                        ',\n' +                                  #!- View Factor to Ground
-                        str(basementCeilingVertices)+',\n')               #!- Number of Vertices
+    number: str
+        Format of a coordinate, e.g., '%.6f'.
         
-    for i in range(basementCeilingVertices-1):
-        basementCeiling += (str(x[i]) + ',\n' +
-                            str(y[i]) + ',\n' +
-                            str(z0) + ',\n' )
-
-    basementCeiling += (str(x[-2]) + ',\n' +
-                        str(y[-2]) + ',\n' +
-                        str(z0) + ';\n' )
-    
-    return basementCeiling
-
-    
-def basement_floor(x,y,zb):
-    """
-    Writes information of the basement external floor.
-    
-    parameters
-    ----------
-    x,y: nd.array
-    zb: int
-        The vertices of the ceiling of the basement.
-              
     output
     ------
     str
     """
-    basementFloorVertices = len(x)-1
-    
-    basementFloor = ""
-    basementFloor += ('BUILDINGSURFACE:DETAILED,'+'\n'+
-                       'Exterior Floor, \n'+                #!- Name
-                       'Floor, \n'+                         #!- Surface Type
-                       'Exterior Floor Basement, \n'+                #!- Construction Name
-                       'BASEMENT, \n'+                      #!- Zone Name
-                       'Adiabatic, \n'+         #!- Outside Boundary Condition
-                       ',\n'+                        #!- Outside Boundary Condition Object
-                       'NoSun, \n'+                         #!- Sun Exposure
-                       'NoWind, \n'+                        #!- Wind Exposure
-                       ',\n' +                              #!- View Factor to Ground
-                       str(basementFloorVertices)+',\n')           #!- Number of Vertices
-    
-    for i in range(basementFloorVertices-1):
-        basementFloor += (str(x[i]) + ',\n' +
-                          str(y[i]) + ',\n' +
-                          str(zb) + ',\n' )
-
-    basementFloor += (str(x[-2]) + ',\n' +
-                       str(y[-2]) + ',\n' +
-                       str(zb) + ';\n' ) 
-    
-    return basementFloor
-
-
-def basement_adiabatic_wall(x0,x1,y0,y1,z0,zb,i):  
-    """
-    Writes the information of the basement external floor.
-    
-    parameters
-    ----------
-    x0,x1,y0,y1,z0,zb: int
-        The vertices of the external walls of the basement.
-    
-    i: int
-        Number of the walls.
-              
-    output
-    ------
-    str
-    """
-
-    basementWall = ""
-    basementWall =('BUILDINGSURFACE:DETAILED,'+'\n'+
-                    str('WallBasementAdiabatic'+ str(i))+ ',\n'+    #!- Name
-                    'Wall, \n'+                             #!- Surface Type
-                    'Exterior Wall Basement, \n'+                    #!- Construction Name
-                    'BASEMENT, \n'+                         #!- Zone Name
-                    'Adiabatic, \n'+            #!- Outside Boundary Condition
-                    ',\n'+                            #!- Outside Boundary Condition Object
-                    'NoSun, \n'+                            #!- Sun Exposure
-                    'NoWind, \n'+                           #!- Wind Exposure
-                    ',\n' +                                 #!- View Factor to Ground
-                    '4,\n')                                 #!- Number of Vertices
-
-    basementWall += (str(x0) + ',\n' + str(y0) + ',\n' + str(zb) + ',\n' +
-                      str(x0) + ',\n' + str(y0) + ',\n' + str(z0) + ',\n' +
-                      str(x1) + ',\n' + str(y1) + ',\n' + str(z0) + ',\n' +
-                      str(x1) + ',\n' + str(y1) + ',\n' + str(zb) + ';\n' )
-    
-    return basementWall 
-    
-def basement_external_wall(x0,x1,y0,y1,z0,z1,i):  
-    """
-    Writes the information of the basement external floor.
-    
-    parameters
-    ----------
-    x0,x1,y0,y1,z0,zb: int
-        The vertices of the external walls of the basement.
-    
-    i: int
-        Number of the walls.
-              
-    output
-    ------
-    str
-    """
-
-    basementWall = ""
-    basementWall =('BUILDINGSURFACE:DETAILED,'+'\n'+
-                    str('WallBasement'+ str(i))+ ',\n'+    #!- Name
-                    'Wall, \n'+                             #!- Surface Type
-                    'Exterior Wall Basement, \n'+                    #!- Construction Name
-                    'BASEMENT, \n'+                         #!- Zone Name
-                    'Outdoors, \n'+            #!- Outside Boundary Condition
-                    ',\n'+                            #!- Outside Boundary Condition Object
-                    'SunExposed, \n'+                            #!- Sun Exposure
-                    'WindExposed, \n'+                           #!- Wind Exposure
-                    ',\n' +                                 #!- View Factor to Ground
-                    '4,\n')                                 #!- Number of Vertices
-
-    basementWall += (str(x0) + ',\n' + str(y0) + ',\n' + str(z0) + ',\n' +
-                      str(x0) + ',\n' + str(y0) + ',\n' + str(z1) + ',\n' +
-                      str(x1) + ',\n' + str(y1) + ',\n' + str(z1) + ',\n' +
-                      str(x1) + ',\n' + str(y1) + ',\n' + str(z0) + ';\n' )
-    
-    return basementWall 
+    return (',\n'.join([number] * len(vertices)) + ';\n') % tuple(vertices)
 
 
 class oneZone:
@@ -471,122 +112,281 @@ class oneZone:
         idf
             An idf for building surfaces. 
         """
+        idftxt = oneZone.surfaces_text(buildingPolygon, buildingHeight, basement, wwr, adjacency)
+        
+        # Convert the text file to an idf.
+        fhandle = io.StringIO(idftxt) 
+        idf = IDF(fhandle) 
+        
+        return idf
     
-        height0 = 0 # Height of the ground level
-        heightbExposed = 1 # height of basement exposed walls on ground
-        heightbAdiabatic = -1.3 # height of the under ground floors.
-        wwrb = wwr
+    def surfaces_text(buildingPolygon, buildingHeight, basement, wwr, adjacency,
+                      decimals = 6):
+        """
+        Writes the idf text of the building surfaces.
         
-        # Convert the geometry of the building polygon to arrays of x and y.
-        x,y = buildingPolygon.exterior.xy 
+        parameters
+        ----------
+        buildingPolygon: shapely polygon
+            Building footprint.
+            
+        buildingHeight: int
+            Height of the building.
             
-        # Reverse the order for adjacent floor and ceiling
-        xx,yy = x[::-1],y[::-1] 
+        basement: int
+            Number of under ground floors from the EPC.
+            
+        wwr: int
+            Window to wall ratio.
+            
+        adjacency: gpd.GeoDataFrame
+            Adjacent polygons (Adjacency.adjacent_polygons).
+            
+        decimals: int
+            Number of decimals of the coordinates (m), None for full precision.
+                  
+        output
+        ------
+        str
+            Idf text of the building surfaces and windows.
+        """
+        adiabatic = oneZone.adiabatic_walls(buildingPolygon, adjacency)
         
-        idftxt = ""   
+        return oneZone.surfaces_batch([buildingPolygon], [buildingHeight], [basement],
+                                      [wwr], adiabatic, decimals)[0]
+    
+    def adiabatic_walls(buildingPolygon, adjacency):
+        """
+        Finds the walls of the building that are adjacent to another building.
         
-        # If there is one or more adjacent walls.
-        if len(adjacency) > 0:
-            
-            for i in range(len(x)-1):
-
-                # Find the center of the walls.
-                point = LineString([(x[i],y[i]),(x[i+1],y[i+1])]).centroid
-                
-                adj = []
-                for j in range (len(adjacency)):
-                    
-                    p = Polygon(adjacency.geometry[j])
-                    
-                    # Calculate the distance of adjacency.
-                    adj.append( point.distance(p) )
-                    
-                # If the distance of adjacency is less than 20 cm, it is an adiabatic wall,
-                # otherwise a a normal heat transmittance external wall. 
-                if np.array(adj).any() < 0.2:
-                    print('adj')
-                    
-                    # Adiabatic walls with no windows.
-                    idftxt += (adiabatic_wall(x[i],x[i+1],y[i],y[i+1],height0,buildingHeight,i))
-                    
-                
-                else:
-                    # External Walls
-                    idftxt += (external_wall(x[i],x[i+1],y[i],y[i+1],height0,buildingHeight,i)) 
-                    
-                    # Get the length of a wall
-                    line = LineString([Point((x[i],y[i])), Point((x[i+1],y[i+1]))])
+        parameters
+        ----------
+        buildingPolygon: shapely polygon
+            Building footprint.
             
-                    # Add windows if the length of the wall is greater than 2 meters.
-                    # Avoid having windows on smaller walls of complex building shapes.
-                    if line.length > 2:
-                        
-                        # Calculate the geometry of windows based on the geometry of the walls and WWR.
-                        a = line.interpolate(wwr, normalized=True)
-                        b = line.interpolate(1-wwr, normalized=True)
-                        R = (buildingHeight - buildingHeight * math.sqrt(wwr))/2
+        adjacency: gpd.GeoDataFrame
+            Adjacent polygons (Adjacency.adjacent_polygons).
             
-                        # External Windows
-                        idftxt += (external_win(a.x,b.x,a.y,b.y, height0+R, buildingHeight-R, i,''))
-
-        # If there is NO adjacent walls.        
-        if len(adjacency) == 0:
-            for i in range(len(x)-1):
-                # External Walls
-                idftxt += (external_wall(x[i],x[i+1],y[i],y[i+1],height0,buildingHeight,i)) 
-                
-                # Get the length of a wall
-                line = LineString([Point((x[i],y[i])), Point((x[i+1],y[i+1]))])
-                
-                # Add windows if the length of the wall is greater than 2 meters.
-                # Avoid having windows on smaller walls of complex building shapes.
-                if line.length>2:
-                    
-                    # Calculates the geometry of windows based on the geometry of the walls and WWR
-                    a = line.interpolate(wwr, normalized=True)
-                    b = line.interpolate(1-wwr, normalized=True)
-                    R = (buildingHeight - buildingHeight * math.sqrt(wwr))/2
+        output
+        ------
+        np.array
+            True for the adiabatic walls, in the order of the vertices.
+        """
+        geometry = np.asarray(adjacency.geometry.values) if len(adjacency) else []
+        _, adiabatic = oneZone.shared_walls([buildingPolygon], geometry,
+                                            np.zeros(len(geometry), dtype = int))
         
-                    # External Windows
-                    idftxt += (external_win(a.x,b.x,a.y,b.y, height0+R, buildingHeight-R, i,''))
+        return adiabatic
     
-        # External Floor
-        idftxt += floor(x, y, height0, basement)
+    def shared_walls(buildingPolygons, neighbors, owner, tolerance = 0.2, minShare = 0.5):
+        """
+        Classifies the walls of a batch of buildings against their neighbors.
         
-        # External Roof
-        idftxt += roof(xx, yy, buildingHeight)
+        The neighbors are widened by the tolerance and prepared, then all the 
+        walls are intersected with the neighbors of their building at once.
         
-        # If the building has a basement floor.
-        if basement == 1:
-            for i in range(len(x)-1):
-                
-                # Basement adiabatic walls (underground walls)
-                idftxt += basement_adiabatic_wall(x[i], x[i+1], y[i], y[i+1], height0, heightbAdiabatic, i)
-                
-                # Basement exposed walls (onground walls)
-                idftxt += basement_external_wall(x[i], x[i+1], y[i], y[i+1], height0, heightbExposed, i)
-                
-                # Get the length of a wall
-                line = LineString([Point((x[i],y[i])), Point((x[i+1],y[i+1]))])
+        parameters
+        ----------
+        buildingPolygons: list of shapely polygons
+            Building footprints.
+            
+        neighbors: list of shapely polygons
+            Adjacent polygons of all buildings (Adjacency.graph).
+            
+        owner: np.array
+            Position in buildingPolygons of the building of each neighbor.
+            
+        tolerance: float
+            Largest gap (m) between a wall and a neighbor sharing it.
+            
+        minShare: float
+            Smallest shared fraction of the length of an adiabatic wall.
+                  
+        output
+        ------
+        shared: np.array
+            Length (m) of each wall shared with neighbors, for all the walls
+            of the batch in the order of the vertices of each building.
+            
+        adiabatic: np.array
+            True for the walls shared over at least minShare of their length.
+        """
+        coords, ring = shapely.get_coordinates(shapely.get_exterior_ring(buildingPolygons),
+                                               return_index = True)
+        start = np.flatnonzero(ring[1:] == ring[:-1])
+        walls = shapely.linestrings(np.stack([coords[start], coords[start + 1]], axis = 1))
+        length = shapely.length(walls)
+        shared = np.zeros(len(start))
+        
+        if len(neighbors):
+            zones = shapely.buffer(np.asarray(neighbors), tolerance, join_style = 2,
+                                   mitre_limit = 2, cap_style = 2)
+            shapely.prepare(zones)
+            
+            # Walls near a neighbor of their own building.
+            wall, zone = shapely.STRtree(zones).query(walls, predicate = 'intersects')
+            own = np.asarray(owner)[zone] == ring[start][wall]
+            wall, zone = wall[own], zone[own]
+            
+            overlap = shapely.length(shapely.intersection(walls[wall], zones[zone]))
+            shared = np.minimum(np.bincount(wall, weights = overlap, minlength = len(start)),
+                                length)
+        
+        return shared, (length > 0) & (shared >= minShare * length)
+    
+    def surfaces_batch(buildingPolygons, buildingHeights, basements, wwrs,
+                       adiabatic = None, decimals = 6):
+        """
+        Writes the idf text of the surfaces of a batch of buildings.
         
-                # Add windows if the length of the wall is greater than 2 meters.
-                # Avoid having windows on smaller walls of complex building shapes.
-                if line.length > 2:
-                    
-                    # Calculate the geometry of windows based on the geometry of the walls and WWR.
-                    a = line.interpolate(wwrb, normalized=True)
-                    b = line.interpolate(1-wwrb, normalized=True)
-                    Rb = (heightbExposed - heightbExposed * math.sqrt(wwrb))/2
+        All walls, windows, floors, roofs and basement surfaces are computed 
+        with array operations over all the walls of the batch, then formatted
+        with a bounded number of decimals.
         
-                    # External Windows
-                    idftxt += (external_win(a.x,b.x,a.y,b.y, height0+Rb, heightbExposed-Rb, i,'Basement'))
+        parameters
+        ----------
+        buildingPolygons: list of shapely polygons
+            Building footprints, reconstructed by Geometry.global_geometry.
             
-            # Basement ceiling and floor.
-            idftxt += basement_ceiling(xx, yy, heightbExposed)
-            idftxt += basement_floor(x, y, heightbAdiabatic)    
+        buildingHeights: list
+            Height of each building.
+            
+        basements: list
+            1 for buildings with a basement, 0 otherwise.
+            
+        wwrs: list
+            Window to wall ratio of each building.
+            
+        adiabatic: np.array
+            True for the adiabatic walls (oneZone.adiabatic_walls) of all 
+            buildings, one after the other. None if no wall is adiabatic.
+            
+        decimals: int
+            Number of decimals of the coordinates (m), None for full precision.
+                  
+        output
+        ------
+        list
+            Idf text of the surfaces and windows of each building.
+        """
+        height0 = 0.0 # Height of the ground level
+        heightbExposed = 1.0 # height of basement exposed walls on ground
+        heightbAdiabatic = -1.3 # height of the under ground floors.
+        number = '%r' if decimals is None else '%%.%df' % decimals
         
-        # Convert the text file to an idf.
-        fhandle = io.StringIO(idftxt) 
-        idf = IDF(fhandle) 
+        heights = np.asarray(buildingHeights, dtype = float)
+        basements = np.asarray(basements)
+        wwrs = np.asarray(wwrs, dtype = float)
         
-        return idf
+        # Vertices of all footprints and the first vertex of each footprint.
+        coords, owner = shapely.get_coordinates(shapely.get_exterior_ring(buildingPolygons),
+                                                return_index = True)
+        first = np.searchsorted(owner, np.arange(len(heights) + 1))
+        
+        # Walls between consecutive vertices of the same footprint.
+        start = np.flatnonzero(owner[1:] == owner[:-1])
+        building = owner[start]
+        wall = start - first[building]
+        x0, y0 = coords[start].T
+        x1, y1 = coords[start + 1].T
+        dx, dy = x1 - x0, y1 - y0
+        length = np.sqrt(dx * dx + dy * dy)
+        if adiabatic is None:
+            adiabatic = np.zeros(len(start), dtype = bool)
+        
+        # Windows on walls longer than 2 m, between the fractions wwr and 1-wwr
+        # of the wall, as LineString.interpolate.
+        wwr = wwrs[building]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            fa = (wwr * length) / length
+            fb = ((1 - wwr) * length) / length
+        ax, ay = dx * fa + x0, dy * fa + y0
+        bx, by = dx * fb + x0, dy * fb + y0
+        
+        # Window heights on the ground floor and on the exposed basement walls.
+        h = heights[building]
+        R = (h - h * np.sqrt(wwr)) / 2
+        Rb = (heightbExposed - heightbExposed * np.sqrt(wwr)) / 2
+        
+        def quad(xa, ya, xb, yb, za, zb):
+            # Vertices of vertical quads: lower and upper a, upper and lower b.
+            return np.stack([xa, ya, za, xa, ya, zb, xb, yb, zb, xb, yb, za],
+                            axis = 1).tolist()
+        
+        zero = np.zeros(len(start))
+        walls = quad(x0, y0, x1, y1, zero + height0, h)
+        windows = quad(ax, ay, bx, by, height0 + R, h - R)
+        basementAdiabatic = quad(x0, y0, x1, y1, zero + heightbAdiabatic, zero + height0)
+        basementWalls = quad(x0, y0, x1, y1, zero + height0, zero + heightbExposed)
+        basementWindows = quad(ax, ay, bx, by, height0 + Rb, heightbExposed - Rb)
+        hasWindow = (length > 2).tolist()
+        adiabatic = np.asarray(adiabatic, dtype = bool).tolist()
+        
+        texts = []
+        for b in range(len(heights)):
+            idftxt = []
+            edges = range(first[b] - b, first[b + 1] - b - 1)
+            
+            # Ground floor walls and windows.
+            for e in edges:
+                i = wall[e]
+                if adiabatic[e]:
+                    idftxt += [surfaceText % ('Wall%d' % i, 'Wall', 'Exterior Wall', 'ZONE', 
+                                              'Adiabatic', '', 'NoSun', 'NoWind', 4),
+                               vertices_text(walls[e], number)]
+                    continue
+                idftxt += [surfaceText % ('Wall%d' % i, 'Wall', 'Exterior Wall', 'ZONE', 
+                                          'Outdoors', '', 'SunExposed', 'WindExposed', 4),
+                           vertices_text(walls[e], number)]
+                if hasWindow[e]:
+                    idftxt += [windowText % ('Window%d' % i, 'Wall%d' % i),
+                               vertices_text(windows[e], number)]
+            
+            # Floor and roof, with the roof vertices in reverse order.
+            x, y = coords[first[b]:first[b + 1] - 1].T
+            n = len(x)
+            floor = np.stack([x, y, np.full(n, height0)], axis = 1).ravel().tolist()
+            roof = np.stack([x[::-1], y[::-1], np.full(n, heights[b])], 
+                            axis = 1)[np.r_[n-1, 0:n-1]].ravel().tolist()
+            if basements[b] == 1:
+                idftxt += [surfaceText % ('Interior Floor', 'Floor', 'Interior Floor', 'ZONE',
+                                          'Surface', 'Interior Ceiling', 'NoSun', 'NoWind', n)]
+            else:
+                idftxt += [surfaceText % ('Floor', 'Floor', 'Exterior Floor', 'ZONE',
+                                          'Ground', '', 'NoSun', 'NoWind', n)]
+            idftxt += [vertices_text(floor, number),
+                       surfaceText % ('Roof', 'Roof', 'Exterior Roof', 'ZONE', 'Outdoors', 
+                                      '', 'SunExposed', 'WindExposed', n),
+                       vertices_text(roof, number)]
+            
+            # Basement walls, windows, ceiling and floor.
+            if basements[b] == 1:
+                for e in edges:
+                    i = wall[e]
+                    idftxt += [surfaceText % ('WallBasementAdiabatic%d' % i, 'Wall', 
+                                              'Exterior Wall Basement', 'BASEMENT', 
+                                              'Adiabatic', '', 'NoSun', 'NoWind', 4),
+                               vertices_text(basementAdiabatic[e], number),
+                               surfaceText % ('WallBasement%d' % i, 'Wall', 
+                                              'Exterior Wall Basement', 'BASEMENT', 
+                                              'Outdoors', '', 'SunExposed', 'WindExposed', 4),
+                               vertices_text(basementWalls[e], number)]
+                    if hasWindow[e]:
+                        idftxt += [windowText % ('WindowBasement%d' % i, 'WallBasement%d' % i),
+                                   vertices_text(basementWindows[e], number)]
+                
+                ceiling = np.array(roof).reshape(-1, 3)
+                ceiling[:, 2] = heightbExposed
+                basementFloor = np.array(floor).reshape(-1, 3)
+                basementFloor[:, 2] = heightbAdiabatic
+                idftxt += [surfaceText % ('Interior Ceiling', 'Ceiling', 'Interior Ceiling', 
+                                          'BASEMENT', 'Surface', 'Interior Floor', 
+                                          'NoSun', 'NoWind', n),
+                           vertices_text(ceiling.ravel().tolist(), number),
+                           surfaceText % ('Exterior Floor', 'Floor', 'Exterior Floor Basement', 
+                                          'BASEMENT', 'Adiabatic', '', 'NoSun', 'NoWind', n),
+                           vertices_text(basementFloor.ravel().tolist(), number)]
+            
+            texts.append(''.join(idftxt))
+        
+        return texts